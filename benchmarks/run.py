@@ -0,0 +1,320 @@
+"""Micro-benchmarks of the package hot paths, on a synthetic corpus (see :mod:`synthetic`).
+
+Each benchmark is timed over several repeats (best and median times are reported), then run once more
+under :mod:`tracemalloc` to measure its peak memory allocation. Inputs are rebuilt before each repeat,
+outside of the measured section, as some of the benchmarked functions modify their input in place.
+
+Results are compared with a baseline recorded locally (``benchmarks/baseline.json`` by default, not versioned),
+a benchmark regresses if its best time or its peak memory exceeds the baseline by more than the tolerance.
+
+Examples
+--------
+Run all the benchmarks and compare with the baseline::
+
+    python benchmarks/run.py
+
+Run the I/O benchmarks only, exit with an error code if any regresses::
+
+    python benchmarks/run.py -k io. --check
+
+Record or update the baseline::
+
+    python benchmarks/run.py --save-baseline
+"""
+
+import gc
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from os import path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import click
+
+from uqa import clean, context_utils, dataset, qa_gen
+
+import synthetic
+
+#: Default baseline path
+BASELINE_PATH = path.join(path.dirname(path.abspath(__file__)), "baseline.json")
+
+#: Synthetic corpus size parameters, stored with the results
+SIZES = dict(num_articles=200, contexts_per_article=5, sentences_per_context=4, depth=2)
+
+
+class Benchmark(NamedTuple):
+    """A benchmark: `setup` builds the input passed to `run`, only `run` is measured."""
+
+    name: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+
+
+def _contexts(articles: List[Dict]) -> List[context_utils.Context]:
+    return list(context_utils.contextify([("synthetic.json", synthetic.copy_articles(articles))]))
+
+
+def _columnar_contexts(articles: List[Dict], fpath: str) -> List[context_utils.Context]:
+    dataset.write_columnar(fpath, articles, override=True)
+    return list(context_utils.contextify([(fpath, dataset.read_columnar(fpath))]))
+
+
+def _trees(articles: List[Dict]) -> List[Dict]:
+    return [tree for article in articles for context in article["contexts"] for tree in context["constituency"]]
+
+
+def _long_articles(num_articles: int) -> List[Dict]:
+    """Return `num_articles` articles with long paragraphs, with dozens of sentences and entities."""
+    return synthetic.generate_articles(num_articles, SIZES["contexts_per_article"], 64, depth=SIZES["depth"])
+
+
+def _io_benchmarks(articles: List[Dict], tmpdir: str) -> List[Benchmark]:
+    """Write and read benchmarks for each file format and gzip compressed json."""
+    benchmarks = []
+    for fileformat, ext in [("json", "json"), ("json", "json.gz"), ("jsonl", "jsonl"), ("pickle", "pickle")]:
+        fpath = path.join(tmpdir, f"synthetic.{ext}")
+        writer, reader = dataset.WRITERS[fileformat], dataset.READERS[fileformat]
+        benchmarks.append(
+            Benchmark(
+                f"io.{ext}.write",
+                lambda: synthetic.copy_articles(articles),
+                lambda fcontent, fpath=fpath, writer=writer: writer(fpath, fcontent, override=True),
+            )
+        )
+        benchmarks.append(
+            Benchmark(
+                f"io.{ext}.read",
+                lambda fpath=fpath, writer=writer: writer(fpath, articles, override=True),
+                lambda _, fpath=fpath, reader=reader: list(reader(fpath)),
+            )
+        )
+    fpath = path.join(tmpdir, "synthetic.columnar")
+    benchmarks.append(
+        Benchmark(
+            "io.columnar.write",
+            lambda: synthetic.copy_articles(articles),
+            lambda fcontent: dataset.write_columnar(fpath, fcontent, override=True),
+        )
+    )
+    benchmarks.append(
+        Benchmark(
+            "io.columnar.read",
+            lambda: dataset.write_columnar(fpath, articles, override=True),
+            lambda _: list(context_utils.contextify([(fpath, dataset.read_columnar(fpath))])),
+        )
+    )
+    benchmarks.append(
+        Benchmark(
+            "qa_gen.generate_qas.columnar",
+            lambda: _columnar_contexts(articles, fpath),
+            lambda contexts: list(qa_gen.generate_qas_context_it(contexts)),
+        )
+    )
+    return benchmarks
+
+
+def make_benchmarks(articles: List[Dict], tmpdir: str) -> List[Benchmark]:
+    """Return the benchmarks over `articles` (annotated `default` format), files are written in `tmpdir`."""
+    texts = [context["text"] for article in articles for context in article["contexts"]]
+    benchmarks = [
+        Benchmark("clean.clean_text", lambda: texts, lambda texts: [clean.clean_text(text) for text in texts]),
+        Benchmark(
+            "clean.filter_contexts",
+            lambda: synthetic.copy_articles(articles),
+            lambda fcontent: clean.filter_contexts(fcontent, 10),
+        ),
+        Benchmark(
+            "clean.filter_contexts.all",
+            lambda: synthetic.copy_articles(articles),
+            lambda fcontent: clean.filter_contexts(fcontent, 10, clean.make_filters(1000, 0.1, 0.1)),
+        ),
+        Benchmark(
+            "context_utils.contextify",
+            lambda: synthetic.copy_articles(articles),
+            lambda fcontent: list(context_utils.contextify([("synthetic.json", fcontent)])),
+        ),
+        Benchmark(
+            "context_utils.jsonify", lambda: _contexts(articles), lambda contexts: list(context_utils.jsonify(contexts))
+        ),
+        Benchmark(
+            "LabelNode.from_json",
+            lambda: synthetic.copy_articles(_trees(articles)),
+            lambda trees: [context_utils.LabelNode.from_json(tree) for tree in trees],
+        ),
+        Benchmark(
+            "LabelNode.to_json",
+            lambda: [context_utils.LabelNode.from_json(tree) for tree in synthetic.copy_articles(_trees(articles))],
+            lambda nodes: [node.to_json() for node in nodes],
+        ),
+        Benchmark(
+            "LabelNode.flat_iter",
+            lambda: [context_utils.LabelNode.from_json(tree) for tree in synthetic.copy_articles(_trees(articles))],
+            lambda nodes: [list(node.flat_iter()) for node in nodes],
+        ),
+        Benchmark(
+            "LabelNode.copy",
+            lambda: [context_utils.LabelNode.from_json(tree) for tree in synthetic.copy_articles(_trees(articles))],
+            lambda nodes: [(node.copy(), node.copy(depth=1), node.copy_no_child(color="red")) for node in nodes],
+        ),
+        Benchmark(
+            "context_utils.decorate",
+            lambda: _contexts(articles),
+            lambda contexts: [context_utils.decorate(context.text, context.constituents) for context in contexts],
+        ),
+        Benchmark(
+            "qa_gen.rule1_ext",
+            lambda: _contexts(articles),
+            lambda contexts: [qa_gen.rule1_ext(context) for context in contexts],
+        ),
+        Benchmark(
+            "qa_gen.generate_qas",
+            lambda: _contexts(articles),
+            lambda contexts: list(qa_gen.generate_qas_context_it(contexts)),
+        ),
+        Benchmark(
+            "qa_gen.generate_qas_dl",
+            lambda: synthetic.copy_articles(articles),
+            lambda fcontent: list(qa_gen.generate_qas_dl([("synthetic.json", fcontent)])),
+        ),
+        Benchmark(
+            "context_utils.contextify.lazy",
+            lambda: synthetic.copy_articles(articles),
+            lambda fcontent: list(context_utils.contextify([("synthetic.json", fcontent)], lazy=True)),
+        ),
+        Benchmark(
+            "qa_gen.rule1_ext.long",
+            lambda: _contexts(_long_articles(len(articles) // 10)),
+            lambda contexts: [qa_gen.rule1_ext(context) for context in contexts],
+        ),
+    ]
+    return benchmarks + _io_benchmarks(articles, tmpdir)
+
+
+def measure(benchmark: Benchmark, repeat: int) -> Dict[str, float]:
+    """Run `benchmark` `repeat` times and once under :mod:`tracemalloc`, return its times and peak memory."""
+    times = []
+    for _ in range(repeat):
+        arg = benchmark.setup()
+        gc.collect()
+        start = time.perf_counter()
+        benchmark.run(arg)
+        times.append(time.perf_counter() - start)
+        del arg
+    arg = benchmark.setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        benchmark.run(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return dict(time_min=min(times), time_median=statistics.median(times), peak_bytes=peak)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return the names of the benchmarks of `results` regressing compared to `baseline`."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or "error" in result:
+            continue
+        if result["time_min"] > base["time_min"] * (1 + tolerance):
+            regressions.append(name)
+        elif result["peak_bytes"] > base["peak_bytes"] * (1 + tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def _format_ratio(value: float, base: Optional[float]) -> str:
+    if not base:
+        return ""
+    return f"x{value / base:.2f}"
+
+
+def print_report(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    """Print a results table, with ratios to the baseline."""
+    click.echo(f"{'benchmark':<28} {'best (ms)':>10} {'median (ms)':>12} {'peak (KiB)':>11} {'time':>7} {'memory':>7}")
+    for name, result in results.items():
+        if "error" in result:
+            click.echo(f"{name:<28} error: {result['error']}")
+            continue
+        base = baseline.get(name, {})
+        click.echo(
+            f"{name:<28} {result['time_min'] * 1000:>10.2f} {result['time_median'] * 1000:>12.2f}"
+            f" {result['peak_bytes'] / 1024:>11.0f}"
+            f" {_format_ratio(result['time_min'], base.get('time_min')):>7}"
+            f" {_format_ratio(result['peak_bytes'], base.get('peak_bytes')):>7}"
+        )
+
+
+@click.command()
+@click.option("-k", "--keyword", multiple=True, help="Only run benchmarks which name contains one of the keywords.")
+@click.option("--repeat", type=click.IntRange(min=1), default=5, show_default=True, help="Timed runs per benchmark.")
+@click.option("--num-articles", type=click.IntRange(min=1), default=SIZES["num_articles"], show_default=True)
+@click.option("--seed", type=click.INT, default=0, show_default=True)
+@click.option("--baseline", "baseline_path", type=click.Path(dir_okay=False), default=BASELINE_PATH)
+@click.option("--save-baseline", is_flag=True, help="Store the results as the new baseline.")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write the results to this JSON file.")
+@click.option(
+    "--tolerance", type=click.FloatRange(min=0), default=0.25, show_default=True, help="Relative regression tolerance."
+)
+@click.option("--check", is_flag=True, help="Exit with status 1 if any benchmark regresses.")
+def main(keyword, repeat, num_articles, seed, baseline_path, save_baseline, output, tolerance, check):
+    """Run the benchmarks and compare them with the baseline."""
+    sizes = dict(SIZES, num_articles=num_articles, seed=seed)
+    articles = synthetic.generate_articles(
+        num_articles,
+        sizes["contexts_per_article"],
+        sizes["sentences_per_context"],
+        seed=seed,
+        depth=sizes["depth"],
+        with_qas=True,
+    )
+    tmpdir = tempfile.mkdtemp(prefix="uqa-bench-")
+    results = dict()
+    try:
+        for benchmark in make_benchmarks(articles, tmpdir):
+            if keyword and not any(k in benchmark.name for k in keyword):
+                continue
+            try:
+                results[benchmark.name] = measure(benchmark, repeat)
+            except Exception as err:  # pylint: disable=broad-except
+                results[benchmark.name] = dict(error=f"{type(err).__name__}: {err}")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    meta = dict(python=platform.python_version(), platform=platform.platform(), sizes=sizes)
+    report = dict(meta=meta, results=results)
+    baseline = dict(meta=dict(), results=dict())
+    if path.exists(baseline_path):
+        with open(baseline_path, "r", encoding="utf8") as file:
+            baseline = json.load(file)
+        if baseline["meta"].get("sizes") != sizes:
+            click.echo(f"Warning: baseline corpus sizes {baseline['meta'].get('sizes')} differ from {sizes}")
+    print_report(results, baseline["results"])
+
+    if output is not None:
+        with open(output, "w", encoding="utf8") as file:
+            json.dump(report, file, indent=2)
+    if save_baseline:
+        kept = {name: result for name, result in results.items() if "error" not in result}
+        baseline["meta"] = report["meta"]
+        baseline["results"].update(kept)
+        with open(baseline_path, "w", encoding="utf8") as file:
+            json.dump(baseline, file, indent=2)
+            file.write("\n")
+        click.echo(f"Baseline saved to {baseline_path}")
+    regressions = compare(results, baseline["results"], tolerance)
+    if regressions:
+        click.echo(f"Regressions (tolerance {tolerance:.0%}): {', '.join(regressions)}")
+    if check and (regressions or any("error" in result for result in results.values())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,315 @@
+"""Deterministic synthetic French corpus generator.
+
+Generated articles are in `default` data format, optionally annotated with named entities, constituency trees
+(same JSON shape as the `ner` and `constituency` stages output) and question / answer pairs, or in `FQuAD` format.
+
+Sentences follow a few templates, a part of them matching :func:`uqa.qa_gen.rule1_ext` pattern
+(``NP-SUJ`` containing a single entity, ``VN``, ``NP-ATS`` and an optional ``PP-MOD``) so that QA generation
+benchmarks exercise the whole rule. Texts contain typographic characters (quotes, apostrophes, dashes)
+replaced or removed by :func:`uqa.clean.clean_text`.
+
+Examples
+--------
+Generate 4 files of 250 annotated articles in `default` format::
+
+    python benchmarks/synthetic.py data/synthetic --num-files 4 --num-articles 250
+
+Generate a `FQuAD` format file::
+
+    python benchmarks/synthetic.py data/synthetic_fquad --data-format fquad
+"""
+
+import copy
+import os
+import random
+from os import path
+from typing import Dict, List, Optional, Tuple
+
+import click
+
+from uqa import dataset, fquad_utils
+
+#: Named entities per label
+ENTITIES = {
+    "PER": [
+        "Victor Hugo",
+        "Marie Curie",
+        "Jean Moulin",
+        "Simone Veil",
+        "Louis Pasteur",
+        "George Sand",
+        "Émile Zola",
+        "Gustave Eiffel",
+        "Hélène Boucher",
+        "Jacques Cœur",
+    ],
+    "LOC": [
+        "Paris",
+        "Lyon",
+        "Marseille",
+        "Bordeaux",
+        "la Bretagne",
+        "Québec",
+        "Genève",
+        "l'Alsace",
+        "Nîmes",
+        "Tahiti",
+    ],
+    "ORG": ["l'Unesco", "la SNCF", "le CNRS", "l'Académie française", "Renault", "l'Institut Pasteur"],
+    "MISC": ["la Révolution française", "les Misérables", "le Tour de France", "la Belle Époque"],
+}
+
+#: Verbs of the ``VN`` constituents
+VERBS = ["est", "était", "fut", "devient", "reste", "demeure", "sera", "semble"]
+
+#: Attributes of the ``NP-ATS`` constituents
+ATTRIBUTES = [
+    "un écrivain français majeur",
+    "la capitale économique de la région",
+    "une figure importante du mouvement",
+    "le premier président de l'association",
+    "l'une des plus grandes villes d'Europe",
+    "un symbole fort de la république",
+    "la principale source de revenus du territoire",
+    "un lieu de mémoire très fréquenté",
+    "le siège historique de la compagnie",
+    "une œuvre célèbre de la littérature",
+]
+
+#: Complements of the ``PP-MOD`` constituents, ``{LOC}`` is replaced by a location entity
+COMPLEMENTS = [
+    "au dix-neuvième siècle",
+    "depuis sa fondation",
+    "selon les historiens",
+    "à la fin de la guerre",
+    "dans les années cinquante",
+    "à {LOC}",
+    "près de {LOC}",
+    "en dépit des critiques",
+]
+
+#: Subjects of the sentences without entity
+SUBJECTS = ["la population", "le bâtiment", "cette période", "les archives", "le projet", "la collection"]
+
+#: Typographic variants of some characters, applied to a part of the tokens
+NOISE = {"'": "’", "-": "–"}
+
+
+class _Builder:
+    """Incrementally build a text and the leaves spans of its tokens."""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.pos = 0
+
+    def add(self, token: str, sep: str = " ") -> Dict:
+        if self.parts and sep:
+            self.parts.append(sep)
+            self.pos += len(sep)
+        start = self.pos
+        self.parts.append(token)
+        self.pos += len(token)
+        return dict(label="", start=start, end=self.pos, children=[])
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+def _node(label: str, children: List[Dict]) -> Dict:
+    return dict(label=label, start=children[0]["start"], end=children[-1]["end"], children=children)
+
+
+def _phrase(builder: _Builder, label: str, words: List[str], depth: int) -> Dict:
+    """Add `words` to `builder` and return a `label` node, with nested ``PP`` / ``NP`` nodes up to `depth`."""
+    if depth <= 0 or len(words) <= 3:
+        return _node(label, [builder.add(word) for word in words])
+    children = [builder.add(word) for word in words[:2]]
+    inner_label = "NP" if label.startswith("PP") else "PP"
+    children.append(_phrase(builder, inner_label, words[2:], depth - 1))
+    return _node(label, children)
+
+
+def _noisy(rng: random.Random, words: List[str], noise: float) -> List[str]:
+    ret = []
+    for word in words:
+        if rng.random() < noise:
+            for char, variant in NOISE.items():
+                word = word.replace(char, variant)
+            if rng.random() < 0.2:
+                word = f"«{word}»"
+        ret.append(word)
+    return ret
+
+
+def _sentence(
+    builder: _Builder, rng: random.Random, rule_ratio: float, noise: float, depth: int
+) -> Tuple[Dict, List[Dict], Optional[Dict]]:
+    """Add a sentence to `builder`, return its constituency tree, its entities and its question / answer pair."""
+    entities = []
+    children = []
+    matches_rule = rng.random() < rule_ratio
+    if matches_rule:
+        label = rng.choice(sorted(ENTITIES))
+        subject = rng.choice(ENTITIES[label]).split()
+        np_subj = _phrase(builder, "NP-SUJ", subject, depth)
+        entities.append(dict(start=np_subj["start"], end=np_subj["end"], label=label))
+    else:
+        np_subj = _phrase(builder, "NP-SUJ", rng.choice(SUBJECTS).split(), depth)
+    children.append(np_subj)
+    verb = rng.choice(VERBS)
+    children.append(_node("VN", [builder.add(verb)]))
+    if matches_rule or rng.random() < 0.5:
+        attribute = _noisy(rng, rng.choice(ATTRIBUTES).split(), noise)
+        children.append(_phrase(builder, "NP-ATS", attribute, depth))
+    if rng.random() < 0.6:
+        complement = rng.choice(COMPLEMENTS)
+        location = rng.choice(ENTITIES["LOC"])
+        words = complement.replace("{LOC}", location).split()
+        pp_mod = _phrase(builder, "PP-MOD", words, depth)
+        children.append(pp_mod)
+        if "{LOC}" in complement:
+            entities.append(dict(start=builder.pos - len(location), end=builder.pos, label="LOC"))
+    children.append(_node("PONCT", [builder.add(".", sep="")]))
+    tree = _node("SENT", children)
+
+    qa = None
+    if matches_rule:
+        text = builder.text()
+        question_parts = ["Quel"] + [text[child["start"] : child["end"]] for child in children[1:3]] + ["?"]
+        qa = dict(question=" ".join(question_parts), answer=dict(start=np_subj["start"], end=np_subj["end"]))
+        qa["answer"]["label"] = "NP-SUJ"
+    return tree, entities, qa
+
+
+def generate_context(
+    rng: random.Random,
+    num_sentences: int = 4,
+    rule_ratio: float = 0.5,
+    noise: float = 0.1,
+    depth: int = 2,
+    annotated: bool = True,
+    with_qas: bool = False,
+) -> Dict:
+    """Generate a context in `default` format.
+
+    Parameters
+    ----------
+    rng: random.Random
+        Random generator, the output only depends on its state
+    num_sentences: int, default=4
+        Number of sentences
+    rule_ratio: float, default=0.5
+        Probability of a sentence to match :func:`uqa.qa_gen.rule1_ext` pattern
+    noise: float, default=0.1
+        Probability of a word to contain typographic characters
+    depth: int, default=2
+        Maximum number of nested ``PP`` / ``NP`` levels inside each top-level constituent
+    annotated: bool, default=True
+        If ``True`` set `entities` and `constituency` fields
+    with_qas: bool, default=False
+        If ``True`` set `qas` field
+
+    Returns
+    -------
+    dict
+        The context, without `id_context` field
+    """
+    builder = _Builder()
+    trees, entities, qas = [], [], []
+    for _ in range(num_sentences):
+        tree, sent_entities, qa = _sentence(builder, rng, rule_ratio, noise, depth)
+        trees.append(tree)
+        entities.extend(sent_entities)
+        if qa is not None:
+            qas.append(qa)
+    context = dict(text=builder.text())
+    if annotated:
+        context["entities"] = entities
+        context["constituency"] = trees
+    if with_qas:
+        context["qas"] = qas
+    return context
+
+
+def generate_articles(
+    num_articles: int = 100,
+    contexts_per_article: int = 5,
+    sentences_per_context: int = 4,
+    seed: int = 0,
+    base_article_id: int = 0,
+    **context_kwargs,
+) -> List[Dict]:
+    """Generate `num_articles` articles in `default` format.
+
+    Keyword Args
+    ------------
+    context_kwargs
+        Passed to :func:`generate_context`
+
+    Returns
+    -------
+    list of dict
+        The articles, identical for identical arguments
+    """
+    rng = random.Random(seed)
+    articles = []
+    for num_article in range(num_articles):
+        title = f"{rng.choice(ENTITIES[rng.choice(sorted(ENTITIES))])} ({num_article})"
+        contexts = []
+        for id_context in range(contexts_per_article):
+            context = dict(id_context=id_context)
+            context.update(generate_context(rng, sentences_per_context, **context_kwargs))
+            contexts.append(context)
+        articles.append(dict(id_article=base_article_id + num_article, title=title, contexts=contexts))
+    return articles
+
+
+def generate_fquad(num_articles: int = 100, contexts_per_article: int = 5, seed: int = 0, **kwargs) -> Dict:
+    """Generate a data container in `FQuAD` format, see :func:`generate_articles` for the arguments."""
+    kwargs.setdefault("with_qas", True)
+    articles = generate_articles(num_articles, contexts_per_article, seed=seed, **kwargs)
+    return fquad_utils.default_to_fquad(articles)
+
+
+def copy_articles(articles: List[Dict]) -> List[Dict]:
+    """Return a deep copy of `articles`, processing steps may modify their input in place."""
+    return copy.deepcopy(articles)
+
+
+@click.command()
+@click.argument("output_dir", type=click.Path(file_okay=False))
+@click.option("--num-files", type=click.IntRange(min=1), default=1, show_default=True, help="Number of files.")
+@click.option("--num-articles", type=click.IntRange(min=1), default=100, show_default=True, help="Articles per file.")
+@click.option("--contexts", type=click.IntRange(min=1), default=5, show_default=True, help="Contexts per article.")
+@click.option("--sentences", type=click.IntRange(min=1), default=4, show_default=True, help="Sentences per context.")
+@click.option("--depth", type=click.IntRange(min=0), default=2, show_default=True, help="Constituency tree depth.")
+@click.option("--raw", is_flag=True, help="Don't include entities and constituency annotations.")
+@click.option(
+    "-df", "--data-format", type=click.Choice(["default", "fquad"]), default="default", show_default=True,
+)
+@click.option("-of", "--output-format", type=click.Choice(["json", "jsonl"]), default="json", show_default=True)
+@click.option("--seed", type=click.INT, default=0, show_default=True)
+def main(output_dir, num_files, num_articles, contexts, sentences, depth, raw, data_format, output_format, seed):
+    """Generate a synthetic corpus in OUTPUT_DIR."""
+    if data_format == "fquad" and output_format == "jsonl":
+        raise click.UsageError("fquad data format can only be written in json file format")
+    os.makedirs(output_dir, exist_ok=True)
+    for num_file in range(num_files):
+        kwargs = dict(
+            sentences_per_context=sentences,
+            seed=seed + num_file,
+            base_article_id=num_file * num_articles,
+            depth=depth,
+            annotated=not raw,
+        )
+        if data_format == "fquad":
+            fcontent = generate_fquad(num_articles, contexts, **kwargs)
+        else:
+            fcontent = generate_articles(num_articles, contexts, **kwargs)
+        fpath = path.join(output_dir, f"synthetic_{num_file:04d}.{output_format}")
+        dataset.WRITERS[output_format](fpath, fcontent, override=True)
+        click.echo(fpath)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
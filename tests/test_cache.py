@@ -0,0 +1,80 @@
+"""Tests of :mod:`uqa.cache` annotation cache."""
+
+import itertools
+
+import pytest
+
+from uqa import cache as cache_
+
+
+def test_get_put_hits_and_misses(tmp_path):
+    fpath = str(tmp_path / "cache.sqlite")
+    with cache_.AnnotationCache(fpath) as cache:
+        assert cache.get("a") is None
+        cache.put("a", b"value")
+        assert cache.get("a") == b"value"
+        assert cache.get("b") is None
+        assert (cache.hits, cache.misses) == (1, 2)
+    with cache_.AnnotationCache(fpath) as cache:
+        assert cache.get("a") == b"value"
+
+
+def test_eviction_least_recently_used_first(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(cache_.time, "time", lambda: float(next(clock)))
+    with cache_.AnnotationCache(str(tmp_path / "cache.sqlite"), max_bytes=30, commit_every=1) as cache:
+        for key in "abc":
+            cache.put(key, b"0123456789")
+        assert cache.get("a") is not None
+        cache.put("d", b"0123456789")
+        # 40 bytes are evicted down to 27 bytes: the two least recently used entries are removed
+        assert [key for key in "abcd" if cache.get(key) is not None] == ["a", "d"]
+
+
+def test_stage_cache(tmp_path):
+    context = {"text": "Paul habite à Paris.", "entities": [{"start": 0, "end": 4, "label": "PER"}]}
+    with cache_.AnnotationCache(str(tmp_path / "cache.sqlite")) as cache:
+        ner_cache = cache_.StageCache(cache, "ner", ("entities",), "model-1.0")
+        loaded = {"text": context["text"]}
+        assert not ner_cache.load(loaded)
+        ner_cache.store(dict(context, other="not cached"))
+        assert ner_cache.load(loaded)
+        assert loaded == context
+        # Keys depend on the stage and the model
+        for stage, model_id in (("constituency", "model-1.0"), ("ner", "model-2.0")):
+            assert not cache_.StageCache(cache, stage, ("entities",), model_id).load({"text": context["text"]})
+
+
+def test_open_cache(tmp_path):
+    with cache_.open_cache(None) as cache:
+        assert cache is None
+    with cache_.open_cache(str(tmp_path / "cache.sqlite"), 10) as cache:
+        assert isinstance(cache, cache_.AnnotationCache)
+        assert cache.max_bytes == 10
+
+
+def test_pipe_articles_only_processes_misses(tmp_path):
+    spacy_utils = pytest.importorskip("uqa.spacy_utils")
+    processed = []
+
+    def docs_pipe(texts, as_tuples, batch_size, n_process):  # pylint: disable=unused-argument
+        for text, key in texts:
+            processed.append(text)
+            yield len(text), key
+
+    def annotate(doc, context):
+        context["length"] = doc
+
+    def articles():
+        for i, texts in enumerate((["a", "bb"], ["bb", "ccc"])):
+            yield "f", {"id_article": i, "contexts": [{"text": text} for text in texts]}
+
+    with cache_.AnnotationCache(str(tmp_path / "cache.sqlite")) as cache:
+        stage_cache = cache_.StageCache(cache, "length", ("length",), "")
+        first = list(spacy_utils.pipe_articles(articles(), None, annotate, docs_pipe=docs_pipe, cache=stage_cache))
+        assert processed == ["a", "bb", "bb", "ccc"]
+        processed.clear()
+        second = list(spacy_utils.pipe_articles(articles(), None, annotate, docs_pipe=docs_pipe, cache=stage_cache))
+        assert processed == []
+        assert second == first
+        assert [context["length"] for context in second[1][1]["contexts"]] == [2, 3]
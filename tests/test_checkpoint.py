@@ -0,0 +1,85 @@
+"""Tests of :mod:`uqa.checkpoint` journaling and resuming."""
+
+import os
+
+import pytest
+
+from uqa import checkpoint, dataset
+
+ARTICLES = [{"id_article": i, "title": f"a{i}", "contexts": []} for i in range(10)]
+
+
+class _Interrupted(KeyboardInterrupt):
+    """Simulate the interruption of the process."""
+
+
+def _stage(processed, fail_at=None):
+    def stage(article_it):
+        for fpath, article in article_it:
+            if article["id_article"] == fail_at:
+                raise _Interrupted()
+            processed.append(article["id_article"])
+            yield fpath, dict(article, processed=True)
+
+    return stage
+
+
+@pytest.mark.parametrize("fileformat", ["json", "jsonl"])
+def test_resume_after_interruption(tmp_path, fileformat):
+    fpath = str(tmp_path / "in.json")
+    datadumper = dataset.DataDumper(fileformat, dataset.DataDumper.path_in_dir(str(tmp_path / "out")))
+    output_path = datadumper.output_path(fpath)
+    journal_path = checkpoint.journal_path(datadumper, fpath)
+
+    processed = []
+    with pytest.raises(_Interrupted):
+        checkpoint.run_resumable(_stage(processed, fail_at=4), [(fpath, ARTICLES)], datadumper, "test")
+    assert processed == [0, 1, 2, 3]
+    assert os.path.exists(journal_path)
+    assert not os.path.exists(output_path)
+    assert not checkpoint.make_skip_cb(datadumper)(fpath)
+
+    processed = []
+    checkpoint.run_resumable(_stage(processed), [(fpath, ARTICLES)], datadumper, "test", resume=True)
+    assert processed == [4, 5, 6, 7, 8, 9]
+    assert not os.path.exists(journal_path)
+    assert list(dataset.READERS[fileformat](output_path)) == [dict(article, processed=True) for article in ARTICLES]
+    assert checkpoint.make_skip_cb(datadumper)(fpath)
+
+
+def test_no_resume_restarts(tmp_path):
+    fpath = str(tmp_path / "in.json")
+    datadumper = dataset.DataDumper("json", dataset.DataDumper.path_in_dir(str(tmp_path / "out")))
+    with pytest.raises(_Interrupted):
+        checkpoint.run_resumable(_stage([], fail_at=4), [(fpath, ARTICLES)], datadumper, "test")
+    processed = []
+    checkpoint.run_resumable(_stage(processed), [(fpath, ARTICLES)], datadumper, "test", resume=False)
+    assert processed == list(range(10))
+
+
+def test_other_stage_journal_not_resumed(tmp_path):
+    fpath = str(tmp_path / "in.json")
+    datadumper = dataset.DataDumper("json", dataset.DataDumper.path_in_dir(str(tmp_path / "out")))
+    with pytest.raises(_Interrupted):
+        checkpoint.run_resumable(_stage([], fail_at=4), [(fpath, ARTICLES)], datadumper, "test")
+    processed = []
+    checkpoint.run_resumable(_stage(processed), [(fpath, ARTICLES)], datadumper, "other", resume=True)
+    assert processed == list(range(10))
+
+
+def test_failed_file_is_counted_and_keeps_its_journal(tmp_path, caplog):
+    fpaths = [str(tmp_path / f"{name}.json") for name in "abc"]
+    datadumper = dataset.DataDumper("json", dataset.DataDumper.path_in_dir(str(tmp_path / "out")))
+
+    def stage(article_it):
+        for fpath, article in article_it:
+            if fpath == fpaths[1] and article["id_article"] == 4:
+                raise ValueError("failure")
+            yield fpath, article
+
+    data_it = [(fpath, ARTICLES) for fpath in fpaths]
+    assert checkpoint.run_resumable(stage, data_it, datadumper, "test") == 1
+    assert f"while processing {fpaths[1]}" in caplog.text
+    for fpath, done in zip(fpaths, [True, False, True]):
+        assert os.path.exists(datadumper.output_path(fpath)) == done
+        assert os.path.exists(checkpoint.journal_path(datadumper, fpath)) != done
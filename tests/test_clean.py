@@ -0,0 +1,119 @@
+"""Tests of :mod:`uqa.clean` text cleaning."""
+
+import random
+import unicodedata
+
+import pytest
+
+from uqa import clean
+
+#: Characters drawn to build the random texts: allowed, replaced, replaced by category and removed ones
+CHARS = clean.ALLOWED + list(clean.REPLACE_DICT) + [" ", " ", "–", "—", "ß", "ø", "\x00", "漢", "😀"]
+
+
+def _reference_clean_text(txt: str) -> str:
+    """Straightforward character by character :func:`.clean.clean_text`."""
+    allowed = set(clean.ALLOWED)
+    ret = []
+    for char in txt:
+        if char in allowed:
+            ret.append(char)
+        elif char in clean.REPLACE_DICT:
+            ret.append(clean.REPLACE_DICT[char])
+        else:
+            ret.append(clean.REPLACE_CAT.get(unicodedata.category(char), ""))
+    return "".join(ret)
+
+
+def _random_texts(num: int, seed: int = 0):
+    rand = random.Random(seed)
+    for _ in range(num):
+        yield "".join(rand.choice(CHARS) for _ in range(rand.randint(0, 200)))
+
+
+@pytest.mark.parametrize("translate_threshold", [1, 4, 64, 10000])
+def test_text_cleaner_matches_reference(translate_threshold):
+    cleaner = clean.TextCleaner(clean.ALLOWED, clean.REPLACE_DICT, clean.REPLACE_CAT, translate_threshold)
+    for txt in _random_texts(300):
+        assert cleaner(txt) == _reference_clean_text(txt)
+
+
+def test_clean_text_matches_reference():
+    for txt in _random_texts(300, seed=1):
+        assert clean.clean_text(txt) == _reference_clean_text(txt)
+    assert clean.clean_text("Le « chat » †") == 'Le " chat "  mort '
+
+
+def test_text_cleaner_chained_replacements():
+    # "b" is replaced with "c" which is itself replaced: the output must not be cleaned again
+    cleaner = clean.TextCleaner("a", {"b": "c", "c": "d"}, {})
+    assert cleaner("abcx") == "acd"
+    cleaner = clean.TextCleaner("a", {"b": "x", "x": "y"}, {})
+    assert cleaner("bxab") == "xyax"
+
+
+@pytest.mark.parametrize("limit", [None, 1, 5, 30])
+def test_count_alpha(limit):
+    for txt in _random_texts(300, seed=2):
+        expected = sum(char in clean.ALPHA_SET for char in txt)
+        count = clean.count_alpha(txt, limit)
+        if limit is None or expected < limit:
+            assert count == expected
+        else:
+            assert limit <= count <= expected
+
+
+def test_filters():
+    assert clean.MinAlphaFilter(3)("a1 b2 c3")
+    assert not clean.MinAlphaFilter(4)("a1 b2 c3")
+    assert clean.MaxLengthFilter(3)("abc") and not clean.MaxLengthFilter(2)("abc")
+    assert clean.MaxDigitRatioFilter(0.5)("ab12") and not clean.MaxDigitRatioFilter(0.4)("ab12")
+    assert clean.FrenchWordsFilter(0.5)("Le chat et la souris")
+    assert not clean.FrenchWordsFilter(0.5)("The cat and the mouse")
+    assert not clean.FrenchWordsFilter(0.5)("")
+
+
+def test_make_filters():
+    assert clean.make_filters() == []
+    filters = clean.make_filters(max_length=100, max_digit_ratio=0.1, min_french_ratio=0.2, min_num_alpha=10)
+    assert [type(f) for f in filters] == [
+        clean.MaxLengthFilter,
+        clean.MinAlphaFilter,
+        clean.MaxDigitRatioFilter,
+        clean.FrenchWordsFilter,
+    ]
+    assert [type(f) for f in clean.make_filters(min_num_alpha=10)] == [clean.MinAlphaFilter]
+
+
+ARTICLE = {
+    "id_article": 7,
+    "title": "t",
+    "contexts": [
+        {"id_context": 0, "text": "Le chat dort sur le canapé"},
+        {"id_context": 1, "text": "court"},
+        {"id_context": 2, "text": "1234567890 123456 le chat noir"},
+        {"id_context": 3, "text": "La souris est dans la cuisine"},
+    ],
+}
+
+
+def test_filter_article():
+    filtered, num_removed = clean.filter_article(ARTICLE, 10)
+    assert num_removed == 1
+    assert [context["text"] for context in filtered["contexts"]] == [ARTICLE["contexts"][i]["text"] for i in (0, 2, 3)]
+    assert [context["id_context"] for context in filtered["contexts"]] == [0, 1, 2]
+    filtered, num_removed = clean.filter_article(ARTICLE, 10, clean.make_filters(max_digit_ratio=0.3))
+    assert num_removed == 2
+    assert [context["text"] for context in filtered["contexts"]] == [ARTICLE["contexts"][i]["text"] for i in (0, 3)]
+    assert clean.filter_article(ARTICLE, 0)[1] == 0
+
+
+def test_filter_contexts_paths_agree():
+    filters = clean.make_filters(max_length=28)
+    expected, num_removed = clean.filter_article(ARTICLE, 10, filters)
+    assert num_removed == 3
+    assert clean.filter_contexts([ARTICLE, ARTICLE], 10, filters) == ([expected, expected], (6, 8))
+    articles = list(clean.filter_contexts_articles([("a", ARTICLE), ("b", ARTICLE)], 10, filters=filters))
+    assert articles == [("a", expected), ("b", expected)]
+    ((_, lazy),) = list(clean.filter_contexts_dl([("a", iter([ARTICLE]))], 10, filters=filters))
+    assert list(lazy) == [expected]
@@ -0,0 +1,128 @@
+"""Tests of :mod:`uqa.columnar` encoding."""
+
+import pickle
+import sys
+
+from uqa import columnar, context_utils, dataset
+
+ARTICLES = [
+    {
+        "id_article": 3,
+        "title": "Café",
+        "contexts": [
+            {"id_context": 0, "text": "Paul habite à Paris."},
+            {
+                "id_context": 1,
+                "text": "Marie est née en 1900 à Lyon. Elle y vit.",
+                "entities": [{"start": 0, "end": 5, "label": "PER"}, {"start": 24, "end": 28, "label": "LOC"}],
+                "constituency": [
+                    {
+                        "label": "SENT",
+                        "start": 0,
+                        "end": 29,
+                        "children": [
+                            {"label": "NP-SUJ", "start": 0, "end": 5, "children": []},
+                            {
+                                "label": "VN",
+                                "start": 6,
+                                "end": 15,
+                                "children": [{"label": "V", "start": 6, "end": 9, "children": []}],
+                            },
+                        ],
+                    },
+                    {"label": "SENT", "start": 30, "end": 41, "children": []},
+                ],
+                "qas": [{"question": "Où est née Marie ?", "answer": {"start": 24, "end": 28, "label": "LOC"}}],
+            },
+        ],
+    },
+    {"id_article": 4, "title": "", "contexts": []},
+    {"id_article": 5, "title": "Vide", "contexts": [{"id_context": 0, "text": "", "entities": [], "qas": []}]},
+]
+
+
+def test_columnar_round_trip(tmp_path):
+    fpath = str(tmp_path / "corpus.columnar")
+    columnar.dump(fpath, iter(ARTICLES))
+    corpus = columnar.ColumnarCorpus(fpath)
+    assert len(corpus) == len(ARTICLES)
+    assert list(corpus) == ARTICLES
+    assert corpus[-1] == ARTICLES[-1]
+    assert corpus[1:] == ARTICLES[1:]
+
+
+def test_columnar_dataset_io(tmp_path):
+    fpath = str(tmp_path / "corpus.columnar")
+    dataset.write_columnar(fpath, ARTICLES)
+    assert list(dataset.read_columnar(fpath)) == ARTICLES
+
+
+def test_columnar_accessors(tmp_path):
+    fpath = str(tmp_path / "corpus.columnar")
+    columnar.dump(fpath, ARTICLES)
+    corpus = columnar.ColumnarCorpus(fpath)
+    assert corpus.num_contexts == 3
+    assert list(corpus.article_contexts(0)) == [0, 1]
+    assert corpus.context_text(1) == ARTICLES[0]["contexts"][1]["text"]
+    assert list(corpus.entities(1)) == [(0, 5, "PER"), (24, 28, "LOC")]
+    roots = list(corpus.sentence_roots(1))
+    assert [corpus.node(i) for i in roots] == [(0, 29, "SENT"), (30, 41, "SENT")]
+    assert [corpus.node(i)[2] for i in corpus.node_children(roots[0])] == ["NP-SUJ", "VN"]
+    assert list(corpus.qas(1)) == [("Où est née Marie ?", 24, 28, "LOC")]
+    assert list(corpus.sentence_roots(0)) == [] and list(corpus.entities(2)) == []
+
+
+def test_columnar_dataloader(tmp_path):
+    dataset.write_columnar(str(tmp_path / "a.columnar"), ARTICLES)
+    ((fpath, fcontent),) = list(dataset.DirDataLoader(str(tmp_path), "columnar"))
+    assert fpath.endswith("a.columnar")
+    assert len(fcontent) == len(ARTICLES)
+    assert list(fcontent) == ARTICLES
+
+
+def _flat_json(tree):
+    """Return the json-like labels hierarchy `tree` nodes in pre-order, compared without recursion."""
+    ret, stack = [], [tree]
+    while stack:
+        node = stack.pop()
+        ret.append((node["label"], node["start"], node["end"], len(node["children"])))
+        stack.extend(reversed(node["children"]))
+    return ret
+
+
+def _deep_tree(depth):
+    """Return a json-like labels chain of `depth` nodes, deeper than the interpreter recursion limit."""
+    tree = {"label": "N", "start": 0, "end": depth, "children": []}
+    node = tree
+    for i in range(1, depth):
+        child = {"label": "N", "start": i, "end": depth, "children": []}
+        node["children"].append(child)
+        node = child
+    return tree
+
+
+def test_columnar_deep_tree(tmp_path):
+    tree = _deep_tree(2 * sys.getrecursionlimit())
+    articles = [{"id_article": 0, "title": "", "contexts": [{"id_context": 0, "text": "", "constituency": [tree]}]}]
+    fpath = str(tmp_path / "corpus.columnar")
+    columnar.dump(fpath, articles)
+    assert _flat_json(columnar.ColumnarCorpus(fpath).node_json(0)) == _flat_json(tree)
+
+
+def test_columnar_contexts_decode_constituents_lazily(tmp_path):
+    fpath = str(tmp_path / "corpus.columnar")
+    columnar.dump(fpath, ARTICLES)
+    (_, context, _) = list(context_utils.contextify([(fpath, columnar.ColumnarCorpus(fpath))]))
+    (eager_context,) = [context for context in context_utils.contextify([(fpath, ARTICLES)]) if context.constituents]
+    assert all(isinstance(root, context_utils.LazyLabelNode) for root in context.constituents)
+    assert not any(root.expanded for root in context.constituents)
+    assert [root.to_json() for root in context.constituents] == ARTICLES[0]["contexts"][1]["constituency"]
+    sent = context.constituents[0]
+    assert [child.label for child in sent.children] == ["NP-SUJ", "VN"]
+    assert sent.expanded and not any(child.expanded for child in sent.children)
+    assert list(sent.flat_iter()) == list(eager_context.constituents[0].flat_iter())
+    # Unexpanded columnar nodes are pickled with their json-like children
+    unpickled = pickle.loads(pickle.dumps(context.constituents[1:] + sent.children))
+    assert [node.to_json() for node in unpickled] == [
+        node.to_json() for node in eager_context.constituents[1:] + eager_context.constituents[0].children
+    ]
@@ -0,0 +1,202 @@
+"""Tests of :mod:`uqa.context_utils` span index."""
+
+import pickle
+import random
+import sys
+
+import pytest
+
+from uqa import context_utils, dataset
+
+
+def _random_labels(num: int, seed: int):
+    rand = random.Random(seed)
+    labels = []
+    for _ in range(num):
+        start = rand.randint(0, 100)
+        labels.append(context_utils.Label(start, start + rand.randint(0, 15), rand.choice(["PER", "LOC", "ORG"])))
+    return labels
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_span_index_matches_linear_scan(seed):
+    labels = _random_labels(60, seed)
+    index = context_utils.SpanIndex(labels)
+    assert len(index) == len(labels)
+    rand = random.Random(seed)
+    for _ in range(200):
+        start = rand.randint(-5, 110)
+        end = start + rand.randint(0, 30)
+        query = context_utils.Label(start, end, "")
+        assert index.contained(start, end) == [i for i, label in enumerate(labels) if label in query]
+        assert index.overlapping(start, end) == [
+            i for i, label in enumerate(labels) if label.start < end and start < label.end
+        ]
+
+
+def test_span_index_empty():
+    index = context_utils.SpanIndex([])
+    assert index.contained(0, 10) == []
+    assert index.overlapping(0, 10) == []
+
+
+def test_context_ner_index_follows_ner():
+    context = context_utils.Context("f", 0, "t", 0, "Paul habite à Paris.", ner=_random_labels(5, 0))
+    index = context.ner_index
+    assert context.ner_index is index
+    context.ner.append(context_utils.Label(0, 4, "PER"))
+    assert len(context.ner_index) == 6
+    context.ner = []
+    assert context.ner_index.contained(0, 100) == []
+
+
+def test_labels_accept_extra_attributes():
+    label = context_utils.LabelNode(0, 4, "NP", [context_utils.LabelNode(0, 2, "DET")], color="red")
+    assert vars(label) == {}
+    label.foo = 1
+    assert vars(label) == {"foo": 1}
+    assert label["foo"] == 1
+    assert "foo=1" in repr(label) and "extras={'color': 'red'}" in repr(label)
+    context = context_utils.Context("f", 0, "t", 0, "text")
+    context.foo = 2
+    assert vars(context) == {"foo": 2}
+
+
+TREE = {
+    "label": "SENT",
+    "start": 0,
+    "end": 10,
+    "children": [
+        {"label": "NP", "start": 0, "end": 4, "children": [{"label": "DET", "start": 0, "end": 2, "children": []}]},
+        {"label": "VN", "start": 5, "end": 10, "children": [], "color": "blue"},
+    ],
+}
+
+
+def test_lazy_label_node_pickling_stays_lazy():
+    expected = context_utils.LabelNode.from_json(TREE).to_json()
+    node = context_utils.LazyLabelNode.from_json(TREE)
+    node.foo = 1
+    unpickled = pickle.loads(pickle.dumps(node))
+    assert not node.expanded and not unpickled.expanded
+    assert unpickled.foo == 1
+    assert unpickled.to_json() == node.to_json() == expected
+    assert unpickled.children[1].extras == {"color": "blue"}
+    assert [child.expanded for child in unpickled.children] == [False, False]
+
+    unpickled = pickle.loads(pickle.dumps(node.children[0]))
+    assert node.expanded and unpickled.expanded is False
+    assert unpickled.to_json() == TREE["children"][0]
+    node.children[0].children  # pylint: disable=pointless-statement
+    assert pickle.loads(pickle.dumps(node)).to_json() == expected and node.children[0].expanded
+
+
+TEXT = "Émile Zola reste un lieu de mémoire très fréquenté"
+
+ARTICLES = [
+    {
+        "id_article": 0,
+        "title": "Zola",
+        "contexts": [
+            {
+                "id_context": 0,
+                "text": TEXT,
+                "entities": [{"start": 0, "end": 10, "label": "PER"}],
+                "constituency": [
+                    {
+                        "label": "SENT",
+                        "start": 0,
+                        "end": 50,
+                        "children": [
+                            {"label": "NP-SUJ", "start": 0, "end": 10, "children": []},
+                            {"label": "VN", "start": 11, "end": 16, "children": []},
+                            {
+                                "label": "NP-ATS",
+                                "start": 17,
+                                "end": 50,
+                                "children": [
+                                    {"label": "DET", "start": 17, "end": 19, "children": []},
+                                    {"label": "NC", "start": 20, "end": 24, "children": [], "color": "red"},
+                                ],
+                            },
+                        ],
+                    }
+                ],
+            },
+            {"id_context": 1, "text": "Sans annotation"},
+        ],
+    },
+    {
+        "id_article": 1,
+        "title": "Vide",
+        "contexts": [{"id_context": 0, "text": "Rien", "entities": [], "constituency": [], "qas": []}],
+    },
+]
+
+
+def test_lazy_contexts_match_eager_contexts():
+    eager = list(context_utils.contextify([("a.json", ARTICLES)]))
+    lazy = list(context_utils.contextify([("a.json", ARTICLES)], lazy=True))
+    assert list(context_utils.jsonify(lazy)) == list(context_utils.jsonify(eager))
+    for eager_context, lazy_context in zip(eager, lazy):
+        assert lazy_context.ner == eager_context.ner
+        assert [label for root in lazy_context.constituents for label in root.flat_iter()] == [
+            label for root in eager_context.constituents for label in root.flat_iter()
+        ]
+    assert lazy[0].constituents[0].children[2].children[1].extras == {"color": "red"}
+
+
+def test_lazy_qa_generation_matches_eager_generation(tmp_path):
+    qa_gen = pytest.importorskip("uqa.qa_gen")
+    fpath = str(tmp_path / "a.columnar")
+    dataset.write_columnar(fpath, ARTICLES)
+    eager = list(qa_gen.generate_qas_context_it(context_utils.contextify([(fpath, ARTICLES)])))
+    expected = list(context_utils.jsonify(eager))
+    assert [qa.question for qa in eager[0].qas] == ["Quel reste un lieu de mémoire très fréquenté ?"]
+    for context_it in (
+        context_utils.contextify([(fpath, ARTICLES)], lazy=True),
+        context_utils.contextify([(fpath, dataset.read_columnar(fpath))]),
+    ):
+        lazy = list(qa_gen.generate_qas_context_it(context_it))
+        assert list(context_utils.jsonify(lazy)) == expected
+        # Only the children of the sentence roots are decoded
+        assert not any(child.expanded for child in lazy[0].constituents[0].children)
+
+
+def test_label_node_copy_depth():
+    node = context_utils.LabelNode.from_json(TREE)
+    node.children[0].extras["color"] = "red"
+    assert node.copy().to_json() == node.to_json()
+    assert node.copy().children[0].extras == {"color": "red"}
+    assert node.copy(depth=1).to_json() == dict(
+        node.to_json(), children=[dict(child, children=[]) for child in node.to_json()["children"]]
+    )
+    assert node.copy(depth=0).children == []
+    copy = node.copy()
+    copy.children[0].children[0].label = "D"
+    assert node.children[0].children[0].label == "DET"
+
+
+def _flat_json(tree):
+    """Return the json-like labels hierarchy `tree` nodes in pre-order, compared without recursion."""
+    ret, stack = [], [tree]
+    while stack:
+        node = stack.pop()
+        ret.append((node["label"], node["start"], node["end"], len(node["children"])))
+        stack.extend(reversed(node["children"]))
+    return ret
+
+
+def test_label_node_deep_tree():
+    depth = 2 * sys.getrecursionlimit()
+    tree = {"label": "N", "start": 0, "end": depth, "children": []}
+    jnode = tree
+    for i in range(1, depth):
+        jnode["children"].append({"label": "N", "start": i, "end": depth, "children": []})
+        jnode = jnode["children"][0]
+    node = context_utils.LabelNode.from_json(tree)
+    assert len(list(node.flat_iter())) == depth
+    expected = _flat_json(tree)
+    assert _flat_json(node.to_json()) == expected
+    assert _flat_json(node.copy().to_json()) == expected
+    assert _flat_json(context_utils.LazyLabelNode.from_json(tree).to_json()) == expected
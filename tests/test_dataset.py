@@ -0,0 +1,243 @@
+"""Tests of :mod:`uqa.dataset` readers and writers."""
+
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from uqa import dataset
+
+ARTICLES = [
+    {"id_article": i, "title": f"Café {i}", "contexts": [{"id_context": 0, "text": "é \n «»"}]} for i in range(5)
+]
+
+
+def test_jsonl_round_trip(tmp_path):
+    fpath = str(tmp_path / "a.jsonl")
+    dataset.write_jsonl(fpath, iter(ARTICLES))
+    with open(fpath, encoding="utf8") as file:
+        assert len(file.readlines()) == len(ARTICLES)
+    fcontent = dataset.read_jsonl(fpath)
+    assert not isinstance(fcontent, list)
+    assert list(fcontent) == ARTICLES
+
+
+def test_jsonl_rejects_mapping(tmp_path):
+    with pytest.raises(ValueError):
+        dataset.write_jsonl(str(tmp_path / "a.jsonl"), {"version": "1.0", "data": []})
+
+
+@pytest.mark.parametrize("fileformat", ["json", "jsonl", "pickle"])
+def test_write_override(tmp_path, fileformat):
+    fpath = str(tmp_path / f"a.{fileformat}")
+    dataset.WRITERS[fileformat](fpath, ARTICLES[:1])
+    with pytest.raises(FileExistsError):
+        dataset.WRITERS[fileformat](fpath, ARTICLES)
+    dataset.WRITERS[fileformat](fpath, ARTICLES, override=True)
+    assert list(dataset.READERS[fileformat](fpath)) == ARTICLES
+
+
+@pytest.mark.parametrize("fileformat, filename", [("json", "a.json"), ("jsonl", "a.jsonl"), ("pickle", "a.pkl")])
+def test_write_failure_leaves_no_file(tmp_path, fileformat, filename):
+    def articles():
+        yield ARTICLES[0]
+        raise RuntimeError("interrupted")
+
+    fpath = str(tmp_path / filename)
+    fcontent = articles() if fileformat == "jsonl" else [{"id_article": 0, "title": "t", "contexts": [lambda: None]}]
+    with pytest.raises(Exception):
+        dataset.WRITERS[fileformat](fpath, fcontent)
+    assert os.listdir(tmp_path) == []
+
+
+DOCUMENTS = [
+    [],
+    {},
+    [1, -2.5, 3e10, 1234567890123, True, False, None, "", "a"],
+    {"a": {"b": [{"c": 'd"e\\'}, [], {}]}, "f": "[{,:}]", "g": -0.001},
+    [{"title": "Café \U0001F600", "contexts": [{"id_context": 12, "text": "é \n \t «»"}]}],
+    {"version": "1.0", "data": [{"title": "t", "paragraphs": [{"context": "x", "qas": []}, {"context": "y"}]}]},
+]
+
+
+def _walk(stream: dataset._JsonStream):  # pylint: disable=protected-access
+    """Rebuild the next JSON value of `stream` with its incremental accessors."""
+    char = stream.peek()
+    if char == "[":
+        return [_walk(stream) for _ in stream.iter_array()]
+    if char == "{":
+        return {key: _walk(stream) for key in stream.iter_object()}
+    return stream.value()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_json_stream_matches_json_loads(document, chunk_size):
+    text = json.dumps(document, indent=1)
+    stream = dataset._JsonStream(io.StringIO(text), chunk_size)  # pylint: disable=protected-access
+    assert _walk(stream) == json.loads(text)
+    assert stream.peek() == ""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5])
+def test_json_stream_number_at_chunk_boundary(chunk_size):
+    for text in ["[12345]", "[1.5e-3, 7]", "123456789"]:
+        stream = dataset._JsonStream(io.StringIO(text), chunk_size)  # pylint: disable=protected-access
+        assert _walk(stream) == json.loads(text)
+
+
+def test_json_stream_invalid():
+    stream = dataset._JsonStream(io.StringIO('{"a" 1}'), 2)  # pylint: disable=protected-access
+    with pytest.raises(ValueError):
+        _walk(stream)
+
+
+def test_read_json_incremental_fquad(tmp_path):
+    fpath = str(tmp_path / "fquad.json")
+    with open(fpath, "w", encoding="utf8") as file:
+        json.dump(DOCUMENTS[-1], file)
+    events = list(dataset.read_json_incremental(fpath, "fquad"))
+    assert events == [
+        ("root", "version", "1.0"),
+        ("paragraph", (0, 0), {"context": "x", "qas": []}),
+        ("paragraph", (0, 1), {"context": "y"}),
+        ("article", 0, {"title": "t", "paragraphs": 2}),
+        ("root", "data", 1),
+    ]
+
+
+def test_incremental_loader_matches_eager(tmp_path):
+    for i in range(3):
+        dataset.write_json(str(tmp_path / f"{i}.json"), ARTICLES[i:])
+    eager = [(fpath, fcontent) for fpath, fcontent in dataset.DirDataLoader(str(tmp_path), "json")]
+    incremental = [
+        (fpath, list(fcontent)) for fpath, fcontent in dataset.DirDataLoader(str(tmp_path), "json", incremental=True)
+    ]
+    assert incremental == eager
+
+
+def _write_files(dirpath, num: int, fileformat: str = "json"):
+    for i in range(num):
+        dataset.WRITERS[fileformat](str(dirpath / f"{i:02d}.{fileformat}"), ARTICLES[i % len(ARTICLES) :])
+
+
+@pytest.mark.parametrize("prefetch, prefetch_max_bytes", [(1, None), (3, None), (8, None), (3, 1)])
+def test_prefetch_matches_synchronous_reads(tmp_path, prefetch, prefetch_max_bytes):
+    _write_files(tmp_path, 7)
+    expected = list(dataset.DirDataLoader(str(tmp_path), "json"))
+    dataloader = dataset.DirDataLoader(str(tmp_path), "json", prefetch=prefetch, prefetch_max_bytes=prefetch_max_bytes)
+    assert list(dataloader) == expected
+    assert list(dataloader) == expected
+
+
+def test_prefetch_skips_files(tmp_path):
+    _write_files(tmp_path, 6)
+
+    def skip_cb(fpath):
+        return int(os.path.basename(fpath)[:2]) % 2 == 0
+
+    expected = list(dataset.DirDataLoader(str(tmp_path), "json", skip_file_cb=skip_cb))
+    assert [int(os.path.basename(fpath)[:2]) for fpath, _ in expected] == [1, 3, 5]
+    assert list(dataset.DirDataLoader(str(tmp_path), "json", skip_file_cb=skip_cb, prefetch=2)) == expected
+
+
+def test_prefetch_stops_early(tmp_path):
+    _write_files(tmp_path, 6)
+    dataloader = dataset.DirDataLoader(str(tmp_path), "json", prefetch=3)
+    for _ in dataloader:
+        break
+    assert len(list(dataloader)) == 6
+
+
+@pytest.mark.parametrize("fileformat", ["json", "jsonl", "pickle"])
+def test_background_save_matches_synchronous_save(tmp_path, fileformat):
+    def data():
+        for i in range(4):
+            # Lazy contents (written in the calling thread) interleaved with lists (written in background)
+            lazy = fileformat == "jsonl" and i % 2 == 0
+            yield f"{i}.{fileformat}", iter(ARTICLES[i:]) if lazy else ARTICLES[i:]
+
+    for background, dirname in ((False, "sync"), (True, "background")):
+        datadumper = dataset.DataDumper(
+            fileformat, dataset.DataDumper.path_in_dir(str(tmp_path / dirname)), background=background, max_pending=1
+        )
+        datadumper.save(data())
+    filenames = sorted(os.listdir(tmp_path / "sync"))
+    assert len(filenames) == 4
+    assert filenames == sorted(os.listdir(tmp_path / "background"))
+    for filename in filenames:
+        sync = dataset.READERS[fileformat](str(tmp_path / "sync" / filename))
+        assert list(dataset.READERS[fileformat](str(tmp_path / "background" / filename))) == list(sync)
+
+
+def test_background_save_writes_in_another_thread(tmp_path):
+    datadumper = dataset.DataDumper("json", dataset.DataDumper.path_in_dir(str(tmp_path)), background=True)
+    threads = []
+    write = datadumper._writer  # pylint: disable=protected-access
+
+    def recording_writer(*args, **kwargs):
+        threads.append(threading.current_thread())
+        write(*args, **kwargs)
+
+    datadumper._writer = recording_writer  # pylint: disable=protected-access
+    datadumper.save([("a.json", ARTICLES), ("b.json", ARTICLES)])
+    assert len(threads) == 2
+    assert all(thread is not threading.current_thread() for thread in threads)
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "b.json"]
+
+
+def test_background_save_raises_write_error(tmp_path):
+    dataset.write_json(str(tmp_path / "b.json"), [])
+    datadumper = dataset.DataDumper("json", dataset.DataDumper.path_in_dir(str(tmp_path)), background=True)
+    with pytest.raises(FileExistsError):
+        datadumper.save([(f"{name}.json", ARTICLES) for name in "abcd"])
+    assert "a.json" in os.listdir(tmp_path)
+
+
+#: Leading bytes of the compressed files
+MAGIC_BYTES = {"gz": b"\x1f\x8b", "bz2": b"BZh", "xz": b"\xfd7zXZ", "zst": b"\x28\xb5\x2f\xfd"}
+
+
+@pytest.mark.parametrize("compression", dataset.COMPRESSIONS)
+@pytest.mark.parametrize("fileformat", ["json", "jsonl", "pickle"])
+def test_compressed_round_trip(tmp_path, fileformat, compression):
+    if compression == "zst":
+        pytest.importorskip("zstandard")
+    fpath = str(tmp_path / f"a.{fileformat}.{compression}")
+    dataset.WRITERS[fileformat](fpath, ARTICLES, compresslevel=1)
+    with open(fpath, "rb") as file:
+        assert file.read(len(MAGIC_BYTES[compression])) == MAGIC_BYTES[compression]
+    assert list(dataset.READERS[fileformat](fpath)) == ARTICLES
+
+
+@pytest.mark.parametrize("compression", ["gz", "xz"])
+def test_compressed_files_discovery(tmp_path, compression):
+    dataset.write_jsonl(str(tmp_path / "a.jsonl"), ARTICLES)
+    dataset.write_jsonl(str(tmp_path / f"b.jsonl.{compression}"), ARTICLES)
+    dataset.write_json(str(tmp_path / f"c.json.{compression}"), ARTICLES)
+    data = [
+        (os.path.basename(fpath), list(fcontent)) for fpath, fcontent in dataset.DirDataLoader(str(tmp_path), "jsonl")
+    ]
+    assert data == [("a.jsonl", ARTICLES), (f"b.jsonl.{compression}", ARTICLES)]
+
+
+def test_datadumper_compression(tmp_path):
+    datadumper = dataset.DataDumper("jsonl", dataset.DataDumper.file_in_dir(str(tmp_path)), compression="bz2")
+    assert datadumper.output_path("in/a.jsonl") == str(tmp_path / "a.jsonl.bz2")
+    assert datadumper.output_path("in/a.jsonl.gz") == str(tmp_path / "a.jsonl.bz2")
+    datadumper.save([("in/a.jsonl.gz", iter(ARTICLES))])
+    assert list(dataset.read_jsonl(str(tmp_path / "a.jsonl.bz2"))) == ARTICLES
+    with pytest.raises(ValueError):
+        dataset.DataDumper("columnar", compression="gz")
+
+
+def test_compressed_write_failure_leaves_no_file(tmp_path):
+    def articles():
+        yield ARTICLES[0]
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        dataset.write_jsonl(str(tmp_path / "a.jsonl.gz"), articles())
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,132 @@
+"""Tests of :mod:`uqa.metrics` recording and reports."""
+
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from uqa import metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+def _articles(num: int):
+    for i in range(num):
+        yield "f", {"id_article": i, "contexts": [{"text": "abc"}, {"text": "de"}]}
+
+
+def test_measure_counts_stage_output():
+    assert len(list(metrics.measure("clean", _articles(3)))) == 3
+    stage = metrics.REGISTRY.stage("clean")
+    assert (stage.articles, stage.contexts, stage.chars) == (3, 6, 15)
+    assert sum(stage.latency_counts) == 6
+
+
+def test_measure_excludes_nested_stages_and_timers():
+    def slow_read(article_it):
+        for item in article_it:
+            with metrics.timer("read", "io"):
+                time.sleep(0.02)
+            yield item
+
+    inner = metrics.measure("inner", slow_read(_articles(3)))
+    assert len(list(metrics.measure("outer", inner))) == 3
+    io_time = metrics.REGISTRY.stage("read").io_time
+    assert io_time >= 0.06
+    assert metrics.REGISTRY.stage("inner").processing_time < io_time / 2
+    assert metrics.REGISTRY.stage("outer").processing_time < io_time / 2
+
+
+def test_timer_kinds():
+    with metrics.timer("ner", "model_load"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.timer("ner", "other"):
+            pass
+
+
+def test_add_time_from_threads():
+    def add():
+        for _ in range(10000):
+            metrics.REGISTRY.add_time("dump", "io", 1.0)
+
+    threads = [threading.Thread(target=add) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.REGISTRY.stage("dump").io_time == 80000.0
+
+
+def test_merge_snapshot():
+    list(metrics.measure("clean", _articles(2)))
+    snapshot = metrics.REGISTRY.snapshot()
+    metrics.REGISTRY.merge(snapshot)
+    stage = metrics.REGISTRY.stage("clean")
+    assert (stage.articles, stage.contexts, stage.chars) == (4, 8, 20)
+    assert sum(stage.latency_counts) == 8
+
+
+def test_prometheus_format():
+    list(metrics.measure("clean", _articles(2)))
+    metrics.REGISTRY.add_time("dump", "io", 1.5)
+    lines = metrics.REGISTRY.to_prometheus().splitlines()
+    assert "# TYPE uqa_contexts_total counter" in lines
+    assert 'uqa_contexts_total{stage="clean"} 4' in lines
+    assert 'uqa_chars_total{stage="clean"} 10' in lines
+    assert 'uqa_io_seconds_total{stage="dump"} 1.5' in lines
+    assert "# TYPE uqa_context_latency_seconds histogram" in lines
+    assert 'uqa_context_latency_seconds_bucket{stage="clean",le="+Inf"} 4' in lines
+    assert 'uqa_context_latency_seconds_count{stage="clean"} 4' in lines
+    buckets = [
+        int(line.split()[-1]) for line in lines if line.startswith('uqa_context_latency_seconds_bucket{stage="clean"')
+    ]
+    assert buckets == sorted(buckets)
+    for line in lines:
+        assert line.startswith("#") or len(line.split()) == 2
+
+
+@pytest.mark.parametrize("filename", ["metrics.prom", "metrics.json"])
+def test_write_report(tmp_path, filename):
+    list(metrics.measure("clean", _articles(2)))
+    fpath = str(tmp_path / filename)
+    metrics.REGISTRY.write_report(fpath)
+    with open(fpath, encoding="utf8") as file:
+        content = file.read()
+    if filename.endswith(".prom"):
+        assert content == metrics.REGISTRY.to_prometheus()
+    else:
+        report = json.loads(content)
+        assert report["stages"]["clean"]["contexts"] == 4
+        assert report["stages"]["clean"]["contexts_per_sec"] > 0
+    assert [path.name for path in tmp_path.iterdir()] == [filename]
+
+
+def test_progress_reporter(caplog):
+    list(metrics.measure("clean", _articles(2)))
+    caplog.set_level(logging.INFO, logger=metrics.__name__)
+    reporter = metrics.ProgressReporter(0.01)
+    reporter.start()
+    time.sleep(0.1)
+    reporter.stop()
+    reporter.join()
+    assert "[metrics] clean: 4 contexts" in caplog.text
+
+
+def test_report_metrics_only_on_request(tmp_path, caplog):
+    cli = pytest.importorskip("uqa.cli")
+    list(metrics.measure("clean", _articles(2)))
+    caplog.set_level(logging.INFO)
+    cli._report_metrics(None, None)  # pylint: disable=protected-access
+    assert "[metrics]" not in caplog.text
+    fpath = str(tmp_path / "metrics.prom")
+    cli._report_metrics(None, fpath)  # pylint: disable=protected-access
+    assert "[metrics] clean: 4 contexts" in caplog.text
+    assert [path.name for path in tmp_path.iterdir()] == ["metrics.prom"]
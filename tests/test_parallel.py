@@ -0,0 +1,73 @@
+"""Tests of :mod:`uqa.parallel` multi-process execution."""
+
+import os
+
+import pytest
+
+from uqa import checkpoint, dataset, parallel
+
+ARTICLES = [{"id_article": i, "title": f"a{i}", "contexts": []} for i in range(6)]
+
+
+def _stage(article_it):
+    for fpath, article in article_it:
+        if article["title"] == "fail":
+            raise ValueError("failure")
+        yield fpath, dict(article, title=article["title"].upper())
+
+
+def _step(dataloader, datadumper):
+    return checkpoint.run_resumable(_stage, dataloader, datadumper, "test")
+
+
+def _raising_step(dataloader, datadumper):
+    for fpath, fcontent in dataloader:
+        if any(article["title"] == "fail" for article in fcontent):
+            raise ValueError("failure")
+        datadumper.save([(fpath, fcontent)])
+
+
+def _make_dataset(dirpath, monkeypatch, failing=()):
+    """Write the input files in `dirpath` "in" directory, and move to `dirpath`: data paths are relative."""
+    monkeypatch.chdir(dirpath)
+    for i in range(5):
+        articles = [dict(article, title="fail") if i in failing else article for article in ARTICLES[i:]]
+        dataset.write_json(os.path.join("in", f"{i}.json"), articles)
+
+
+def _read_output(dirpath):
+    return {
+        fpath: dataset.read_json(os.path.join(dirpath, fpath))
+        for fpath in sorted(os.listdir(dirpath))
+        if not fpath.endswith(checkpoint.JOURNAL_SUFFIX)
+    }
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_workers_output_matches_sequential_output(tmp_path, monkeypatch, ordered):
+    _make_dataset(tmp_path, monkeypatch)
+    outputs = []
+    for workers in (0, 2):
+        dataloader = dataset.DirDataLoader("in", "json")
+        datadumper = dataset.DataDumper("json", dataset.DataDumper.dir_replacer("in", f"out{workers}"))
+        assert parallel.run(_step, dataloader, datadumper, workers, ordered) == 0
+        outputs.append(_read_output(f"out{workers}"))
+    assert len(outputs[0]) == 5
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_failed_files_are_counted(tmp_path, monkeypatch, workers):
+    _make_dataset(tmp_path, monkeypatch, failing=(1, 3))
+    dataloader = dataset.DirDataLoader("in", "json")
+    datadumper = dataset.DataDumper("json", dataset.DataDumper.dir_replacer("in", "out"))
+    assert parallel.run(_step, dataloader, datadumper, workers) == 2
+    assert sorted(_read_output("out")) == ["0.json", "2.json", "4.json"]
+
+
+def test_raising_step_failures_are_counted(tmp_path, monkeypatch):
+    _make_dataset(tmp_path, monkeypatch, failing=(2,))
+    dataloader = dataset.DirDataLoader("in", "json")
+    datadumper = dataset.DataDumper("json", dataset.DataDumper.dir_replacer("in", "out"))
+    assert parallel.run(_raising_step, dataloader, datadumper, workers=2) == 1
+    assert sorted(_read_output("out")) == ["0.json", "1.json", "3.json", "4.json"]
@@ -0,0 +1,105 @@
+"""Tests of :mod:`uqa.pipeline` single-pass processing and kept intermediates.
+
+The annotation stage requires SpaCy models, it is replaced by :func:`_annotate_articles` which sets known annotations.
+"""
+
+import os
+
+import pytest
+
+pipeline = pytest.importorskip("uqa.pipeline")
+from uqa import dataset  # pylint: disable=wrong-import-position
+
+TEXT = "Émile Zola reste un lieu de mémoire très fréquenté"
+
+#: Annotations of `TEXT`, a question is generated for its subject
+ANNOTATIONS = {
+    TEXT: {
+        "entities": [{"start": 0, "end": 10, "label": "PER"}],
+        "constituency": [
+            {
+                "label": "SENT",
+                "start": 0,
+                "end": 50,
+                "children": [
+                    {"label": "NP-SUJ", "start": 0, "end": 10, "children": []},
+                    {"label": "VN", "start": 11, "end": 16, "children": []},
+                    {"label": "NP-ATS", "start": 17, "end": 50, "children": []},
+                ],
+            }
+        ],
+    }
+}
+
+ARTICLES = [
+    {
+        "id_article": 0,
+        "title": "Zola",
+        "contexts": [{"id_context": 0, "text": TEXT}, {"id_context": 1, "text": "Trop court"}],
+    },
+    {"id_article": 1, "title": "Sans question", "contexts": [{"id_context": 0, "text": "Un texte sans annotation"}]},
+]
+
+
+def _annotate_articles(article_it, batch_size=64, cache=None):  # pylint: disable=unused-argument
+    for fpath, article in article_it:
+        for context in article["contexts"]:
+            context.update(ANNOTATIONS.get(context["text"], {"entities": [], "constituency": []}))
+        yield fpath, article
+
+
+@pytest.fixture(autouse=True)
+def _fake_annotation(monkeypatch):
+    monkeypatch.setattr(pipeline.annotate, "annotate_articles", _annotate_articles)
+
+
+def test_keep_intermediates(tmp_path):
+    datadumper = dataset.DataDumper("json", dataset.DataDumper.path_in_dir(str(tmp_path)))
+    intermediates = {stage: pipeline.intermediate_dumper(datadumper, stage) for stage in pipeline.STAGES}
+    datadumper.save(pipeline.run_dl([("a.json", ARTICLES)], min_num_alpha=15, intermediates=intermediates))
+
+    assert sorted(os.listdir(tmp_path)) == ["a.annotate.jsonl", "a.clean.jsonl", "a.json", "a.qas.jsonl"]
+    cleaned = list(dataset.read_jsonl(str(tmp_path / "a.clean.jsonl")))
+    assert [[context["text"] for context in article["contexts"]] for article in cleaned] == [
+        [TEXT],
+        ["Un texte sans annotation"],
+    ]
+    # Kept articles are copies, the annotations added in place by the following stages are not saved
+    assert all("entities" not in context for article in cleaned for context in article["contexts"])
+    annotated = list(dataset.read_jsonl(str(tmp_path / "a.annotate.jsonl")))
+    assert annotated[0]["contexts"][0]["entities"] == ANNOTATIONS[TEXT]["entities"]
+    assert all("qas" not in context for article in annotated for context in article["contexts"])
+    with_qas = list(dataset.read_jsonl(str(tmp_path / "a.qas.jsonl")))
+    assert [article["title"] for article in with_qas] == ["Zola"]
+    fquad = dataset.read_json(str(tmp_path / "a.json"))
+    qas = fquad["data"][0]["paragraphs"][0]["qas"]
+    assert qas[0]["question"] == "Quel reste un lieu de mémoire très fréquenté ?"
+    assert qas[0]["answers"][0]["text"] == "Émile Zola"
+
+
+def test_keep_aborts_on_error(tmp_path):
+    datadumper = pipeline.intermediate_dumper(
+        dataset.DataDumper("json", dataset.DataDumper.path_in_dir(str(tmp_path))), "clean"
+    )
+
+    def articles():
+        yield from dataset.to_articles([("a.json", ARTICLES)])
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        for _ in pipeline._keep(articles(), datadumper):  # pylint: disable=protected-access
+            pass
+    assert os.listdir(tmp_path) == []
+
+
+def test_run_command_keep_intermediates(tmp_path, monkeypatch):
+    cli = pytest.importorskip("uqa.cli")
+    click_testing = pytest.importorskip("click.testing")
+    monkeypatch.chdir(tmp_path)
+    dataset.write_json(os.path.join("raw", "a.json"), ARTICLES)
+    result = click_testing.CliRunner().invoke(
+        cli.main, ["--no-log", "run", "--keep-intermediates", "--filter-min-alpha", "15", "-d", "raw", "out"]
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(os.listdir("out")) == ["a.annotate.jsonl", "a.clean.jsonl", "a.json", "a.qas.jsonl"]
+    assert dataset.read_json(os.path.join("out", "a.json"))["data"][0]["title"] == "Zola"
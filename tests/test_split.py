@@ -0,0 +1,105 @@
+"""Tests of :mod:`uqa.split` splitting and renaming."""
+
+import os
+
+import pytest
+
+from uqa import dataset, split
+
+ARTICLES = [{"id_article": i, "title": f"a{i}", "contexts": []} for i in range(23)]
+
+
+def _make_dataset(dirpath, fileformat):
+    """Write `ARTICLES` in 3 files in `dirpath` "in" directory and return a data loader over them."""
+    for i, (start, end) in enumerate([(0, 10), (10, 11), (11, 23)]):
+        dataset.WRITERS[fileformat](str(dirpath / "in" / f"{i}.{fileformat}"), ARTICLES[start:end])
+    return dataset.DirDataLoader(str(dirpath / "in"), fileformat)
+
+
+def _read_splits(dirpath, fileformat="json"):
+    return {
+        fpath: list(dataset.READERS[fileformat](str(dirpath / fpath)))
+        for fpath in sorted(os.listdir(dirpath))
+        if os.path.isfile(dirpath / fpath)
+    }
+
+
+@pytest.mark.parametrize("fileformat, expected", [("jsonl", 23), ("columnar", 23), ("json", None), ("pickle", None)])
+def test_count_articles(tmp_path, fileformat, expected):
+    assert split.count_articles(_make_dataset(tmp_path, fileformat)) == expected
+
+
+def test_split_dl_padding(tmp_path):
+    dataloader = _make_dataset(tmp_path, "jsonl")
+    template = str(tmp_path / "out" / "s_{num}.json")
+    splits = list(split.split_dl(dataloader, template, 2))
+    assert [os.path.basename(fpath) for fpath, _ in splits] == [f"s_{i:02d}.json" for i in range(12)]
+    assert [article for _, fcontent in splits for article in fcontent] == ARTICLES
+    assert [len(fcontent) for _, fcontent in splits] == [2] * 11 + [1]
+    splits = list(split.split_dl(dataloader, template, 10, num_articles=1000))
+    assert [os.path.basename(fpath) for fpath, _ in splits] == ["s_00.json", "s_01.json", "s_02.json"]
+
+
+def test_split_dl_requires_count(tmp_path):
+    dataloader = _make_dataset(tmp_path, "json")
+    with pytest.raises(ValueError):
+        list(split.split_dl(dataloader, "s_{num}.json", 2))
+    assert len(list(split.split_dl(dataloader, "s_{num}.json", 2, width=0))) == 12
+
+
+def test_save_renamed_splits(tmp_path):
+    dataloader = _make_dataset(tmp_path, "json")
+    datadumper = dataset.DataDumper("json")
+    out_dir = tmp_path / "out"
+    assert split.save_renamed_splits(dataloader, datadumper, str(out_dir / "s_{num}.json"), 2) == 12
+    splits = _read_splits(out_dir)
+    assert list(splits) == [f"s_{i:02d}.json" for i in range(12)]
+    assert [article for fcontent in splits.values() for article in fcontent] == ARTICLES
+    # No temporary directory is left
+    assert sorted(os.listdir(out_dir)) == list(splits)
+
+
+def test_save_renamed_splits_detects_collisions_before_writing(tmp_path):
+    dataloader = _make_dataset(tmp_path, "json")
+    out_dir = tmp_path / "out"
+    template = str(out_dir / "s_{num}.json")
+    dataset.write_json(str(out_dir / "s_7.json"), [])
+    with pytest.raises(FileExistsError):
+        split.save_renamed_splits(dataloader, dataset.DataDumper("json"), template, 2)
+    assert os.listdir(out_dir) == ["s_7.json"]
+
+    assert split.save_renamed_splits(dataloader, dataset.DataDumper("json", override=True), template, 2) == 12
+    assert len(_read_splits(out_dir)) == 13
+
+
+def test_existing_splits(tmp_path):
+    for filename in ["s_0.json", "s_12.json", "s_x.json", "s_.json", "t_1.json", "s_1.json.gz"]:
+        (tmp_path / filename).touch()
+    datadumper = dataset.DataDumper("json")
+    assert split.existing_splits(datadumper, str(tmp_path / "s_{num}.json")) == [
+        str(tmp_path / "s_0.json"),
+        str(tmp_path / "s_12.json"),
+    ]
+    datadumper = dataset.DataDumper("json", compression="gz")
+    assert split.existing_splits(datadumper, str(tmp_path / "s_{num}.json")) == [str(tmp_path / "s_1.json.gz")]
+
+
+def test_unite_dl(tmp_path):
+    dataloader = _make_dataset(tmp_path, "json")
+    ((fpath, fcontent),) = list(split.unite_dl(dataloader, "all.json"))
+    assert fpath == "all.json"
+    assert fcontent == ARTICLES
+
+
+@pytest.mark.parametrize("fileformat, options", [("json", []), ("jsonl", []), ("jsonl", ["--rename"])])
+def test_split_command(tmp_path, fileformat, options):
+    cli = pytest.importorskip("uqa.cli")
+    click_testing = pytest.importorskip("click.testing")
+    _make_dataset(tmp_path, fileformat)
+    template = str(tmp_path / "out" / f"s_{{num}}.{fileformat}")
+    args = ["--no-log", "split", *options, "-if", fileformat, "-of", fileformat, "-d", "5", str(tmp_path / "in")]
+    result = click_testing.CliRunner().invoke(cli.main, [*args, template])
+    assert result.exit_code == 0, result.output
+    splits = _read_splits(tmp_path / "out", fileformat)
+    assert list(splits) == [f"s_{i}.{fileformat}" for i in range(5)]
+    assert [article for fcontent in splits.values() for article in fcontent] == ARTICLES
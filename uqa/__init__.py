@@ -35,6 +35,10 @@ Process a single json file ``"data.json"`` in `default` format with CLI::
     $ uqa qas constituency.json uqa.json
     $ uqa show -df fquad fquad.json
 
+Or in a single pass without intermediate files::
+
+    $ uqa run data.json uqa.json
+
 Process a single json file ``"data.json"`` in `default` format with a single script::
 
     from uqa import dataset, clean, ner, constituency, qa_gen, fquad_utils
@@ -0,0 +1,117 @@
+"""Fused NER and constituency parsing from a single spacy pipeline.
+
+Each context text is tokenized and parsed once, both `entities` and `constituency` are computed from the same Doc,
+the output is the same as running :mod:`uqa.ner` then :mod:`uqa.constituency` stages.
+"""
+
+import functools
+import logging
+from typing import Optional
+
+import spacy
+
+from uqa import cache as cache_, constituency, dataset, metrics, ner, spacy_utils
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+
+def set_annotations(doc: spacy.tokens.Doc, context: dataset.TJson) -> None:
+    """Set `context` 'entities' and 'constituency' from `doc`."""
+    ner.set_entities(doc, context)
+    constituency.set_constituency(doc, context)
+
+
+def load_model(model_name: str = "fr_core_news_md") -> spacy.language.Language:
+    """Load and return spacy `model_name` with `parser`, `ner` and the benepar component in the pipeline.
+
+    The model is cached: it is loaded once per process and shared by subsequent calls.
+    """
+    return constituency.load_model(model_name, disable=("tagger",))
+
+
+def stage_cache(
+    cache: Optional[cache_.AnnotationCache], model: spacy.language.Language
+) -> Optional[cache_.StageCache]:
+    """Return the :class:`.cache.StageCache` view of `cache` for annotation performed with `model`."""
+    stage = f"annotate:{constituency.BENEPAR_MODEL}"
+    return spacy_utils.stage_cache(cache, stage, ("entities", "constituency"), model)
+
+
+def annotate_dl(
+    data_it: dataset.DataIterable,
+    model_name: str = "fr_core_news_md",
+    batch_size: int = 64,
+    cache: Optional[cache_.AnnotationCache] = None,
+) -> dataset.DataIterable:
+    """Perform NER and constituency parsing on a dataset.
+
+    A file is yielded once all its articles are annotated, if its processing fails it is logged and skipped.
+    See :func:`annotate_articles` to stream the articles of large files instead.
+
+    Parameters
+    ----------
+    data_it: :obj:`.DataIterble`
+        A dateset iterable in `default` format.
+    model_name: str, default="fr_core_news_md"
+        The name of the spacy model to load, the model has to be locally installed prior to be used.
+    batch_size: int, default=64
+        Number of contexts per batch
+    cache: :class:`.cache.AnnotationCache`, default=None
+        If provided, annotations are looked up in and added to the cache
+
+    Returns
+    -------
+    :obj:`.DataIterble`
+        The processed dateset iterable.
+    """
+    model = load_model(model_name)
+    docs_pipe = functools.partial(constituency.bucketed_pipe, model)
+    annotate_cache = stage_cache(cache, model)
+    for fpath, fcontent in data_it:
+        logger.debug(f"Performing NER and constituency parsing on {fpath}")
+        try:
+            fcontent = list(
+                spacy_utils.pipe_fcontent(
+                    fcontent, model, set_annotations, batch_size, docs_pipe=docs_pipe, cache=annotate_cache
+                )
+            )
+        except Exception:  # pylint: disable=broad-except
+            logger.exception(f"while performing NER and constituency parsing on {fpath}")
+        else:
+            yield fpath, fcontent
+
+
+def annotate_articles(
+    article_it: dataset.ArticleIterable,
+    model_name: str = "fr_core_news_md",
+    batch_size: int = 64,
+    cache: Optional[cache_.AnnotationCache] = None,
+) -> dataset.ArticleIterable:
+    """Perform NER and constituency parsing on an article iterable.
+
+    Contexts of consecutive articles are processed in batches with :func:`.constituency.bucketed_pipe`,
+    each article is yielded as soon as all its contexts are processed.
+
+    Parameters
+    ----------
+    article_it: :obj:`.ArticleIterable`
+        An article iterable in `default` format.
+    model_name: str, default="fr_core_news_md"
+        The name of the spacy model to load, the model has to be locally installed prior to be used.
+    batch_size: int, default=64
+        Number of contexts per batch
+    cache: :class:`.cache.AnnotationCache`, default=None
+        If provided, annotations are looked up in and added to the cache
+
+    Returns
+    -------
+    :obj:`.ArticleIterable`
+        The processed article iterable.
+    """
+    with metrics.timer("annotate", "model_load"):
+        model = load_model(model_name)
+    docs_pipe = functools.partial(constituency.bucketed_pipe, model)
+    article_it = spacy_utils.pipe_articles(
+        article_it, model, set_annotations, batch_size, docs_pipe=docs_pipe, cache=stage_cache(cache, model)
+    )
+    yield from metrics.measure("annotate", article_it)
@@ -0,0 +1,175 @@
+"""On-disk content-addressed cache of context annotations.
+
+Annotations computed by the NER and constituency stages only depend on the context text, the model and the stage,
+:class:`AnnotationCache` stores them in a SQLite database keyed by a hash of those, so that re-running a stage on an
+updated corpus only processes the contexts which text changed.
+
+The cache size is bounded, least recently used entries are evicted first.
+
+Examples
+--------
+::
+
+    >>> with AnnotationCache("annotations.sqlite", max_bytes=2 ** 30) as cache:
+    ...     data_it = ner.ner_dl(dataloader, cache=cache)
+    ...     datadumper.save(data_it)
+"""
+
+import contextlib
+import hashlib
+import logging
+import sqlite3
+import time
+from typing import ContextManager, Dict, Iterable, Optional
+
+try:
+    import ujson as json
+except ModuleNotFoundError:
+    import json
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+#: Default maximum cache size in bytes
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+class AnnotationCache:
+    """Size bounded LRU key / value store backed by a SQLite database.
+
+    Access times and insertions are committed every `commit_every` operations and when the cache is closed,
+    eviction happens at commit time.
+
+    Attributes
+    ----------
+    fpath: str
+        Path of the SQLite database file
+    max_bytes: int
+        Maximum total size of the cached values
+    """
+
+    def __init__(self, fpath: str, max_bytes: int = DEFAULT_MAX_BYTES, commit_every: int = 1000):
+        self.fpath = fpath
+        self.max_bytes = max_bytes
+        self._commit_every = commit_every
+        self._connection = sqlite3.connect(fpath, timeout=60)
+        # Write-ahead logging lets the worker processes (see :mod:`uqa.parallel`) read while one of them commits
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS annotations "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS annotations_last_used ON annotations (last_used)")
+        self._connection.commit()
+        self._touched: Dict[str, float] = {}
+        self._num_ops = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored for `key` or ``None``."""
+        row = self._connection.execute("SELECT value FROM annotations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time()
+        self._tick()
+        return row[0]
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store `value` for `key`."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO annotations (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, value, len(value), time.time()),
+        )
+        self._tick()
+
+    def _tick(self) -> None:
+        self._num_ops += 1
+        if self._num_ops >= self._commit_every:
+            self.commit()
+
+    def commit(self) -> None:
+        """Write access times, evict least recently used entries above :attr:`max_bytes` and commit."""
+        self._connection.executemany(
+            "UPDATE annotations SET last_used = ? WHERE key = ?", [(t, key) for key, t in self._touched.items()]
+        )
+        self._touched.clear()
+        self._num_ops = 0
+        self._evict()
+        self._connection.commit()
+
+    def _evict(self) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM annotations").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the maximum size so that eviction does not run at every commit
+        to_free = total - self.max_bytes * 9 // 10
+        keys = []
+        for key, size in self._connection.execute("SELECT key, size FROM annotations ORDER BY last_used"):
+            if to_free <= 0:
+                break
+            keys.append((key,))
+            to_free -= size
+        self._connection.executemany("DELETE FROM annotations WHERE key = ?", keys)
+        logger.debug(f"Cache: evicted {len(keys)} entries")
+
+    def close(self) -> None:
+        """Commit and close the database connection."""
+        self.commit()
+        self._connection.close()
+        if self.hits or self.misses:
+            logger.info(f"Cache: {self.hits} hits / {self.hits + self.misses} lookups")
+
+    def __enter__(self) -> "AnnotationCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class StageCache:
+    """View of an :class:`AnnotationCache` for the annotation fields of a stage run with a given model.
+
+    Attributes
+    ----------
+    cache: :class:`AnnotationCache`
+        The underlying cache
+    stage: str
+        The stage name
+    fields: iterable of str
+        The context fields set by the stage
+    model_id: str
+        Model name and version, see :func:`.spacy_utils.model_id`
+    """
+
+    def __init__(self, cache: AnnotationCache, stage: str, fields: Iterable[str], model_id: str):
+        self.cache = cache
+        self.stage = stage
+        self.fields = tuple(fields)
+        self.model_id = model_id
+        self._prefix = f"{stage}\0{model_id}\0".encode("utf8")
+
+    def key(self, text: str) -> str:
+        """Return the cache key of `text`."""
+        return hashlib.sha256(self._prefix + text.encode("utf8")).hexdigest()
+
+    def load(self, context: Dict) -> bool:
+        """Set `context` cached annotations, return ``False`` if `context` text is not cached."""
+        value = self.cache.get(self.key(context["text"]))
+        if value is None:
+            return False
+        context.update(json.loads(value))
+        return True
+
+    def store(self, context: Dict) -> None:
+        """Cache `context` annotations."""
+        value = json.dumps({field: context[field] for field in self.fields}, ensure_ascii=False)
+        self.cache.put(self.key(context["text"]), value.encode("utf8"))
+
+
+def open_cache(fpath: Optional[str], max_bytes: int = DEFAULT_MAX_BYTES) -> ContextManager[Optional[AnnotationCache]]:
+    """Return an :class:`AnnotationCache` stored at `fpath`, or a context manager returning ``None`` if `fpath` is."""
+    if fpath is None:
+        return contextlib.nullcontext()
+    return AnnotationCache(fpath, max_bytes)
@@ -0,0 +1,212 @@
+"""Article-level checkpointing of long processing stages.
+
+While a file is processed by :func:`run_resumable`, each processed article is appended to a sidecar JSON-lines
+journal next to the output file (see :func:`journal_path`). The journal is removed once the output file is
+completely written, so an existing journal means that the processing of its file was interrupted.
+
+When resuming, the articles committed to the journal are not processed again: the processing continues
+from the first input article which is not in the journal, and the output file is written from the journaled
+articles followed by the newly processed ones.
+
+Examples
+--------
+::
+
+    >>> stage = functools.partial(ner.ner_articles, batch_size=128)
+    >>> run_resumable(stage, dataloader, datadumper, "ner", resume=True)
+"""
+
+import itertools
+import logging
+import os
+import time
+from os import path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+try:
+    import ujson as json
+except ModuleNotFoundError:
+    import json
+
+from uqa import dataset
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+#: Suffix appended to the output path of a file to get its journal path
+JOURNAL_SUFFIX = ".journal"
+
+#: A processing stage, takes an article iterable and yields every article, processed, in input order
+ArticleStage = Callable[[dataset.ArticleIterable], dataset.ArticleIterable]
+
+
+def journal_path(datadumper: dataset.DataDumper, fpath: str) -> str:
+    """Return the journal path of the input file `fpath` saved with `datadumper`."""
+    return datadumper.output_path(fpath) + JOURNAL_SUFFIX
+
+
+class Journal:
+    """Append-only JSON-lines journal of the processed articles of a file.
+
+    The first line is a header identifying the stage and the input file, the following lines are the articles.
+    An article is committed once its line is completely written, a trailing partial line left by an interruption
+    is discarded when resuming.
+
+    Attributes
+    ----------
+    fpath: str
+        Path of the journal file
+    header: dict
+        Journal header, a journal with another header is not resumed
+    sync_interval: float
+        Appended articles are flushed to the OS immediately, and synced to disk at most every `sync_interval` seconds
+    """
+
+    def __init__(self, fpath: str, stage: str, input_path: str, sync_interval: float = 5.0):
+        self.fpath = fpath
+        self.header = {"stage": stage, "input": input_path}
+        self.sync_interval = sync_interval
+        self._file = None
+        self._last_sync = 0.0
+
+    def open(self, resume: bool = False) -> List[dataset.TJson]:
+        """Open the journal for appending.
+
+        Parameters
+        ----------
+        resume: bool, default=False
+            If ``True`` and a journal with the same header exists, keep its committed articles,
+            else start a new journal.
+
+        Returns
+        -------
+        list of :obj:`.TJson`
+            The committed articles kept.
+        """
+        committed = self._read() if resume and path.exists(self.fpath) else None
+        if committed is None:
+            os.makedirs(path.dirname(self.fpath) or ".", exist_ok=True)
+            self._file = open(self.fpath, "wb")
+            self._write_line(self.header)
+            return []
+        articles, offset = committed
+        self._file = open(self.fpath, "r+b")
+        self._file.truncate(offset)
+        self._file.seek(offset)
+        return articles
+
+    def _read(self) -> Optional[Tuple[List[dataset.TJson], int]]:
+        """Return the committed articles and the offset of their end, ``None`` if the header doesn't match."""
+        articles, offset = [], 0
+        with open(self.fpath, "rb") as file:
+            for i, line in enumerate(file):
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    break
+                if i == 0:
+                    if obj != self.header:
+                        logger.warning(f"Journal {self.fpath} doesn't match {self.header}, starting over")
+                        return None
+                else:
+                    articles.append(obj)
+                offset += len(line)
+        if offset == 0:
+            return None
+        return articles, offset
+
+    def _write_line(self, obj: dataset.TJson) -> None:
+        self._file.write(json.dumps(obj, ensure_ascii=False).encode("utf8"))
+        self._file.write(b"\n")
+        self._file.flush()
+
+    def append(self, article: dataset.TJson) -> None:
+        """Commit `article` to the journal."""
+        self._write_line(article)
+        now = time.monotonic()
+        if now - self._last_sync >= self.sync_interval:
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+    def close(self) -> None:
+        """Close the journal file, it is kept on disk."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        """Close and delete the journal file."""
+        self.close()
+        if path.exists(self.fpath):
+            os.remove(self.fpath)
+
+
+def _journaled(
+    committed: List[dataset.TJson], article_it: dataset.ArticleIterable, journal: Journal
+) -> Iterable[dataset.TJson]:
+    yield from committed
+    for _, article in article_it:
+        journal.append(article)
+        yield article
+
+
+def run_resumable(
+    stage: ArticleStage,
+    data_it: dataset.DataIterable,
+    datadumper: dataset.DataDumper,
+    stage_name: str,
+    resume: bool = False,
+) -> int:
+    """Apply `stage` to the files of `data_it` and save them with `datadumper`, journaling the processed articles.
+
+    Files are processed and saved one at a time. If the processing of a file fails, the error is logged,
+    its journal is kept and the processing continues with the next file.
+
+    Parameters
+    ----------
+    stage: :obj:`ArticleStage`
+        The processing stage
+    data_it: :obj:`.DataIterable`
+        A dataset iterable in `default` format
+    datadumper: :class:`.dataset.DataDumper`
+        The data dumper used to save the processed files
+    stage_name: str
+        Identify the stage and its options, a journal written by another stage is not resumed.
+    resume: bool, default=False
+        If ``True``, continue the processing of files after the articles committed to their journal,
+        else process the files from the start.
+
+    Returns
+    -------
+    int
+        The number of files which processing failed
+    """
+    num_failed = 0
+    for fpath, fcontent in data_it:
+        journal = Journal(journal_path(datadumper, fpath), stage_name, fpath)
+        output_path = datadumper.output_path(fpath)
+        if path.exists(journal.fpath) and path.exists(output_path):
+            # The processing was interrupted, remove the partial output (i.e. with `jsonl` fileformat)
+            os.remove(output_path)
+        committed = journal.open(resume)
+        if committed:
+            logger.info(f"Resuming {fpath} after {len(committed)} committed articles")
+        try:
+            article_it = stage((fpath, article) for article in itertools.islice(fcontent, len(committed), None))
+            articles = _journaled(committed, article_it, journal)
+            datadumper.save([(fpath, articles if datadumper.fileformat == "jsonl" else list(articles))])
+        except Exception:  # pylint: disable=broad-except
+            num_failed += 1
+            logger.exception(f"while processing {fpath}:")
+            continue
+        finally:
+            journal.close()
+        journal.remove()
+    return num_failed
+
+
+def make_skip_cb(datadumper: dataset.DataDumper) -> Callable[[str], bool]:
+    """Return :meth:`.dataset.DataDumper.make_skip_cb` callback, not skipping files which have a journal."""
+    skip_cb = datadumper.make_skip_cb()
+    return lambda fpath: skip_cb(fpath) and not path.exists(journal_path(datadumper, fpath))
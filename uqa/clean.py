@@ -4,18 +4,36 @@ Impletent a 'clean' feature working at character level and a 'filter' feature wo
 at context level.
 """
 
+import collections
+import functools
 import logging
+import re
 import string
 import unicodedata
 from collections import defaultdict
-from typing import DefaultDict, List, Set
-
-from uqa import dataset
+from typing import (
+    Callable,
+    Counter as TCounter,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from uqa import dataset, metrics
 
 #: Valid letters in French (ascii letters and accented letters)
 ALPHA = list(string.ascii_letters)
 ALPHA.extend("À Â Ä Ç É È Ê Ë Î Ï Ô Ö Ù Û Ü Ÿ à â ä ç é è ê ë î ï ô ö ù û ü ÿ æ œ Æ Œ".split(" "))
 
+#: Set of valid letters, see :obj:`ALPHA`
+ALPHA_SET = frozenset(ALPHA)
+
 #: List of allowed characters
 ALLOWED = list(ALPHA)
 ALLOWED.extend("… § ‰".split(" "))
@@ -59,23 +77,129 @@ REPLACE_DICT = {
 }
 
 
+#: Frequent French words, used by :class:`FrenchWordsFilter`
+FRENCH_WORDS = frozenset(
+    "le la les un une des de du au aux et ou en dans par pour sur sous avec sans que qui ne pas plus est sont "
+    "il elle ils elles se ce cette ces son sa ses leur leurs a été fut était entre comme mais".split()
+)
+
+#: A context filter, returns ``True`` if the context text passed is kept, must be picklable to be used with workers
+ContextFilter = Callable[[str], bool]
+
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+_ALPHA_DELETE = {ord(c): None for c in ALPHA_SET}
+_DIGITS_PATTERN = re.compile("[0-9]")
+_FRENCH_WORDS_CASED = FRENCH_WORDS.union(word.capitalize() for word in FRENCH_WORDS)
 
-def count_alpha(txt: str) -> int:
+
+def count_alpha(txt: str, limit: Optional[int] = None) -> int:
     """Return the number of letters in `txt`.
 
     Parameters
     ----------
     txt: str
         A string
+    limit: int, default=None
+        If provided, the count may stop early once `limit` letters have been found, the returned value is then
+        greater than or equal to `limit` but may be lower than the actual number of letters.
 
     Returns
     -------
     int
         the number of character of `txt` that are in :obj:`ALPHA`
     """
-    return len([c for c in txt if c in ALPHA])
+    if limit is not None and len(txt) > 2 * limit:
+        head = len(txt[: 2 * limit]) - len(txt[: 2 * limit].translate(_ALPHA_DELETE))
+        if head >= limit:
+            return head
+    return len(txt) - len(txt.translate(_ALPHA_DELETE))
+
+
+class MinAlphaFilter:
+    """:obj:`ContextFilter` keeping contexts with at least `min_num_alpha` letters."""
+
+    def __init__(self, min_num_alpha: int):
+        self.min_num_alpha = min_num_alpha
+
+    def __call__(self, txt: str) -> bool:
+        return count_alpha(txt, self.min_num_alpha) >= self.min_num_alpha
+
+
+class MaxLengthFilter:
+    """:obj:`ContextFilter` keeping contexts with at most `max_length` characters."""
+
+    def __init__(self, max_length: int):
+        self.max_length = max_length
+
+    def __call__(self, txt: str) -> bool:
+        return len(txt) <= self.max_length
+
+
+class MaxDigitRatioFilter:
+    """:obj:`ContextFilter` keeping contexts whose ratio of digits among their characters is at most `max_ratio`."""
+
+    def __init__(self, max_ratio: float):
+        self.max_ratio = max_ratio
+
+    def __call__(self, txt: str) -> bool:
+        return len(_DIGITS_PATTERN.findall(txt)) <= self.max_ratio * len(txt)
+
+
+class FrenchWordsFilter:
+    """:obj:`ContextFilter` keeping contexts whose ratio of words in :obj:`FRENCH_WORDS` is at least `min_ratio`,
+    a cheap language heuristic."""
+
+    def __init__(self, min_ratio: float):
+        self.min_ratio = min_ratio
+
+    def __call__(self, txt: str) -> bool:
+        words = txt.split()
+        return len(words) > 0 and sum(map(_FRENCH_WORDS_CASED.__contains__, words)) >= self.min_ratio * len(words)
+
+
+def make_filters(
+    max_length: Optional[int] = None,
+    max_digit_ratio: Optional[float] = None,
+    min_french_ratio: Optional[float] = None,
+    min_num_alpha: Optional[int] = None,
+) -> List[ContextFilter]:
+    """Return the list of context filters for the given thresholds, cheapest first, ``None`` thresholds are disabled.
+
+    Parameters
+    ----------
+    max_length: int, default=None
+        See :class:`MaxLengthFilter`
+    max_digit_ratio: float, default=None
+        See :class:`MaxDigitRatioFilter`
+    min_french_ratio: float, default=None
+        See :class:`FrenchWordsFilter`
+    min_num_alpha: int, default=None
+        See :class:`MinAlphaFilter`
+
+    Returns
+    -------
+    list of :obj:`ContextFilter`
+        The filters, to be passed to :func:`filter_contexts` and related functions
+    """
+    filters: List[ContextFilter] = []
+    if max_length is not None:
+        filters.append(MaxLengthFilter(max_length))
+    if min_num_alpha is not None:
+        filters.append(MinAlphaFilter(min_num_alpha))
+    if max_digit_ratio is not None:
+        filters.append(MaxDigitRatioFilter(max_digit_ratio))
+    if min_french_ratio is not None:
+        filters.append(FrenchWordsFilter(min_french_ratio))
+    return filters
+
+
+def keep_context(txt: str, filters: Sequence[ContextFilter]) -> bool:
+    """Return ``True`` if the context text `txt` passes all the `filters`, stopping at the first failing one."""
+    for context_filter in filters:
+        if not context_filter(txt):
+            return False
+    return True
 
 
 def extract_bad_char(txt: str) -> Set[str]:
@@ -116,6 +240,102 @@ def classify_bad_chars(bad_chars: Set[str]) -> DefaultDict[str, List[str]]:
     return bad_chars_cat
 
 
+class TextCleaner:
+    """Precompiled :func:`clean_text` engine.
+
+    Each character is resolved once into its replacement (itself for kept characters, an empty string for removed
+    ones): allowed characters and :obj:`REPLACE_DICT` entries at creation, other characters from their unicode
+    category on their first occurence. Resolutions are memoised across calls in :attr:`table`.
+
+    A text is cleaned in a single pass of :meth:`str.translate` when it contains many distinct illegal characters.
+    Otherwise, which is the common case, one :meth:`str.replace` pass per illegal character is faster; removals
+    are applied before replacements so that the output is the same as the single pass, and the single pass is
+    always used if a replacement contains a character which would be replaced again.
+
+    Parameters
+    ----------
+    allowed: iterable of str
+        Characters kept as is
+    replace_dict: mapping of str: str
+        Character replacements
+    replace_cat: mapping of str: str
+        Unicode category replacements, for characters neither allowed nor in `replace_dict`
+    translate_threshold: int, default=64
+        Minimum number of distinct illegal characters in a text to clean it with :meth:`str.translate`
+
+    Attributes
+    ----------
+    table: dict of int: str
+        :meth:`str.translate` table of the resolved characters
+    """
+
+    def __init__(
+        self,
+        allowed: Iterable[str],
+        replace_dict: Mapping[str, str],
+        replace_cat: Mapping[str, str],
+        translate_threshold: int = 64,
+    ):
+        self.replace_cat = dict(replace_cat)
+        self.translate_threshold = translate_threshold
+        self.table: Dict[int, str] = dict()
+        self._kept: Set[str] = set()
+        self._outputs: Set[str] = set()
+        self._chained = False
+        for char in allowed:
+            self._set(char, char)
+        for char, replacement in replace_dict.items():
+            if char not in self._kept:
+                self._set(char, replacement)
+
+    def _set(self, char: str, replacement: str) -> None:
+        self.table[ord(char)] = replacement
+        if replacement == char:
+            self._kept.add(char)
+        if replacement in ("", char):
+            return
+        self._outputs.update(replacement)
+        if char in self._outputs or any(self.resolve(out) not in (out, "") for out in replacement):
+            self._chained = True
+
+    def resolve(self, char: str) -> str:
+        """Return the replacement of `char`, itself if it is kept."""
+        replacement = self.table.get(ord(char))
+        if replacement is None:
+            self._set(char, self.replace_cat.get(unicodedata.category(char), ""))
+            replacement = self.table[ord(char)]
+        return replacement
+
+    def __call__(self, txt: str) -> str:
+        """Return `txt` cleaned."""
+        bad_chars = set(txt)
+        bad_chars -= self._kept
+        if not bad_chars:
+            return txt
+        resolved = [(char, self.resolve(char)) for char in bad_chars]
+        if self._chained or len(resolved) >= self.translate_threshold:
+            return txt.translate(self.table)
+        replacements = []
+        for char, replacement in resolved:
+            if not replacement:
+                txt = txt.replace(char, "")
+            elif replacement != char:
+                replacements.append((char, replacement))
+        for char, replacement in replacements:
+            txt = txt.replace(char, replacement)
+        return txt
+
+
+@functools.lru_cache(maxsize=None)
+def text_cleaner() -> TextCleaner:
+    """Return the :class:`TextCleaner` built from :obj:`ALLOWED`, :obj:`REPLACE_DICT` and :obj:`REPLACE_CAT`.
+
+    The cleaner is shared by all calls to :func:`clean_text`, call ``text_cleaner.cache_clear()``
+    after modifying these constants.
+    """
+    return TextCleaner(ALLOWED, REPLACE_DICT, REPLACE_CAT)
+
+
 def clean_text(txt: str) -> str:
     """Clean and return `txt` either removing or replacing illegal characters.
 
@@ -123,6 +343,10 @@ def clean_text(txt: str) -> str:
     Illegal characters are replaced if they have an entry in :const:`REPLACE_DICT` or if their unicode category
     have an entry in :const:`REPLACE_CAT`.
 
+    The text is processed by the shared :class:`TextCleaner` (see :func:`text_cleaner`): with less than
+    :attr:`TextCleaner.translate_threshold` distinct illegal characters, one :meth:`str.replace` pass per illegal
+    character, else a single :meth:`str.translate` pass.
+
     Parameters
     ----------
     txt: str
@@ -133,19 +357,7 @@ def clean_text(txt: str) -> str:
     ret: str
         The string with illegal characters eiter replaced or removed.
     """
-    bad_chars = extract_bad_char(txt)
-    replace_dict = dict()
-    for bad_char in bad_chars:
-        if bad_char in REPLACE_DICT:
-            replace_dict[bad_char] = REPLACE_DICT[bad_char]
-        else:
-            bad_char_cat = unicodedata.category(bad_char)
-            if bad_char_cat in REPLACE_CAT:
-                replace_dict[bad_char] = REPLACE_DICT[bad_char_cat]
-
-    for bad_char in bad_chars:
-        txt = txt.replace(bad_char, replace_dict.get(bad_char, ""))
-    return txt
+    return text_cleaner()(txt)
 
 
 def clean(fcontent: dataset.TJson) -> dataset.TJson:
@@ -168,6 +380,24 @@ def clean(fcontent: dataset.TJson) -> dataset.TJson:
     return fcontent
 
 
+def clean_article(article: dataset.TJson) -> dataset.TJson:
+    """Clean in place the contexts text of `article` in 'default' data format and return it.
+
+    Parameters
+    ----------
+    article: :obj:`.TJson`
+        An article in `default` data format
+
+    Returns
+    -------
+    :obj:`.TJson`
+        The processed article
+    """
+    for context in article["contexts"]:
+        context["text"] = clean_text(context["text"])
+    return article
+
+
 def clean_dl(data_it: dataset.DataIterable):
     """Iterate through the dataset in 'default' data format.
 
@@ -185,14 +415,31 @@ def clean_dl(data_it: dataset.DataIterable):
         The processed file content in default data format
     """
     for fpath, fcontent in data_it:
-        print(f"Processing {fpath}")
-        for article in fcontent:
-            for context in article["contexts"]:
-                context["text"] = clean_text(context["text"].encode().decode("utf8"))
-        yield fpath, fcontent
+        logger.debug(f"Processing {fpath}")
+        yield fpath, dataset.map_articles(fcontent, clean_article)
 
 
-def filter_contexts(fcontent: dataset.TJson, min_num_alpha: int = 10) -> dataset.TJson:
+def clean_articles(article_it: dataset.ArticleIterable) -> dataset.ArticleIterable:
+    """Clean each article of an article iterable in 'default' data format.
+
+    Parameters
+    ----------
+    article_it: :obj:`.ArticleIterable`
+        Article iterable in `default` data format
+
+    Yields
+    ------
+    fpath: str
+        The article file path
+    article: json-like
+        The processed article
+    """
+    yield from metrics.measure("clean", ((fpath, clean_article(article)) for fpath, article in article_it))
+
+
+def filter_contexts(
+    fcontent: dataset.TJson, min_num_alpha: int = 10, filters: Sequence[ContextFilter] = ()
+) -> dataset.TJson:
     """Filter contexts of all articles in `fcontent`.
 
     Parameters
@@ -201,6 +448,8 @@ def filter_contexts(fcontent: dataset.TJson, min_num_alpha: int = 10) -> dataset
         Json-like container in default data format
     min_num_alpha: int
         Minimum number of letters if the context to be valid.
+    filters: sequence of :obj:`ContextFilter`, default=()
+        Further filters a context must pass to be valid, see :func:`make_filters`
 
     Returns
     -------
@@ -210,24 +459,90 @@ def filter_contexts(fcontent: dataset.TJson, min_num_alpha: int = 10) -> dataset
     num_removed = 0
     num_total = 0
     new_fcontent = []
+    context_filters = _context_filters(min_num_alpha, filters)
     for article in fcontent:
-        new_article = dict(id_article=article["id_article"], title=article["title"],)
-        new_id_context = 0
-        new_contexts = list()
+        new_article, article_removed = _filter_article(article, context_filters)
+        num_removed += article_removed
         num_total += len(article["contexts"])
-        for context in article["contexts"]:
-            if count_alpha(context["text"]) < min_num_alpha:
-                num_removed += 1
-            else:
-                new_context = dict(id_context=new_id_context, text=context["text"])
-                new_contexts.append(new_context)
-                new_id_context += 1
-        new_article["contexts"] = new_contexts
         new_fcontent.append(new_article)
     return new_fcontent, (num_removed, num_total)
 
 
-def filter_contexts_dl(data_it: dataset.DataIterable, min_num_alpha: int = 10, detailed=False):
+def filter_article(
+    article: dataset.TJson, min_num_alpha: int = 10, filters: Sequence[ContextFilter] = ()
+) -> Tuple[dataset.TJson, int]:
+    """Filter the contexts of `article`.
+
+    Parameters
+    ----------
+    article: json-like
+        An article in default data format
+    min_num_alpha: int
+        Minimum number of letters if the context to be valid.
+    filters: sequence of :obj:`ContextFilter`, default=()
+        Further filters a context must pass to be valid, applied after the letters count
+
+    Returns
+    -------
+    filtered_article: json-like
+        The processed article in default data format
+    num_removed: int
+        The number of removed contexts
+    """
+    return _filter_article(article, _context_filters(min_num_alpha, filters))
+
+
+def _context_filters(min_num_alpha: int, filters: Sequence[ContextFilter]) -> List[ContextFilter]:
+    """Return a :class:`MinAlphaFilter` followed by `filters`."""
+    return make_filters(min_num_alpha=min_num_alpha) + list(filters)
+
+
+def _filter_article(article: dataset.TJson, filters: Sequence[ContextFilter]) -> Tuple[dataset.TJson, int]:
+    """Filter the contexts of `article` with `filters`, see :func:`filter_article`."""
+    num_removed = 0
+    new_article = dict(id_article=article["id_article"], title=article["title"],)
+    new_id_context = 0
+    new_contexts = list()
+    for context in article["contexts"]:
+        text = context["text"]
+        if not keep_context(text, filters):
+            num_removed += 1
+        else:
+            new_context = dict(id_context=new_id_context, text=text)
+            new_contexts.append(new_context)
+            new_id_context += 1
+    new_article["contexts"] = new_contexts
+    return new_article, num_removed
+
+
+def _iter_filter_contexts(
+    fcontent: Iterable[dataset.TJson],
+    min_num_alpha: int,
+    filters: Sequence[ContextFilter],
+    counts: TCounter[str],
+    detailed: bool,
+) -> Iterable[dataset.TJson]:
+    """Lazy version of :func:`filter_contexts`, removed and total contexts are counted in `counts`."""
+    num_removed = 0
+    num_total = 0
+    context_filters = _context_filters(min_num_alpha, filters)
+    for article in fcontent:
+        new_article, article_removed = _filter_article(article, context_filters)
+        num_removed += article_removed
+        num_total += len(article["contexts"])
+        yield new_article
+    if detailed:
+        logger.info(f"Removed contexts: {num_removed} /  {num_total}")
+    counts["removed"] += num_removed
+    counts["total"] += num_total
+
+
+def filter_contexts_dl(
+    data_it: dataset.DataIterable,
+    min_num_alpha: int = 10,
+    detailed=False,
+    filters: Sequence[ContextFilter] = (),
+):
     """Filter all contexts in the dataset.
 
     Parameters
@@ -239,6 +554,8 @@ def filter_contexts_dl(data_it: dataset.DataIterable, min_num_alpha: int = 10, d
         Minimum number of letters if the context to be valid, defaults to 10.
     detailed: bool, optional
         If True, logs per file number of removed context
+    filters: sequence of :obj:`ContextFilter`, optional
+        Further filters a context must pass to be valid, see :func:`make_filters`
 
     Yields
     ------
@@ -247,13 +564,67 @@ def filter_contexts_dl(data_it: dataset.DataIterable, min_num_alpha: int = 10, d
     filtered_fcontent: json-like
         The processed file content in default data format
     """
-    sum_removed = 0
-    sum_total = 0
+    counts: TCounter[str] = collections.Counter()
     for fpath, fcontent in data_it:
-        filtered, (num_removed, num_total) = filter_contexts(fcontent, min_num_alpha)
+        if not isinstance(fcontent, list):
+            # Lazy file content, counts are updated once the content is consumed
+            yield fpath, _iter_filter_contexts(fcontent, min_num_alpha, filters, counts, detailed)
+            continue
+        filtered, (num_removed, num_total) = filter_contexts(fcontent, min_num_alpha, filters)
         if detailed:
             logger.info(f"Removed contexts: {num_removed} /  {num_total}")
-        sum_removed += num_removed
-        sum_total += num_total
+        counts["removed"] += num_removed
+        counts["total"] += num_total
+        yield fpath, filtered
+    logger.info(f"TOTAL: Removed contexts: {counts['removed']} / {counts['total']}")
+
+
+def filter_contexts_articles(
+    article_it: dataset.ArticleIterable,
+    min_num_alpha: int = 10,
+    detailed: bool = False,
+    filters: Sequence[ContextFilter] = (),
+) -> dataset.ArticleIterable:
+    """Filter all contexts of an article iterable.
+
+    Parameters
+    ----------
+    article_it: :obj:`.ArticleIterable`
+        Article iterable in `default` data format
+    min_num_alpha: int, optional
+        Minimum number of letters if the context to be valid, defaults to 10.
+    detailed: bool, optional
+        If True, logs per file number of removed context
+    filters: sequence of :obj:`ContextFilter`, optional
+        Further filters a context must pass to be valid, see :func:`make_filters`
+
+    Yields
+    ------
+    fpath: str
+        The article file path
+    filtered_article: json-like
+        The processed article
+    """
+    yield from metrics.measure("filter", _iter_filter_articles(article_it, min_num_alpha, filters, detailed))
+
+
+def _iter_filter_articles(
+    article_it: dataset.ArticleIterable, min_num_alpha: int, filters: Sequence[ContextFilter], detailed: bool
+) -> dataset.ArticleIterable:
+    counts: TCounter[str] = collections.Counter()
+    cur_fpath = None
+    context_filters = _context_filters(min_num_alpha, filters)
+    for fpath, article in article_it:
+        if detailed and fpath != cur_fpath and cur_fpath is not None:
+            logger.info(f"Removed contexts: {counts['file_removed']} /  {counts['file_total']}")
+            counts["file_removed"] = counts["file_total"] = 0
+        cur_fpath = fpath
+        filtered, num_removed = _filter_article(article, context_filters)
+        counts["file_removed"] += num_removed
+        counts["file_total"] += len(article["contexts"])
+        counts["removed"] += num_removed
+        counts["total"] += len(article["contexts"])
         yield fpath, filtered
-    logger.info(f"TOTAL: Removed contexts: {sum_removed} / {sum_total}")
+    if detailed and cur_fpath is not None:
+        logger.info(f"Removed contexts: {counts['file_removed']} /  {counts['file_total']}")
+    logger.info(f"TOTAL: Removed contexts: {counts['removed']} / {counts['total']}")
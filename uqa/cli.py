@@ -14,12 +14,18 @@ Those decorators achieve goals:
 - At runtime, transforming parameters in :class:`dataset.DataLoader` and / or :class:`dataset.DataDumper` instances
 """
 
-from typing import List
+import functools
+import logging
+from typing import List, Optional
 
 import click
 
 from uqa import (
+    annotate as annotate_,
+    cache as cache_,
+    checkpoint,
     logging_utils,
+    metrics,
     dataset,
     fquad_utils,
     cli_helpers,
@@ -31,9 +37,14 @@ from uqa import (
     show as show_,
     validate as validate_,
     download as download_,
+    parallel,
+    pipeline,
     qa_gen,
+    reading_wiki_dumps,
 )
 
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 
@@ -64,9 +75,39 @@ CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
     show_default=True,
     help="File logging level",
 )
-def main(quiet, no_log, verbosity, log_file, log_verbosity):
+@click.option(
+    "--metrics-report",
+    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    default=None,
+    help="Log per-stage metrics and write them to this file at the end of the command, "
+    "in Prometheus textfile format if its extension is '.prom', else in JSON.",
+)
+@click.option(
+    "--progress-interval",
+    type=click.FloatRange(min=0),
+    default=0,
+    show_default=True,
+    help="Log per-stage throughput every this many seconds (0 to disable).",
+)
+@click.pass_context
+def main(ctx, quiet, no_log, verbosity, log_file, log_verbosity, metrics_report, progress_interval):
     """Project UQA command line tool."""
     logging_utils.init_root_logger(quiet, no_log, log_file, verbosity.upper(), log_verbosity.upper())
+    reporter = None
+    if progress_interval > 0:
+        reporter = metrics.ProgressReporter(progress_interval)
+        reporter.start()
+    ctx.call_on_close(functools.partial(_report_metrics, reporter, metrics_report))
+
+
+def _report_metrics(reporter: Optional[metrics.ProgressReporter], metrics_report: Optional[str]):
+    if reporter is not None:
+        reporter.stop()
+    if metrics_report is None:
+        return
+    for line in metrics.REGISTRY.progress_lines():
+        logger.info(f"[metrics] {line}")
+    metrics.REGISTRY.write_report(metrics_report)
 
 
 @main.command()
@@ -88,72 +129,328 @@ def stats(dataloader: dataset.DataLoader, detailed: bool):
     show_default=True,
     help="Action to be performed (allows multiple options).",
 )
-@click.option(
-    "--filter-min-alpha",
-    type=click.INT,
-    default=10,
-    show_default=True,
-    help="Minimum number of letters for a context to be valid",
-)
+@cli_helpers.click_filter_params
 @click.option("--detailed", is_flag=True, help="Log per-file information.")
+@cli_helpers.click_workers
 @cli_helpers.click_read_write_data
 def clean(
     dataloader: dataset.DataLoader,
     datadumper: dataset.DataDumper,
+    workers: int,
+    ordered: bool,
     action: List[str],
     filter_min_alpha: int,
+    filters: List[clean_.ContextFilter],
     detailed: bool,
 ):
     """Clean data."""
+    step = functools.partial(
+        _clean_step, action=action, filter_min_alpha=filter_min_alpha, filters=filters, detailed=detailed
+    )
+    _run_parallel(step, dataloader, datadumper, workers, ordered)
+
+
+def _run_parallel(
+    step: parallel.Step, dataloader: dataset.DataLoader, datadumper: dataset.DataDumper, workers: int, ordered: bool
+):
+    """Run `step` with :func:`.parallel.run`, raising :exc:`click.ClickException` if the processing of a file failed."""
+    if workers > 0 and dataloader.dataformat == "fquad":
+        # Articles IDs are generated across files while converting FQuAD data, a worker only sees a single file
+        raise click.BadParameter("Cannot be used with 'fquad' data format.", param_hint="'--workers'")
+    num_failed = parallel.run(step, dataloader, datadumper, workers, ordered)
+    if num_failed > 0:
+        raise click.ClickException(f"Processing failed for {num_failed} file(s), see the log for details.")
+
+
+def _clean_step(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    action: List[str],
+    filter_min_alpha: int,
+    filters: List[clean_.ContextFilter],
+    detailed: bool,
+):
     data_it = dataloader
     if dataloader.dataformat == "fquad":
         data_it = fquad_utils.fquad_to_default_dl(data_it)
+    article_it = dataset.to_articles(data_it)
     if "clean" in action:
-        data_it = clean_.clean_dl(data_it)
+        article_it = clean_.clean_articles(article_it)
     if "filter" in action:
-        data_it = clean_.filter_contexts_dl(data_it, filter_min_alpha, detailed)
-    datadumper.save(data_it)
+        article_it = clean_.filter_contexts_articles(article_it, filter_min_alpha, detailed, filters)
+    datadumper.save_articles(article_it)
+
+
+@main.command()
+@cli_helpers.click_workers
+@cli_helpers.click_ingest_params
+def ingest(dataloader: reading_wiki_dumps.WikiDumpDataLoader, datadumper: dataset.DataDumper):
+    """Ingest wiki dumps archives."""
+    datadumper.save(dataloader)
 
 
 @main.command()
+@click.option(
+    "--num-articles",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Total (or estimated) number of articles, used to pad split numbers instead of counting the articles first.",
+)
+@click.option(
+    "--rename",
+    is_flag=True,
+    help="Pad split numbers by renaming the output files at the end instead of counting "
+    "(default for json and pickle input files).",
+)
 @cli_helpers.click_split_params
-def split(dataloader: dataset.DataLoader, datadumper: dataset.DataDumper, dst: str, num: int):
+def split(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    dst: str,
+    num: int,
+    num_articles: Optional[int],
+    rename: bool,
+):
     """Split / combine data in file(s)."""
     if num < 1:
-        data_it = split_.unite_dl(dataloader, dst)
+        datadumper.save(split_.unite_dl(dataloader, dst))
+        return
+    if num_articles is None and not rename:
+        num_articles = split_.count_articles(dataloader)
+        if num_articles is None:
+            logger.info(f"Articles of {dataloader.fileformat} files cannot be counted beforehand, renaming the splits")
+            rename = True
+    if rename:
+        split_.save_renamed_splits(dataloader, datadumper, dst, num)
     else:
-        data_it = split_.split_dl(dataloader, dst, num)
-    datadumper.save(data_it)
+        datadumper.save(split_.split_dl(dataloader, dst, num, num_articles))
 
 
 @main.command()
+@cli_helpers.click_resume
+@cli_helpers.click_cache_params
+@cli_helpers.click_batch_params
+@cli_helpers.click_workers
 @cli_helpers.click_read_write_data
-def ner(dataloader: dataset.DataLoader, datadumper: dataset.DataDumper):
+def ner(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    workers: int,
+    ordered: bool,
+    batch_size: int,
+    n_process: int,
+    cache_path: str,
+    cache_max_bytes: int,
+    resume: bool,
+):
     """Named-entity recognition."""
+    dataloader.skip_file_cb = checkpoint.make_skip_cb(datadumper)
+    step = functools.partial(
+        _ner_step,
+        batch_size=batch_size,
+        n_process=n_process,
+        cache_path=cache_path,
+        cache_max_bytes=cache_max_bytes,
+        resume=resume,
+    )
+    _run_parallel(step, dataloader, datadumper, workers, ordered)
+
+
+def _ner_step(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    batch_size: int,
+    n_process: int,
+    cache_path: str,
+    cache_max_bytes: int,
+    resume: bool,
+):
     data_it = dataloader
     if dataloader.dataformat == "fquad":
         data_it = fquad_utils.fquad_to_default_dl(dataloader)
-    datadumper.save(ner_.ner_dl(data_it))
+    with cache_.open_cache(cache_path, cache_max_bytes) as cache:
+        stage = functools.partial(ner_.ner_articles, batch_size=batch_size, n_process=n_process, cache=cache)
+        return checkpoint.run_resumable(stage, data_it, datadumper, "ner", resume)
 
 
 @main.command()
 @click.option("--detailed", is_flag=True, help="Log article processing progression")
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Number of contexts per batch, their sentences are sorted by length before constituency parsing.",
+)
+@cli_helpers.click_resume
+@cli_helpers.click_cache_params
+@cli_helpers.click_workers
 @cli_helpers.click_read_write_data
-def constituency(dataloader: dataset.DataLoader, datadumper: dataset.DataDumper, detailed: bool):
+def constituency(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    workers: int,
+    ordered: bool,
+    detailed: bool,
+    batch_size: int,
+    cache_path: str,
+    cache_max_bytes: int,
+    resume: bool,
+):
     """Constituency parsing."""
+    dataloader.skip_file_cb = checkpoint.make_skip_cb(datadumper)
+    step = functools.partial(
+        _constituency_step,
+        detailed=detailed,
+        batch_size=batch_size,
+        cache_path=cache_path,
+        cache_max_bytes=cache_max_bytes,
+        resume=resume,
+    )
+    _run_parallel(step, dataloader, datadumper, workers, ordered)
+
+
+def _constituency_step(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    detailed: bool,
+    batch_size: int,
+    cache_path: str,
+    cache_max_bytes: int,
+    resume: bool,
+):
+    data_it = dataloader
+    if dataloader.dataformat == "fquad":
+        data_it = fquad_utils.fquad_to_default_dl(dataloader)
+    with cache_.open_cache(cache_path, cache_max_bytes) as cache:
+        stage = functools.partial(
+            constituency_.constituency_articles, detailed=detailed, batch_size=batch_size, cache=cache
+        )
+        return checkpoint.run_resumable(stage, data_it, datadumper, "constituency", resume)
+
+
+@main.command()
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Number of contexts per batch, their sentences are sorted by length before constituency parsing.",
+)
+@cli_helpers.click_resume
+@cli_helpers.click_cache_params
+@cli_helpers.click_workers
+@cli_helpers.click_read_write_data
+def annotate(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    workers: int,
+    ordered: bool,
+    batch_size: int,
+    cache_path: str,
+    cache_max_bytes: int,
+    resume: bool,
+):
+    """Named-entity recognition and constituency parsing in a single pass."""
+    dataloader.skip_file_cb = checkpoint.make_skip_cb(datadumper)
+    step = functools.partial(
+        _annotate_step, batch_size=batch_size, cache_path=cache_path, cache_max_bytes=cache_max_bytes, resume=resume
+    )
+    _run_parallel(step, dataloader, datadumper, workers, ordered)
+
+
+def _annotate_step(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    batch_size: int,
+    cache_path: str,
+    cache_max_bytes: int,
+    resume: bool,
+):
     data_it = dataloader
     if dataloader.dataformat == "fquad":
         data_it = fquad_utils.fquad_to_default_dl(dataloader)
-    datadumper.save(constituency_.constituency_dl(data_it, detailed=detailed))
+    with cache_.open_cache(cache_path, cache_max_bytes) as cache:
+        stage = functools.partial(annotate_.annotate_articles, batch_size=batch_size, cache=cache)
+        return checkpoint.run_resumable(stage, data_it, datadumper, "annotate", resume)
 
 
 @main.command()
+@cli_helpers.click_workers
 @cli_helpers.click_read_write_data
-def qas(dataloader: dataset.DataLoader, datadumper: dataset.DataDumper):
+def qas(dataloader: dataset.DataLoader, datadumper: dataset.DataDumper, workers: int, ordered: bool):
     """Natural question / answer genration."""
+    cli_helpers.check_fquad_output(datadumper)
+    _run_parallel(_qas_step, dataloader, datadumper, workers, ordered)
+
+
+def _qas_step(dataloader: dataset.DataLoader, datadumper: dataset.DataDumper):
     datadumper.save(fquad_utils.default_to_fquad_dl(qa_gen.generate_qas_dl(dataloader)))
 
 
+@main.command()
+@cli_helpers.click_filter_params
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Number of contexts per batch, their sentences are sorted by length before constituency parsing.",
+)
+@click.option(
+    "--keep-intermediates",
+    is_flag=True,
+    help="Also save the cleaned, annotated and qas (`default` format) data next to the output file(s), in jsonl.",
+)
+@cli_helpers.click_cache_params
+@cli_helpers.click_workers
+@cli_helpers.click_read_write_data
+def run(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    workers: int,
+    ordered: bool,
+    filter_min_alpha: int,
+    filters: List[clean_.ContextFilter],
+    batch_size: int,
+    keep_intermediates: bool,
+    cache_path: str,
+    cache_max_bytes: int,
+):
+    """Clean, annotate and generate question / answer pairs in a single pass."""
+    cli_helpers.check_fquad_output(datadumper)
+    step = functools.partial(
+        _run_step,
+        filter_min_alpha=filter_min_alpha,
+        filters=filters,
+        batch_size=batch_size,
+        keep_intermediates=keep_intermediates,
+        cache_path=cache_path,
+        cache_max_bytes=cache_max_bytes,
+    )
+    _run_parallel(step, dataloader, datadumper, workers, ordered)
+
+
+def _run_step(
+    dataloader: dataset.DataLoader,
+    datadumper: dataset.DataDumper,
+    filter_min_alpha: int,
+    filters: List[clean_.ContextFilter],
+    batch_size: int,
+    keep_intermediates: bool,
+    cache_path: str,
+    cache_max_bytes: int,
+):
+    data_it = dataloader
+    if dataloader.dataformat == "fquad":
+        data_it = fquad_utils.fquad_to_default_dl(dataloader)
+    intermediates = None
+    if keep_intermediates:
+        intermediates = {stage: pipeline.intermediate_dumper(datadumper, stage) for stage in pipeline.STAGES}
+    with cache_.open_cache(cache_path, cache_max_bytes) as cache:
+        datadumper.save(pipeline.run_dl(data_it, filter_min_alpha, batch_size, intermediates, cache, filters))
+
+
 @main.command()
 @click.option("-a", "--all", "show_all", is_flag=True, help="Show all context")
 @click.option("--depth", type=click.INT, default=-1, help="Maximum depth for constituents")
@@ -5,7 +5,9 @@ from typing import Callable, List
 
 import click
 
-from uqa.dataset import DataDumper, DirDataLoader, FileDataLoader
+from uqa.clean import make_filters
+from uqa.dataset import COMPRESSIONS, FILEFORMATS, DataDumper, DirDataLoader, FileDataLoader
+from uqa.reading_wiki_dumps import WikiDumpDataLoader
 
 
 def _validate_params(use_dir: bool, src: List[str]) -> bool:
@@ -34,10 +36,22 @@ def _read_params(func: Callable, default_data_format_only: bool = False) -> Call
             default="default",
             help="Data structure",
         )(decorated_func)
+    decorated_func = click.option(
+        "--prefetch",
+        type=click.IntRange(min=0),
+        default=0,
+        show_default=True,
+        help="Number of input files to read ahead in background threads.",
+    )(decorated_func)
+    decorated_func = click.option(
+        "--incremental",
+        is_flag=True,
+        help="Parse JSON input file(s) incrementally to process them in bounded memory.",
+    )(decorated_func)
     decorated_func = click.option(
         "-if",
         "--input-format",
-        type=click.Choice(["json", "pickle"], case_sensitive=False),
+        type=click.Choice(FILEFORMATS, case_sensitive=False),
         default="json",
         show_default=True,
         help="Input file(s) format.",
@@ -62,12 +76,12 @@ def click_read_data(func: Callable) -> Callable:
     as the keyword argument `dataloader`."""
 
     @functools.wraps(func)
-    def wrapper(data_format, input_format, use_dir, src, **kwargs):
+    def wrapper(data_format, input_format, incremental, prefetch, use_dir, src, **kwargs):
         _validate_params(use_dir, src)
         if use_dir:
-            dataloader = DirDataLoader(src, input_format, data_format)
+            dataloader = DirDataLoader(src, input_format, data_format, incremental=incremental, prefetch=prefetch)
         else:
-            dataloader = FileDataLoader(src, input_format, data_format)
+            dataloader = FileDataLoader(src, input_format, data_format, incremental=incremental, prefetch=prefetch)
         return func(dataloader=dataloader, **kwargs)
 
     decorated_func = _read_params(wrapper)
@@ -75,7 +89,8 @@ def click_read_data(func: Callable) -> Callable:
         "\nRead and process SRC data. SRC can be one or more path(s) to files.\n"
         "With -d / --dir flag, SRC must be a single path to a directory. "
         "File in SRC and its sub-directories are discoverd and "
-        "processed if they have the right extension ('*.json' or '*.pickle')\n"
+        "processed if they have the right extension ('*.json', '*.jsonl', '*.pickle' or '*.columnar', "
+        "optionally followed by a compression extension '.gz', '.bz2', '.xz' or '.zst')\n"
     )
     if not decorated_func.__doc__.endswith("\n"):
         decorated_func.__doc__ += "\n"
@@ -92,11 +107,24 @@ def _write_params(func: Callable) -> Callable:
     decorated_func = click.option(
         "-of",
         "--output-format",
-        type=click.Choice(["json", "pickle"], case_sensitive=False),
+        type=click.Choice(FILEFORMATS, case_sensitive=False),
         default="json",
         show_default=True,
         help="Output file format.",
     )(decorated_func)
+    decorated_func = click.option(
+        "--async-write", is_flag=True, help="Encode and write output files in a background thread."
+    )(decorated_func)
+    decorated_func = click.option(
+        "--compress-level", type=click.INT, default=None, help="Output files compression level."
+    )(decorated_func)
+    decorated_func = click.option(
+        "--compress",
+        "compression",
+        type=click.Choice(COMPRESSIONS, case_sensitive=False),
+        default=None,
+        help="Compress output file(s), the compression extension is appended to output path(s).",
+    )(decorated_func)
     decorated_func = click.option("-O", "--override", is_flag=True, help="Override existing output files")(
         decorated_func
     )
@@ -111,18 +139,43 @@ def click_read_write_data(func: Callable) -> Callable:
     as the keyword argument `datloader` and `datadumper`."""
 
     @functools.wraps(func)
-    def wrapper(data_format, input_format, use_dir, src, output_format, json_indent, override, dst, **kwargs):
+    def wrapper(
+        data_format,
+        input_format,
+        incremental,
+        prefetch,
+        use_dir,
+        src,
+        output_format,
+        json_indent,
+        override,
+        async_write,
+        compression,
+        compress_level,
+        dst,
+        **kwargs,
+    ):
         _validate_params(use_dir, src)
         if use_dir:
-            dataloader = DirDataLoader(src, input_format, data_format)
+            dataloader = DirDataLoader(src, input_format, data_format, incremental=incremental, prefetch=prefetch)
             path_mod = DataDumper.dir_replacer(src[0].strip("/"), dst)
         else:
-            dataloader = FileDataLoader(src, input_format, data_format)
+            dataloader = FileDataLoader(src, input_format, data_format, incremental=incremental, prefetch=prefetch)
             if len(src) == 1:
                 path_mod = DataDumper.path_replacer(dst)
             else:
                 path_mod = DataDumper.file_in_dir(dst)
-        datadumper = DataDumper(output_format, path_mod, override=override, json_indent=json_indent)
+        datadumper = DataDumper(
+            output_format,
+            path_mod,
+            override=override,
+            json_indent=json_indent,
+            background=async_write,
+            compression=compression,
+            compresslevel=compress_level,
+            # Output paths derived from input paths get the output format extension
+            replace_extension=use_dir or len(src) > 1,
+        )
         dataloader.skip_file_cb = datadumper.make_skip_cb()
         return func(dataloader=dataloader, datadumper=datadumper, **kwargs)
 
@@ -132,12 +185,14 @@ def click_read_write_data(func: Callable) -> Callable:
         "\nRead and process SRC data. SRC can be one or more path(s) to files. "
         "With -d / --dir flag, SRC must be a single path to a directory. "
         "File in SRC and its sub-directories are discoverd and "
-        "processed if they have the right extension ('*.json' or '*.pickle').\n"
+        "processed if they have the right extension ('*.json', '*.jsonl', '*.pickle' or '*.columnar', "
+        "optionally followed by a compression extension '.gz', '.bz2', '.xz' or '.zst').\n"
         "\nWrite processed SRC data in path DST. "
         "If SRC is a single file path, write the processed data the file DST. "
         "If SRC is a single directory path, write the processed data in the directory DST "
         "retaining SRC internal hierarchy. "
-        "If SRC is a list of files path: write the processed data in the directory DST with the same filename.\n"
+        "If SRC is a list of files path: write the processed data in the directory DST with the same filename. "
+        "In the directory cases, the file format extension of the written files is the output format.\n"
     )
     if not decorated_func.__doc__.endswith("\n"):
         decorated_func.__doc__ += "\n"
@@ -146,20 +201,165 @@ def click_read_write_data(func: Callable) -> Callable:
     return decorated_func
 
 
+def check_fquad_output(datadumper: DataDumper) -> None:
+    """Raise :exc:`click.BadParameter` if `datadumper` file format cannot store `FQuAD` data format
+    (i.e. `jsonl` and `columnar` which store articles in `default` data format)."""
+    if datadumper.fileformat in ("jsonl", "columnar"):
+        raise click.BadParameter(
+            f"'{datadumper.fileformat}' cannot store fquad data format output, use 'json' or 'pickle'.",
+            param_hint="'-of' / '--output-format'",
+        )
+
+
+def click_workers(func: Callable) -> Callable:
+    """Add ``--workers`` and ``--unordered`` parameters, passed to the decorated function
+    as the keyword arguments `workers` and `ordered` (see :func:`.parallel.run`)."""
+
+    @functools.wraps(func)
+    def wrapper(workers, unordered, **kwargs):
+        return func(workers=workers, ordered=not unordered, **kwargs)
+
+    decorated_func = click.option(
+        "--unordered", is_flag=True, help="With --workers, report files completion in completion order."
+    )(wrapper)
+    decorated_func = click.option(
+        "--workers",
+        type=click.IntRange(min=0),
+        default=0,
+        show_default=True,
+        help="Number of worker processes processing files in parallel (0 to process them in the main process).",
+    )(decorated_func)
+    return decorated_func
+
+
+def click_batch_params(func: Callable) -> Callable:
+    """Add ``--batch-size`` and ``--n-process`` spacy inference parameters,
+    passed to the decorated function as the keyword arguments `batch_size` and `n_process`."""
+    decorated_func = click.option(
+        "--n-process",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="Number of processes used by spacy to process each batch stream.",
+    )(func)
+    decorated_func = click.option(
+        "--batch-size",
+        type=click.IntRange(min=1),
+        default=64,
+        show_default=True,
+        help="Number of contexts processed per spacy batch.",
+    )(decorated_func)
+    return decorated_func
+
+
+def click_resume(func: Callable) -> Callable:
+    """Add ``--resume`` parameter, passed to the decorated function as the keyword argument `resume`
+    (see :func:`.checkpoint.run_resumable`)."""
+    return click.option(
+        "--resume",
+        is_flag=True,
+        help="Continue the processing of interrupted files from their last checkpointed article.",
+    )(func)
+
+
+def click_cache_params(func: Callable) -> Callable:
+    """Add ``--cache`` and ``--cache-max-size`` annotation cache parameters,
+    passed to the decorated function as the keyword arguments `cache_path` and `cache_max_bytes`."""
+
+    @functools.wraps(func)
+    def wrapper(cache_path, cache_max_size, **kwargs):
+        return func(cache_path=cache_path, cache_max_bytes=cache_max_size * 2 ** 20, **kwargs)
+
+    decorated_func = click.option(
+        "--cache-max-size",
+        type=click.IntRange(min=1),
+        default=1024,
+        show_default=True,
+        help="Maximum annotation cache size in MiB, least recently used annotations are evicted first.",
+    )(wrapper)
+    decorated_func = click.option(
+        "--cache",
+        "cache_path",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Annotation cache SQLite file, cached contexts are not processed again.",
+    )(decorated_func)
+    return decorated_func
+
+
+def click_filter_params(func: Callable) -> Callable:
+    """Add ``--filter-min-alpha`` and further context filters parameters, passed to the decorated function
+    as the keyword arguments `filter_min_alpha` and `filters` (see :func:`uqa.clean.make_filters`)."""
+
+    @functools.wraps(func)
+    def wrapper(filter_max_length, filter_max_digit_ratio, filter_min_french_ratio, **kwargs):
+        filters = make_filters(filter_max_length, filter_max_digit_ratio, filter_min_french_ratio)
+        return func(filters=filters, **kwargs)
+
+    decorated_func = click.option(
+        "--filter-min-french-ratio",
+        type=click.FloatRange(min=0, max=1),
+        default=None,
+        help="Minimum ratio of frequent French words for a context to be valid.",
+    )(wrapper)
+    decorated_func = click.option(
+        "--filter-max-digit-ratio",
+        type=click.FloatRange(min=0, max=1),
+        default=None,
+        help="Maximum ratio of digits for a context to be valid.",
+    )(decorated_func)
+    decorated_func = click.option(
+        "--filter-max-length",
+        type=click.IntRange(min=1),
+        default=None,
+        help="Maximum number of characters for a context to be valid.",
+    )(decorated_func)
+    decorated_func = click.option(
+        "--filter-min-alpha",
+        type=click.INT,
+        default=10,
+        show_default=True,
+        help="Minimum number of letters for a context to be valid",
+    )(decorated_func)
+    return decorated_func
+
+
 def click_split_params(func: Callable) -> Callable:
     """Add parameters for commands which read, process and write data files or directory,
     and transform those parameters in a DataLoader instance and a DataDumper instance passed to the decorated function
     as the keyword argument `datloader` and `datadumper`."""
 
     @functools.wraps(func)
-    def wrapper(data_format, input_format, use_dir, src, output_format, override, dst, json_indent, **kwargs):
+    def wrapper(
+        data_format,
+        input_format,
+        incremental,
+        prefetch,
+        use_dir,
+        src,
+        output_format,
+        override,
+        async_write,
+        compression,
+        compress_level,
+        dst,
+        json_indent,
+        **kwargs,
+    ):
         _validate_params(use_dir, src)
         if use_dir:
-            dataloader = DirDataLoader(src, input_format, data_format)
+            dataloader = DirDataLoader(src, input_format, data_format, incremental=incremental, prefetch=prefetch)
         else:
-            dataloader = FileDataLoader(src, input_format, data_format)
+            dataloader = FileDataLoader(src, input_format, data_format, incremental=incremental, prefetch=prefetch)
 
-        datadumper = DataDumper(output_format, override=override, json_indent=json_indent)
+        datadumper = DataDumper(
+            output_format,
+            override=override,
+            json_indent=json_indent,
+            background=async_write,
+            compression=compression,
+            compresslevel=compress_level,
+        )
         return func(dataloader=dataloader, datadumper=datadumper, dst=dst, **kwargs)
 
     decorated_func = click.argument("num", type=int, required=True)(_read_params(_write_params(wrapper)))
@@ -168,7 +368,8 @@ def click_split_params(func: Callable) -> Callable:
         "\nRead and process SRC data. SRC can be one or more path(s) to files. "
         "With -d / --dir flag, SRC must be a single path to a directory. "
         "File in SRC and its sub-directories are discoverd and "
-        "processed if they have the right extension ('*.json' or '*.pickle').\n"
+        "processed if they have the right extension ('*.json', '*.jsonl', '*.pickle' or '*.columnar', "
+        "optionally followed by a compression extension '.gz', '.bz2', '.xz' or '.zst').\n"
         "\nSplit / combine data in file with NUM articles per file and save them in path "
         "generated with template DST. If NUM is <= 0 a single file is created with all the articles,"
         "else DST must contains '{num}' placeholder (ex: DST='foo/bar_{num}.json') in which case"
@@ -179,3 +380,61 @@ def click_split_params(func: Callable) -> Callable:
     decorated_func.__doc__ += doc_str
 
     return decorated_func
+
+
+def click_ingest_params(func: Callable) -> Callable:
+    """Add parameters for commands which read wiki dumps archives and write data shards,
+    and transform those parameters in a WikiDumpDataLoader instance and a DataDumper instance passed to the decorated
+    function as the keyword argument `dataloader` and `datadumper`. Requires :func:`click_workers` parameters."""
+
+    @functools.wraps(func)
+    def wrapper(
+        src,
+        shard_size,
+        workers,
+        ordered,
+        output_format,
+        json_indent,
+        override,
+        async_write,
+        compression,
+        compress_level,
+        dst,
+        **kwargs,
+    ):
+        for src_path in src:
+            if not path.exists(src_path):
+                raise click.BadParameter(f"'{src_path}' does not exist.", param_hint="[SRC]...")
+        dataloader = WikiDumpDataLoader(src, shard_size, workers, ordered, extension=output_format)
+        datadumper = DataDumper(
+            output_format,
+            DataDumper.path_in_dir(dst),
+            override=override,
+            json_indent=json_indent,
+            background=async_write,
+            compression=compression,
+            compresslevel=compress_level,
+        )
+        return func(dataloader=dataloader, datadumper=datadumper, **kwargs)
+
+    decorated_func = click.option(
+        "--shard-size",
+        type=click.IntRange(min=1),
+        default=1000,
+        show_default=True,
+        help="Number of articles per output file.",
+    )(_write_params(wrapper))
+    decorated_func = click.argument("src", nargs=-1, type=click.Path(), required=True)(decorated_func)
+
+    doc_str = (
+        "\nRead the wiki dumps archives SRC (bz2 compressed JSON-lines files produced by WikiExtractor). "
+        "SRC can be one or more path(s) to archives or directories, directories and their sub-directories "
+        "are explored for '*.bz2' archives.\n"
+        "\nWrite the articles in `default` data format in the directory DST, in files of --shard-size articles "
+        "named 'wiki_00000.<output format>', 'wiki_00001.<output format>', ...\n"
+    )
+    if not decorated_func.__doc__.endswith("\n"):
+        decorated_func.__doc__ += "\n"
+    decorated_func.__doc__ += doc_str
+
+    return decorated_func
@@ -0,0 +1,338 @@
+"""Compact binary columnar corpus format.
+
+A `columnar` file stores a `default` data format file content as a set of typed columns:
+
+* every string (titles, labels, questions) is interned in a single UTF-8 blob with an offsets column
+* contexts texts are concatenated in another UTF-8 blob with an offsets column
+* entities, constituents and question / answer pairs spans and labels are stored in flat ``int32`` columns,
+  constituents trees in pre-order along with each node subtree size
+
+:class:`ColumnarCorpus` maps the file in memory with :mod:`mmap` and exposes the columns as
+:class:`memoryview` instances without copying them, records are decoded on access only.
+
+Notes
+-----
+Only the fields described in :doc:`/data_formats` are stored, any other field is discarded.
+
+File layout (little-endian):
+
+* header: magic ``b"UQAC"``, format version and number of columns as ``uint32``
+* columns table: offset and size in bytes of each column (see :const:`COLUMNS`) as ``uint64``
+* columns data, each column starting on an 8 bytes boundary
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+MAGIC = b"UQAC"
+VERSION = 1
+
+#: Columns names and type codes (see :mod:`array`), ``"B"`` columns are UTF-8 blobs
+COLUMNS: List[Tuple[str, str]] = [
+    ("strings", "B"),
+    ("strings_offsets", "q"),
+    ("article_id", "q"),
+    ("article_title", "i"),
+    ("article_contexts", "q"),
+    ("context_id", "q"),
+    ("context_flags", "i"),
+    ("texts", "B"),
+    ("texts_offsets", "q"),
+    ("context_entities", "q"),
+    ("context_nodes", "q"),
+    ("context_qas", "q"),
+    ("entity_start", "i"),
+    ("entity_end", "i"),
+    ("entity_label", "i"),
+    ("node_start", "i"),
+    ("node_end", "i"),
+    ("node_label", "i"),
+    ("node_size", "i"),
+    ("qa_question", "i"),
+    ("qa_start", "i"),
+    ("qa_end", "i"),
+    ("qa_label", "i"),
+]
+
+#: Context flags marking which optional fields are present
+HAS_ENTITIES, HAS_CONSTITUENCY, HAS_QAS = 1, 2, 4
+
+_HEADER = struct.Struct("<4sII")
+_COLUMN_ENTRY = struct.Struct("<QQ")
+_ALIGN = 8
+
+
+class _StringTable:
+    """Interned strings accumulator."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = dict()
+        self.blob = bytearray()
+        self.offsets = array("q", [0])
+
+    def add(self, string: str) -> int:
+        """Return `string` id, adding it to the table if needed."""
+        idx = self.ids.get(string)
+        if idx is None:
+            idx = self.ids[string] = len(self.offsets) - 1
+            self.blob.extend(string.encode("utf8"))
+            self.offsets.append(len(self.blob))
+        return idx
+
+
+def dump(fpath: str, fcontent: Iterable[Dict]) -> None:
+    """Encode `fcontent` articles in `default` data format and write them at path `fpath` in `columnar` format.
+
+    `fcontent` is iterated once and can be lazy, the encoded columns are held in memory until written.
+    """
+    strings = _StringTable()
+    cols: Dict[str, Any] = {name: array(typecode) for name, typecode in COLUMNS if typecode != "B"}
+    for name in ["article_contexts", "texts_offsets", "context_entities", "context_nodes", "context_qas"]:
+        cols[name].append(0)
+    texts = bytearray()
+
+    def add_tree(root: Dict) -> None:
+        # Iterative pre-order traversal, a node size is set once its children iterator is exhausted
+        children_its = [iter((root,))]
+        indices: List[int] = []
+        while children_its:
+            node = next(children_its[-1], None)
+            if node is None:
+                children_its.pop()
+                if indices:
+                    idx = indices.pop()
+                    cols["node_size"][idx] = len(cols["node_start"]) - idx
+                continue
+            indices.append(len(cols["node_start"]))
+            cols["node_start"].append(node["start"])
+            cols["node_end"].append(node["end"])
+            cols["node_label"].append(strings.add(node["label"]))
+            cols["node_size"].append(0)
+            children_its.append(iter(node.get("children", ())))
+
+    for article in fcontent:
+        cols["article_id"].append(article["id_article"])
+        cols["article_title"].append(strings.add(article["title"]))
+        for context in article["contexts"]:
+            cols["context_id"].append(context["id_context"])
+            texts.extend(context["text"].encode("utf8"))
+            cols["texts_offsets"].append(len(texts))
+            flags = 0
+            if "entities" in context:
+                flags |= HAS_ENTITIES
+                for ent in context["entities"]:
+                    cols["entity_start"].append(ent["start"])
+                    cols["entity_end"].append(ent["end"])
+                    cols["entity_label"].append(strings.add(ent["label"]))
+            if "constituency" in context:
+                flags |= HAS_CONSTITUENCY
+                for sent in context["constituency"]:
+                    add_tree(sent)
+            if "qas" in context:
+                flags |= HAS_QAS
+                for qa in context["qas"]:
+                    cols["qa_question"].append(strings.add(qa["question"]))
+                    cols["qa_start"].append(qa["answer"]["start"])
+                    cols["qa_end"].append(qa["answer"]["end"])
+                    cols["qa_label"].append(strings.add(qa["answer"]["label"]))
+            cols["context_flags"].append(flags)
+            cols["context_entities"].append(len(cols["entity_start"]))
+            cols["context_nodes"].append(len(cols["node_start"]))
+            cols["context_qas"].append(len(cols["qa_question"]))
+        cols["article_contexts"].append(len(cols["context_id"]))
+    cols["strings"] = strings.blob
+    cols["strings_offsets"] = strings.offsets
+    cols["texts"] = texts
+
+    buffers = list()
+    for name, typecode in COLUMNS:
+        col = cols[name]
+        if typecode != "B" and sys.byteorder != "little":
+            col = array(typecode, col)
+            col.byteswap()
+        buffers.append(memoryview(col).cast("B"))
+
+    offset = _HEADER.size + _COLUMN_ENTRY.size * len(COLUMNS)
+    table = list()
+    for buf in buffers:
+        offset += -offset % _ALIGN
+        table.append((offset, len(buf)))
+        offset += len(buf)
+
+    with open(fpath, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(COLUMNS)))
+        for entry in table:
+            file.write(_COLUMN_ENTRY.pack(*entry))
+        for (col_offset, _), buf in zip(table, buffers):
+            file.write(b"\0" * (col_offset - file.tell()))
+            file.write(buf)
+
+
+class ColumnarCorpus(Sequence):
+    """Read-only memory-mapped view over a `columnar` file.
+
+    | The instance is a sequence of articles in `default` data format, articles are decoded on access.
+    | Low level accessors (i.e. :meth:`context_text`, :meth:`entities`, :meth:`node_children`) decode
+      a single record field from the mapped columns and are used to build lazy :class:`.context_utils.Context`
+      views (see :func:`.context_utils.contextify`).
+
+    Contexts and constituents nodes are referenced by their index across the whole file.
+    """
+
+    def __init__(self, fpath: str):
+        self.fpath = fpath
+        with open(fpath, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, num_columns = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{fpath} is not a columnar file")
+        if version != VERSION or num_columns != len(COLUMNS):
+            raise ValueError(f"{fpath}: unsupported columnar format version {version}")
+        self._cols: Dict[str, Any] = dict()
+        for i, (name, typecode) in enumerate(COLUMNS):
+            offset, size = _COLUMN_ENTRY.unpack_from(view, _HEADER.size + i * _COLUMN_ENTRY.size)
+            col = view[offset : offset + size]
+            if typecode != "B":
+                if sys.byteorder == "little":
+                    col = col.cast(typecode)
+                else:
+                    col = array(typecode, col.tobytes())
+                    col.byteswap()
+            self._cols[name] = col
+        self._strings_cache: Dict[int, str] = dict()
+
+    def __len__(self) -> int:
+        return len(self._cols["article_id"])
+
+    def __getitem__(self, idx: int) -> Dict:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("article index out of range")
+        return self.article(idx)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for idx in range(len(self)):
+            yield self.article(idx)
+
+    @property
+    def num_contexts(self) -> int:
+        """int: Number of contexts in the file."""
+        return len(self._cols["context_id"])
+
+    def string(self, idx: int) -> str:
+        """Return the interned string with id `idx`."""
+        string = self._strings_cache.get(idx)
+        if string is None:
+            offsets = self._cols["strings_offsets"]
+            string = self._strings_cache[idx] = str(self._cols["strings"][offsets[idx] : offsets[idx + 1]], "utf8")
+        return string
+
+    def article_id(self, idx: int) -> int:
+        """Return the id of the article at index `idx`."""
+        return self._cols["article_id"][idx]
+
+    def article_title(self, idx: int) -> str:
+        """Return the title of the article at index `idx`."""
+        return self.string(self._cols["article_title"][idx])
+
+    def article_contexts(self, idx: int) -> range:
+        """Return the range of the indices of the contexts of article at index `idx`."""
+        offsets = self._cols["article_contexts"]
+        return range(offsets[idx], offsets[idx + 1])
+
+    def context_id(self, idx: int) -> int:
+        """Return the id of the context at index `idx`."""
+        return self._cols["context_id"][idx]
+
+    def context_flags(self, idx: int) -> int:
+        """Return the context at index `idx` flags (see :const:`HAS_ENTITIES`, etc.)."""
+        return self._cols["context_flags"][idx]
+
+    def context_text(self, idx: int) -> str:
+        """Return the text of the context at index `idx`."""
+        offsets = self._cols["texts_offsets"]
+        return str(self._cols["texts"][offsets[idx] : offsets[idx + 1]], "utf8")
+
+    def entities(self, idx: int) -> Iterator[Tuple[int, int, str]]:
+        """Iterate over the ``(start, end, label)`` entities of the context at index `idx`."""
+        offsets = self._cols["context_entities"]
+        starts, ends, labels = self._cols["entity_start"], self._cols["entity_end"], self._cols["entity_label"]
+        for i in range(offsets[idx], offsets[idx + 1]):
+            yield starts[i], ends[i], self.string(labels[i])
+
+    def sentence_roots(self, idx: int) -> Iterator[int]:
+        """Iterate over the constituents roots node indices of the context at index `idx`."""
+        offsets = self._cols["context_nodes"]
+        sizes = self._cols["node_size"]
+        i, end = offsets[idx], offsets[idx + 1]
+        while i < end:
+            yield i
+            i += sizes[i]
+
+    def node(self, idx: int) -> Tuple[int, int, str]:
+        """Return the ``(start, end, label)`` of the node at index `idx`."""
+        return self._cols["node_start"][idx], self._cols["node_end"][idx], self.string(self._cols["node_label"][idx])
+
+    def node_children(self, idx: int) -> Iterator[int]:
+        """Iterate over the children node indices of the node at index `idx`."""
+        sizes = self._cols["node_size"]
+        i, end = idx + 1, idx + sizes[idx]
+        while i < end:
+            yield i
+            i += sizes[i]
+
+    def qas(self, idx: int) -> Iterator[Tuple[str, int, int, str]]:
+        """Iterate over the ``(question, answer_start, answer_end, answer_label)`` of the context at index `idx`."""
+        offsets = self._cols["context_qas"]
+        for i in range(offsets[idx], offsets[idx + 1]):
+            yield (
+                self.string(self._cols["qa_question"][i]),
+                self._cols["qa_start"][i],
+                self._cols["qa_end"][i],
+                self.string(self._cols["qa_label"][i]),
+            )
+
+    def node_json(self, idx: int) -> Dict:
+        """Decode and return the node at index `idx` and its sub-tree in json-like format.
+
+        The sub-tree nodes are read in a single scan of the columns, in pre-order.
+        """
+        starts, ends, labels, sizes = (self._cols[name] for name in ("node_start", "node_end", "node_label", "node_size"))
+        root = dict(label=self.string(labels[idx]), start=starts[idx], end=ends[idx], children=[])
+        # Ancestors of the current node along with the end index of their sub-tree
+        parents = [(idx + sizes[idx], root)]
+        for i in range(idx + 1, idx + sizes[idx]):
+            while i >= parents[-1][0]:
+                parents.pop()
+            node = dict(label=self.string(labels[i]), start=starts[i], end=ends[i], children=[])
+            parents[-1][1]["children"].append(node)
+            parents.append((i + sizes[i], node))
+        return root
+
+    def context(self, idx: int) -> Dict:
+        """Decode and return the context at index `idx` in json-like `default` data format."""
+        flags = self.context_flags(idx)
+        context = dict(id_context=self.context_id(idx), text=self.context_text(idx))
+        if flags & HAS_ENTITIES:
+            context["entities"] = [dict(start=s, end=e, label=l) for s, e, l in self.entities(idx)]
+        if flags & HAS_CONSTITUENCY:
+            context["constituency"] = [self.node_json(i) for i in self.sentence_roots(idx)]
+        if flags & HAS_QAS:
+            context["qas"] = [dict(question=q, answer=dict(start=s, end=e, label=l)) for q, s, e, l in self.qas(idx)]
+        return context
+
+    def article(self, idx: int) -> Dict:
+        """Decode and return the article at index `idx` in json-like `default` data format."""
+        return dict(
+            id_article=self.article_id(idx),
+            title=self.article_title(idx),
+            contexts=[self.context(i) for i in self.article_contexts(idx)],
+        )
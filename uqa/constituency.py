@@ -9,8 +9,11 @@ to
 ```import tensorflow.compat.v1 as tf```
 """
 
+import functools
+import itertools
 import logging
 import os
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 logging.getLogger("tensorflow").setLevel(logging.ERROR)
@@ -20,13 +23,19 @@ from benepar import spacy_plugin
 import spacy
 import tensorflow as tf
 
-from uqa import context_utils, dataset
+from uqa import cache as cache_, context_utils, dataset, metrics, spacy_utils
 
 # pylint: enable=wrong-import-position
 
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+#: Name of the benepar component in the pipeline returned by :func:`load_model`
+BENEPAR_PIPE = "benepar"
+
+#: Benepar model used by :func:`load_model`
+BENEPAR_MODEL = "benepar_fr"
+
 # pylint: disable=useless-suppression
 try:
     tf.compat.v1.logging.set_verbosity(tf.compat.v1.logging.ERROR)  # pylint: disable=no-member
@@ -52,10 +61,17 @@ def span_to_node(span: spacy.tokens.Span) -> context_utils.LabelNode:
     return node
 
 
-def constituency(fcontent: dataset.TJson, model: spacy.language.Model, detailed: bool = False) -> dataset.TJson:
+def constituency(
+    fcontent: dataset.TJson,
+    model: spacy.language.Model,
+    detailed: bool = False,
+    batch_size: int = 64,
+    cache: Optional[cache_.StageCache] = None,
+) -> dataset.TJson:
     """Perform constituency parsing on a 'default' structure data json-like object.
 
     Use `Benepar` constituency parsing model but still relies on `SpaCy parser` stage outputs.
+    Contexts are processed in batches with :func:`bucketed_pipe`.
 
     Parameters
     ----------
@@ -65,28 +81,151 @@ def constituency(fcontent: dataset.TJson, model: spacy.language.Model, detailed:
         A loaded SpaCy model with `parser` and `benepar.spacy_pluggin.BeneparComponent` in the pipeline
     detailed: bool, default=False
         If ``True`` log per article progress
+    batch_size: int, default=64
+        Number of contexts per batch
+    cache: :class:`.cache.StageCache`, default=None
+        If provided, annotations are looked up in and added to the cache (see :func:`stage_cache`)
 
     Returns
     -------
     :obj:`.TJson`
-        The processed data
+        The processed data, lazy if `fcontent` is not a list
     """
-    for num_article, article in enumerate(fcontent):
-        if detailed:
-            logger.info(f"Processing article {num_article + 1} / {len(fcontent)}")
-        for cont in article["contexts"]:
-            spacy_doc = model(cont["text"])
-            consts_json = [span_to_node(sent).to_json() for sent in spacy_doc.sents]
-            cont["constituency"] = consts_json
-    return fcontent
+    num_articles = f" / {len(fcontent)}" if isinstance(fcontent, list) else ""
+
+    def _log_progress(article_it: Iterable[dataset.TJson]) -> Iterator[dataset.TJson]:
+        for num_article, article in enumerate(article_it, 1):
+            if detailed:
+                logger.info(f"Processing article {num_article}{num_articles}")
+            yield article
+
+    docs_pipe = functools.partial(bucketed_pipe, model)
+    articles = spacy_utils.pipe_fcontent(
+        _log_progress(fcontent), model, set_constituency, batch_size, docs_pipe=docs_pipe, cache=cache
+    )
+    return list(articles) if isinstance(fcontent, list) else articles
+
+
+def set_constituency(doc: spacy.tokens.Doc, context: dataset.TJson) -> None:
+    """Set `context` 'constituency' from `doc` sentences parsed by benepar."""
+    context["constituency"] = [span_to_node(sent).to_json() for sent in doc.sents]
+
+
+def bucketed_pipe(
+    model: spacy.language.Language,
+    texts: Iterable[Tuple[str, int]],
+    as_tuples: bool = True,
+    batch_size: int = 64,
+    n_process: int = 1,
+) -> Iterator[Tuple[spacy.tokens.Doc, int]]:
+    """Batched equivalent of ``model.pipe(texts, as_tuples=True)`` with length bucketing for the benepar component.
+
+    The pipeline up to the sentence segmentation is run with ``model.pipe``, then the sentences of each window of
+    `batch_size` docs are sorted by number of tokens and parsed together by the benepar component
+    (see :func:`_parse_docs`), so that the sentences of a parser batch are padded to similar lengths.
+    Docs are yielded in input order.
+
+    Parameters
+    ----------
+    model: spacy.language.Language
+        A loaded SpaCy model with the benepar component named :obj:`BENEPAR_PIPE`
+    texts: iterable of (str, int)
+        Pairs of text and context
+    as_tuples: bool, default=True
+        Only ``True`` is supported
+    batch_size: int, default=64
+        Number of docs per window
+    n_process: int, default=1
+        Number of processes used by ``model.pipe``, the benepar component runs in the calling process
+
+    Yields
+    ------
+    (spacy.tokens.Doc, int)
+        The parsed docs along with their context
+    """
+    if not as_tuples:
+        raise ValueError("bucketed_pipe only supports `as_tuples=True`")
+    parser = model.get_pipe(BENEPAR_PIPE)
+    docs_it = model.pipe(texts, as_tuples=True, batch_size=batch_size, n_process=n_process, disable=[BENEPAR_PIPE])
+    while True:
+        window = list(itertools.islice(docs_it, batch_size))
+        if not window:
+            return
+        _parse_docs(parser, [doc for doc, _ in window])
+        yield from window
+
+
+def _parse_docs(parser: spacy_plugin.BeneparComponent, docs: List[spacy.tokens.Doc]) -> None:
+    """Parse the sentences of `docs` sorted by number of tokens and set the docs constituency data.
+
+    Equivalent to calling ``parser(doc)`` on each doc, except that the parser batches (of ``parser.batch_size``
+    sentences) are made across the docs from sentences of similar lengths.
+    """
+    # pylint: disable=protected-access
+    doc_sents = [list(doc.sents) for doc in docs]
+    parsed: List[List] = [[None] * len(sents) for sents in doc_sents]
+    sent_data = sorted(
+        (
+            ([token.text for token in sent], (num_doc, num_sent))
+            for num_doc, sents in enumerate(doc_sents)
+            for num_sent, sent in enumerate(sents)
+        ),
+        key=lambda tokens_datum: len(tokens_datum[0]),
+    )
+    for parse_raw, tags_raw, (num_doc, num_sent) in parser._batched_parsed_raw(sent_data):
+        parsed[num_doc][num_sent] = (parse_raw, tags_raw)
+    for doc, sents, doc_parsed in zip(docs, doc_sents, parsed):
+        # Same as `BeneparComponent.__call__` with the sentences parsed above
+        constituent_data = spacy_plugin.PartialConstituentData()
+        for sent, (parse_raw, tags_raw) in zip(sents, doc_parsed):
+            _, p_i, p_j, p_label = parse_raw
+            # Remove null-labelled constituents used for binarization, but not null-labelled terminal nodes
+            valid = (p_label != 0) | (p_i + 1 == p_j)
+            constituent_data.starts.append(p_i[valid] + sent.start)
+            constituent_data.ends.append(p_j[valid] + sent.start)
+            constituent_data.labels.append(p_label[valid])
+            if parser._do_tagging:
+                for i, tag_idx in enumerate(tags_raw):
+                    sent[i].tag_ = parser._tag_vocab[tag_idx]
+        doc._._constituent_data = constituent_data.finalize(doc, parser._label_vocab)
+
+
+def stage_cache(
+    cache: Optional[cache_.AnnotationCache], model: spacy.language.Language
+) -> Optional[cache_.StageCache]:
+    """Return the :class:`.cache.StageCache` view of `cache` for constituency parsing performed with `model`."""
+    return spacy_utils.stage_cache(cache, f"constituency:{BENEPAR_MODEL}", ("constituency",), model)
+
+
+@functools.lru_cache(maxsize=None)
+def load_model(
+    model_name: str = "fr_core_news_md", disable: Tuple[str, ...] = ("tagger", "ner")
+) -> spacy.language.Language:
+    """Load and return spacy `model_name` with the benepar component added to the pipeline.
+
+    The pipes in `disable` are disabled, the model is cached: it is loaded once per process and shared
+    by subsequent calls.
+    """
+    logger.info("Loading spacy model for constituency parsing")
+    model = spacy.load(model_name, disable=list(disable))
+    logger.info("Spacy model for constituency parsing loaded")
+    logger.info("Adding benepar component")
+    model.add_pipe(spacy_plugin.BeneparComponent(BENEPAR_MODEL), name=BENEPAR_PIPE)
+    logger.info("Benepar component added to the pipe")
+    return model
 
 
 def constituency_dl(
-    data_it: dataset.DataIterable, model_name: str = "fr_core_news_md", detailed: bool = False
+    data_it: dataset.DataIterable,
+    model_name: str = "fr_core_news_md",
+    detailed: bool = False,
+    batch_size: int = 64,
+    cache: Optional[cache_.AnnotationCache] = None,
 ) -> dataset.DataIterable:
     """Perform constituency parsing on a dataset.
 
     Use `Benepar` constituency parsing model but still relies on `SpaCy` `parser` stage outputs.
+    Files are yielded once completely parsed, as lists of articles, a failing file is logged and skipped.
 
     Parameters
     ----------
@@ -96,21 +235,70 @@ def constituency_dl(
         The name of the spacy model to load, the model has to be locally installed prior to be used.
     detailed: bool, default=False
         If ``True`` log per article progress
+    batch_size: int, default=64
+        Number of contexts per batch
+    cache: :class:`.cache.AnnotationCache`, default=None
+        If provided, annotations are looked up in and added to the cache
 
     Returns
     -------
     :obj:`.DataIterble`
         The processed dateset iterable.
     """
-    logger.info("Loading spacy model for constituency parsing")
-    model = spacy.load(model_name, disable=["tagger", "ner"])
-    logger.info("Spacy model for constituency parsing loaded")
-    logger.info("Adding benepar component")
-    model.add_pipe(spacy_plugin.BeneparComponent("benepar_fr"))
-    logger.info("Benepar component added to the pipe")
+    model = load_model(model_name)
+    const_cache = stage_cache(cache, model)
     for fpath, fcontent in data_it:
         logger.debug(f"Performing constituency parsing on {fpath}")
         try:
-            yield fpath, constituency(fcontent, model, detailed=detailed)
+            fcontent = list(constituency(fcontent, model, detailed=detailed, batch_size=batch_size, cache=const_cache))
         except Exception:  # pylint: disable=broad-except
             logger.exception(f"while processing constituency parsing on {fpath}")
+        else:
+            yield fpath, fcontent
+
+
+def constituency_articles(
+    article_it: dataset.ArticleIterable,
+    model_name: str = "fr_core_news_md",
+    detailed: bool = False,
+    batch_size=64,
+    cache: Optional[cache_.AnnotationCache] = None,
+) -> dataset.ArticleIterable:
+    """Perform constituency parsing on an article iterable.
+
+    Contexts of consecutive articles are processed in batches with :func:`bucketed_pipe`,
+    each article is yielded as soon as all its contexts are processed.
+
+    Parameters
+    ----------
+    article_it: :obj:`.ArticleIterable`
+        An article iterable in `default` format.
+    model_name: str, default="fr_core_news_md"
+        The name of the spacy model to load, the model has to be locally installed prior to be used.
+    detailed: bool, default=False
+        If ``True`` log per article progress
+    batch_size: int, default=64
+        Number of contexts per batch
+    cache: :class:`.cache.AnnotationCache`, default=None
+        If provided, annotations are looked up in and added to the cache
+
+    Returns
+    -------
+    :obj:`.ArticleIterable`
+        The processed article iterable.
+    """
+
+    def _log_progress(article_it: dataset.ArticleIterable) -> dataset.ArticleIterable:
+        for num_article, (fpath, article) in enumerate(article_it, 1):
+            if detailed:
+                logger.info(f"Processing article {num_article}")
+            yield fpath, article
+
+    with metrics.timer("constituency", "model_load"):
+        model = load_model(model_name)
+    docs_pipe = functools.partial(bucketed_pipe, model)
+    article_it = _log_progress(article_it)
+    article_it = spacy_utils.pipe_articles(
+        article_it, model, set_constituency, batch_size, docs_pipe=docs_pipe, cache=stage_cache(cache, model)
+    )
+    yield from metrics.measure("constituency", article_it)
@@ -4,30 +4,75 @@
 | :class:`Label` class stores any extra information about a span of text.
 | :class:`LabelNode` class extends :class:`Label` to represent hierarchical information on a raw text
   such as Constituency parsing results.
+| :class:`LazyLabelNode` class extends :class:`LabelNode` to decode hierarchies levels on first access.
+| :class:`SpanIndex` class indexes labels spans for containment and overlap queries.
 
 The classes implement features for easy manipulation, visualization and IO operations.
 """
 
+import bisect
 import collections
-import copy as cp
+import itertools
 import math
 import random as rd
-from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, NamedTuple, Optional, Text, Tuple, Union
+import sys
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Text,
+    Tuple,
+    Union,
+)
 
 from colorama import Fore
 
-from uqa import dataset
+from uqa import columnar, dataset
 
 
 class _SimpleRepr(object):
-    """A mixin implementing a simple __repr__."""
+    """A mixin implementing a simple __repr__, listing the instance attributes (or slots)."""
+
+    __slots__ = ()
 
     def __repr__(self):
         return "{klass}({attrs})".format(
-            klass=self.__class__.__name__, attrs=", ".join("{}={!r}".format(k, v) for k, v in vars(self).items()),
+            klass=self.__class__.__name__, attrs=", ".join("{}={!r}".format(k, v) for k, v in _attrs(self).items()),
         )
 
 
+def _attrs(obj: Any) -> Dict[str, Any]:
+    """Return the attributes of `obj`, read from its slots then from its instance dictionnary."""
+    ret = dict()
+    for name in (name for klass in reversed(type(obj).__mro__) for name in getattr(klass, "__slots__", ())):
+        if name == "__dict__":
+            continue
+        if name.startswith("_"):
+            public = getattr(type(obj), name[1:], None)
+            if public is None:
+                # Internal state, i.e. `Label._extras_shared`
+                continue
+            if isinstance(public, (property, _LazyList)):
+                # Private slot exposed through a property or a lazy list, i.e. `Label.extras` or `Context.ner`
+                name = name[1:]
+        if hasattr(obj, name):
+            ret[name] = getattr(obj, name)
+    ret.update(getattr(obj, "__dict__", ()))
+    return ret
+
+
+def _intern(string: Optional[str]) -> Optional[str]:
+    """Return the interned `string`, so that equal strings (i.e. labels) share a single object."""
+    return sys.intern(string) if type(string) is str else string  # pylint: disable=unidiomatic-typecheck
+
+
 def yellow(text: str) -> str:
     """Enclose and return `text` str with ASCII yellow color espace sequence."""
     return Fore.YELLOW + text + Fore.RESET
@@ -56,6 +101,11 @@ def colorize(text: str, color: str):
     return getattr(Fore, color.upper()) + text + Fore.RESET
 
 
+def _json_extras(jsonlike: Mapping, fields: FrozenSet[str]) -> Dict[str, Any]:
+    """Return the entries of `jsonlike` whose key is not in `fields`."""
+    return {key: value for key, value in jsonlike.items() if key not in fields}
+
+
 class Label(_SimpleRepr):
     """Represent label span of text defined by its start and end indices and a label string.
 
@@ -72,6 +122,10 @@ class Label(_SimpleRepr):
 
     Also implement dictionnary like attribute accessor for convinience.
 
+    | Instances store their attributes in slots, label strings are interned and :attr:`extras` dictionnary
+      is only allocated when non empty or first accessed. Other attributes can still be set on instances,
+      their ``__dict__`` is only allocated by the first one.
+
     Attributes
     ----------
     start: int
@@ -84,6 +138,11 @@ class Label(_SimpleRepr):
         holds extra informations such as color for pretty printing.
     """
 
+    __slots__ = ("start", "end", "label", "_extras", "_extras_shared", "__dict__")
+
+    #: Json-like keys stored as attributes, other keys are stored in :attr:`extras`
+    FIELDS = frozenset(("start", "end", "label"))
+
     def __init__(self, start: int, end: int, label: str, **extras: Any):
         """
         Parameters
@@ -102,35 +161,83 @@ class Label(_SimpleRepr):
         """
         self.start = start
         self.end = end
-        self.label = label
-        self.extras: Dict[str, Any] = dict(**extras)
+        self.label = _intern(label)
+        self._extras: Optional[Dict[str, Any]] = extras or None
+        self._extras_shared = False
+
+    @property
+    def extras(self) -> Dict[str, Any]:
+        """dict: Extra informations, allocated on first access and copied on first access if shared with a copy."""
+        if self._extras is None:
+            self._extras = dict()
+        elif self._extras_shared:
+            self._extras = dict(self._extras)
+            self._extras_shared = False
+        return self._extras
+
+    @extras.setter
+    def extras(self, value: Dict[str, Any]) -> None:
+        self._extras = value
+        self._extras_shared = False
+
+    @classmethod
+    def from_json(cls, jsonlike: Mapping) -> "Label":
+        """Instanciate and return a `Label` instance from a json-like mapping, `jsonlike` is not modified.
+
+        `jsonlike` keys name must match the attribute names, any extra field content will be stored in :attr:`.extras`.
+        """
+        inst = cls.__new__(cls)
+        inst.start = jsonlike["start"]
+        inst.end = jsonlike["end"]
+        inst.label = sys.intern(jsonlike["label"])
+        inst._extras = None if jsonlike.keys() <= cls.FIELDS else _json_extras(jsonlike, cls.FIELDS)
+        inst._extras_shared = False
+        return inst
 
     def extract(self, text: str) -> str:
         """Return text[:attr:`.start`, :attr:`.end`]"""
-        off = self.extras.get("offset", 0)
+        off = self._extras.get("offset", 0) if self._extras else 0
         return text[off + self.start : off + self.end]
 
     def to_json(self, exclude_extras: bool = True) -> Dict:
-        """Returns the instance attributes as a json-like dict.
+        """Returns the instance attributes as a new json-like dict.
 
         Parameters
         ----------
         exclude_extras: bool, default=True
             If True, exclude :attr:`.extras` value from the result.
         """
-        ret = vars(self)
-        if exclude_extras:
-            if "extras" in ret:
-                del ret["extras"]
+        ret = {"start": self.start, "end": self.end, "label": self.label}
+        if not exclude_extras:
+            ret["extras"] = dict(self._extras or ())
         return ret
 
     def __getitem__(self, key: str) -> Any:
-        """Get instance attibrute with name `key`."""
-        return getattr(self, key)
+        """Get instance attibrute with name `key`, or :attr:`extras` entry `key` if there is no such attribute."""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            if self._extras is not None and key in self._extras:
+                return self._extras[key]
+            raise
 
     def __setitem__(self, key: str, value: Any) -> None:
-        """Set instance attribute `key` with `value`."""
-        return setattr(self, key, value)
+        """Set instance attribute `key` with `value`, or :attr:`extras` entry `key` if there is no such attribute."""
+        if hasattr(type(self), key):
+            setattr(self, key, value)
+        else:
+            self.extras[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the item `key` (see :meth:`__getitem__`) if it exists, else `default`.
+
+        Unlike ``label.extras.get(key)``, it does not allocate an empty :attr:`extras` dictionnary.
+        """
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self._extras is None:
+            return default
+        return self._extras.get(key, default)
 
     def __lt__(self, other: "Label") -> bool:
         if not isinstance(other, Label):
@@ -168,16 +275,30 @@ class Label(_SimpleRepr):
         return self.start <= other.start and other.end <= self.end
 
     def copy(self, **extras: Any):
-        """Returns a deep copy of the label.
+        """Returns a copy of the label.
+
+        The copy shares the :attr:`extras` dictionnary of this instance until either of them accesses
+        :attr:`extras` (copy-on-write), :attr:`extras` values are not copied.
 
         Keyword Arguments
         ------------------
         extras
             Entries to add / update in the copied :attr:`extras` attribute.
         """
-        cop = cp.deepcopy(self)
-        for key, val in extras.items():
-            cop.extras[key] = val
+        return self._copy_to(self.__class__.__new__(self.__class__), extras)
+
+    def _copy_to(self, cop: "Label", extras: Dict[str, Any]) -> "Label":
+        """Set the :class:`Label` attributes of the uninitialized instance `cop` from this instance
+        and `extras` entries, return `cop`."""
+        cop.start = self.start
+        cop.end = self.end
+        cop.label = self.label
+        if extras:
+            cop._extras = dict(self._extras, **extras) if self._extras else extras
+            cop._extras_shared = False
+        else:
+            cop._extras = self._extras
+            cop._extras_shared = self._extras_shared = self._extras is not None
         return cop
 
 
@@ -190,6 +311,11 @@ class LabelNode(Label):
         List of childen in ascending order
     """
 
+    __slots__ = ("children",)
+
+    #: Json-like keys stored as attributes, other keys are stored in :attr:`extras`
+    FIELDS = frozenset(("start", "end", "label", "children"))
+
     def __init__(self, start: int, end: int, label: str, children: List["LabelNode"] = (), **extras: Any):
         """
         Parameters
@@ -212,54 +338,90 @@ class LabelNode(Label):
         self.children: List["LabelNode"] = list(children)
 
     def to_json(self, exclude_extras: bool = True) -> Dict:
-        """Returns the hierachy labels hierarchy as a json-like dict.
+        """Returns the hierachy labels hierarchy as a new json-like dict.
+
+        The hierarchy is traversed iteratively, unexpanded :class:`LazyLabelNode` levels are serialized
+        without being decoded.
 
         Parameters
         ----------
         exclude_extras: bool, default=True
-            If True, exclude :attr:`.extras` value from the result.
+            If True, exclude :attr:`.extras` value from the result (of the root node, children extras
+            are always excluded).
         """
-        ret = super().to_json(exclude_extras)
-        for i in range(len(ret["children"])):
-            ret["children"][i] = ret["children"][i].to_json()
-        ord_ret = collections.OrderedDict()
-        ord_ret["label"] = ret["label"]
-        ord_ret["start"] = ret["start"]
-        ord_ret["end"] = ret["end"]
-        other_keys = set(ret).difference({"label", "start", "end", "children"})
-        ord_ret.update({k: ret[k] for k in other_keys})
-        ord_ret["children"] = ret["children"]
-        return ord_ret
+        ret = {"label": self.label, "start": self.start, "end": self.end}
+        if not exclude_extras:
+            ret["extras"] = dict(self._extras or ())
+        stack = [(self, ret)]
+        while stack:
+            node, jnode = stack.pop()
+            if isinstance(node, LazyLabelNode) and not node.expanded:
+                jnode["children"] = node._children.to_json()  # pylint: disable=protected-access
+                continue
+            jnode["children"] = jchildren = []
+            for child in node.children:
+                jchild = {"label": child.label, "start": child.start, "end": child.end}
+                jchildren.append(jchild)
+                stack.append((child, jchild))
+        return ret
 
     @classmethod
-    def from_json(cls, jsonlike: MutableMapping) -> "LabelNode":
-        """Instaciate and return an `LabelNode` instance from a json-like data structure.
+    def from_json(cls, jsonlike: Mapping) -> "LabelNode":
+        """Instaciate and return an `LabelNode` instance from a json-like data structure, `jsonlike` is not modified.
 
         `jsonlike` keys name must match the attribute names,
-        any extra field content will be stored in :attr:`.extras`.
+        any extra field content will be stored in :attr:`.extras`. The hierarchy is decoded iteratively.
         """
-        children = jsonlike.pop("children", list())
-        inst = cls(**jsonlike)
-        inst.children = list()
-        for child in children:
-            inst.children.append(cls.from_json(child))
+        new, fields = cls.__new__, cls.FIELDS
+        root = cls._from_json_node(jsonlike)
+        stack = [(jsonlike, root)]
+        while stack:
+            jnode, node = stack.pop()
+            node.children = children = []
+            for jchild in jnode.get("children", ()):
+                # Same as `_from_json_node`, inlined as it is called for each node of the (large) trees
+                inst = new(cls)
+                inst.start = jchild["start"]
+                inst.end = jchild["end"]
+                inst.label = sys.intern(jchild["label"])
+                inst._extras = None if jchild.keys() <= fields else _json_extras(jchild, fields)
+                inst._extras_shared = False
+                children.append(inst)
+                stack.append((jchild, inst))
+        return root
+
+    @classmethod
+    def _from_json_node(cls, jsonlike: Mapping) -> "LabelNode":
+        """Return a `LabelNode` instance without :attr:`children` attribute from `jsonlike` node."""
+        # Same as `Label.from_json`, inlined as it is called for each tree
+        inst = cls.__new__(cls)
+        inst.start = jsonlike["start"]
+        inst.end = jsonlike["end"]
+        inst.label = sys.intern(jsonlike["label"])
+        inst._extras = None if jsonlike.keys() <= cls.FIELDS else _json_extras(jsonlike, cls.FIELDS)
+        inst._extras_shared = False
         return inst
 
     def flat_iter(self) -> Iterable["LabelNode"]:
         """Iterate the sub tree defined by this node from lowest to biggest (relative to Label order).
 
-        The first label yielded is always the instance bounded.
+        The first label yielded is always the instance bounded, the traversal is iterative (pre-order).
         """
-        yield self
-        for child in self.children:
-            yield from child.flat_iter()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.children:
+                stack.extend(node.children[::-1])
 
     def to_label(self) -> Label:
         """Returns a Label instance containing the same :attr:`.start`, :attr:`.end` and :attr:`.extras` values."""
-        return Label(self.start, self.end, self.label, **self.extras)
+        return Label(self.start, self.end, self.label, **(self._extras or {}))
 
     def copy(self, depth=-1):  # pylint: disable=arguments-differ
-        """Return a deep-copy of this instance.
+        """Return a copy of this instance hierarchy, up to `depth`.
+
+        Only the copied nodes are visited (iteratively), :attr:`.extras` are copied on write (see :meth:`Label.copy`).
 
         Parameters
         ----------
@@ -273,22 +435,25 @@ class LabelNode(Label):
             The new copied instance.
         """
         cop = self.copy_no_child()
-        if depth != 0:
-            for child in self.children:
-                cop.children.append(child.copy(depth - 1))
+        stack = [(self, cop, depth)]
+        while stack:
+            node, node_cop, node_depth = stack.pop()
+            children = node.children
+            if node_depth != 0 and children:
+                node_cop.children = children_cop = [child.copy_no_child() for child in children]
+                stack.extend(zip(children, children_cop, itertools.repeat(node_depth - 1)))
         return cop
 
     def copy_no_child(self, **extras: Any) -> "LabelNode":
-        """Copy this instance without copying its children.
+        """Copy this instance without its children, :attr:`.extras` are copied on write (see :meth:`Label.copy`).
 
         Keyword Arguments
         -----------------
         extras:
             Udpate the copied instance :attr:`.extras` dictionnary
         """
-        cop = cp.deepcopy(self)
+        cop = self._copy_to(self.__class__.__new__(self.__class__), extras)
         cop.children = list()
-        cop.extras.update(extras)
         return cop
 
     @classmethod
@@ -311,12 +476,54 @@ class LabelNode(Label):
         for l in labels:
             while l not in parents[-1]:
                 parents.pop()
-            inst = cls(**vars(l))
+            inst = cls(l.start, l.end, l.label, **(l._extras or {}))  # pylint: disable=protected-access
             parents[-1].children.append(inst)
             parents.append(inst)
         return root.children
 
 
+class SpanIndex:
+    """Index of the spans of a sequence of labels, answering containment and overlap queries by bisection.
+
+    Spans are sorted by start index, a query bisects the starts and only scans the labels starting
+    in the queried span (or at most the longest span length before it for overlap queries).
+
+    Attributes
+    ----------
+    labels: Sequence of :class:`Label`
+        The indexed labels, the index is not updated if they are modified.
+    """
+
+    __slots__ = ("labels", "_starts", "_ends", "_order", "_max_length")
+
+    def __init__(self, labels: Sequence[Label]):
+        spans = sorted((label.start, label.end, i) for i, label in enumerate(labels))
+        self.labels = labels
+        self._starts = [start for start, _, _ in spans]
+        self._ends = [end for _, end, _ in spans]
+        self._order = [i for _, _, i in spans]
+        self._max_length = max((end - start for start, end, _ in spans), default=0)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def contained(self, start: int, end: int) -> List[int]:
+        """Return the ascending indices in :attr:`labels` of the labels contained in span [`start`, `end`],
+        i.e. the labels ``label`` for which ``label in Label(start, end, "")``."""
+        lo = bisect.bisect_left(self._starts, start)
+        hi = bisect.bisect_right(self._starts, end, lo)
+        ends, order = self._ends, self._order
+        return sorted(order[i] for i in range(lo, hi) if ends[i] <= end)
+
+    def overlapping(self, start: int, end: int) -> List[int]:
+        """Return the ascending indices in :attr:`labels` of the labels sharing at least a character with
+        span [`start`, `end`), `end` excluded."""
+        lo = bisect.bisect_right(self._starts, start - self._max_length)
+        hi = bisect.bisect_left(self._starts, end, lo)
+        ends, order = self._ends, self._order
+        return sorted(order[i] for i in range(lo, hi) if ends[i] > start)
+
+
 def set_color_all(label_iterable: Iterable["Label"], color: str) -> None:
     """Set the color `color` to all labels in `label_iterable`, if the iterable contains a label node
     set the color to the whole hierarchy"""
@@ -356,7 +563,7 @@ def set_color_hier(
             set_color_hier(label, colors, depth_offset)
 
 
-class QA(NamedTuple, _SimpleRepr):
+class QA(NamedTuple):
     """A question / answer pair of labels, the question is a string while the answer is a :class:`Label`"""
 
     question: str
@@ -366,10 +573,144 @@ class QA(NamedTuple, _SimpleRepr):
         """Return a json-like dict representing the :class:`QA` instance."""
         return collections.OrderedDict(question=self.question, answer=self.answer.to_json(exclude_extras))
 
+    @classmethod
+    def from_json(cls, jsonlike: Mapping) -> "QA":
+        """Instanciate and return a :class:`QA` instance from a json-like mapping, `jsonlike` is not modified."""
+        return cls(question=jsonlike["question"], answer=Label.from_json(jsonlike["answer"]))
+
+
+class _LazyList:
+    """List attribute descriptor accepting a zero-argument loader, called on first access to get the list."""
+
+    def __set_name__(self, owner, name):
+        self.name = "_" + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.name)
+        if callable(value):
+            value = value()
+            setattr(instance, self.name, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.name, value if callable(value) else list(value))
+
+
+class _JsonLoader:
+    """Picklable zero-argument loader of a :class:`_LazyList`, decoding `jsonlikes` items with `decode`."""
+
+    __slots__ = ("decode", "jsonlikes")
+
+    def __init__(self, decode: Callable[[Mapping], Any], jsonlikes: Iterable[Mapping]):
+        self.decode = decode
+        self.jsonlikes = jsonlikes
+
+    def __call__(self) -> List[Any]:
+        return [self.decode(jsonlike) for jsonlike in self.jsonlikes]
+
+    def to_json(self) -> List[Dict]:
+        """Return the loaded labels hierarchies as :meth:`LabelNode.to_json` would, without building the nodes."""
+        return _trees_json(self.jsonlikes)
+
+
+class _ColumnarLoader:
+    """Zero-argument loader of a :class:`LazyLabelNode` children, decoded from the constituents columns
+    of a :class:`.columnar.ColumnarCorpus`. Pickled as a :class:`_JsonLoader`."""
+
+    __slots__ = ("corpus", "idx")
+
+    def __init__(self, corpus: columnar.ColumnarCorpus, idx: int):
+        self.corpus = corpus
+        self.idx = idx
+
+    def __call__(self) -> List["LazyLabelNode"]:
+        return [LazyLabelNode.from_columnar(self.corpus, child) for child in self.corpus.node_children(self.idx)]
+
+    def __reduce__(self):
+        return _JsonLoader, (LazyLabelNode.from_json, self.to_json())
+
+    def to_json(self) -> List[Dict]:
+        """Return the loaded labels hierarchies as :meth:`LabelNode.to_json` would, without building the nodes."""
+        return [self.corpus.node_json(child) for child in self.corpus.node_children(self.idx)]
+
+
+def _trees_json(jsonlikes: Iterable[Mapping]) -> List[Dict]:
+    """Return the json-like labels hierarchies `jsonlikes` as :meth:`LabelNode.to_json` would after
+    :meth:`LabelNode.from_json`, without building the nodes."""
+    ret = []
+    level = [(jsonlikes, ret)]
+    while level:
+        next_level = []
+        for jchildren, children in level:
+            for jnode in jchildren:
+                children.append({"label": jnode["label"], "start": jnode["start"], "end": jnode["end"], "children": []})
+                next_level.append((jnode.get("children", ()), children[-1]["children"]))
+        level = next_level
+    return ret
+
+
+class LazyLabelNode(LabelNode):
+    """A :class:`LabelNode` whose :attr:`children` are decoded on first access.
+
+    Built with :meth:`from_json` or :meth:`from_columnar`, each tree level is only expanded when traversed:
+    accessing the :attr:`children` of a node decodes them as unexpanded :class:`LazyLabelNode` instances, from their
+    json-like representation or from the columnar arrays. :meth:`~LabelNode.to_json` serializes the unexpanded
+    levels without decoding them.
+
+    The json-like representation is referenced, not copied: it must not be modified until the tree is expanded.
+    """
+
+    __slots__ = ("_children",)
+
+    children = _LazyList()
+
+    @classmethod
+    def from_json(cls, jsonlike: Mapping) -> "LazyLabelNode":
+        """Instaciate and return an unexpanded `LazyLabelNode` instance from a json-like data structure,
+        see :meth:`LabelNode.from_json`."""
+        inst = cls._from_json_node(jsonlike)
+        inst.children = _JsonLoader(cls.from_json, jsonlike.get("children", ()))
+        return inst
+
+    @classmethod
+    def from_columnar(cls, corpus: columnar.ColumnarCorpus, idx: int) -> "LazyLabelNode":
+        """Instaciate and return an unexpanded `LazyLabelNode` instance from the node at index `idx` of `corpus`.
+
+        The children of a node are found by scanning the subtree sizes column (see
+        :meth:`.columnar.ColumnarCorpus.node_children`), the nodes below are not visited.
+        """
+        start, end, label = corpus.node(idx)
+        inst = cls.__new__(cls)
+        inst.start = start
+        inst.end = end
+        inst.label = sys.intern(label)
+        inst._extras = None
+        inst._extras_shared = False
+        inst.children = _ColumnarLoader(corpus, idx)
+        return inst
+
+    @property
+    def expanded(self) -> bool:
+        """bool: ``True`` if :attr:`children` have been decoded."""
+        return not callable(self._children)
+
+    def __getstate__(self) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Return the pickled state, unexpanded :attr:`children` are pickled as their json-like representation."""
+        slots = (name for klass in type(self).__mro__ for name in getattr(klass, "__slots__", ()))
+        return (
+            getattr(self, "__dict__", None) or None,
+            {name: getattr(self, name) for name in slots if name not in ("children", "__dict__")},
+        )
+
 
 class Context(_SimpleRepr):
     """Represent a context and its computed features.
 
+    :attr:`ner`, :attr:`constituents` and :attr:`qas` can be set to a zero-argument callable returning
+    an iterable, in which case the value is loaded on first access (see :meth:`from_json` `lazy` mode).
+
     Attributes
     ----------
     fpath: str
@@ -388,8 +729,28 @@ class Context(_SimpleRepr):
         The forest of constituent as a list of :class:`LabelNode`; each root is a sentence in the :attr:`text`.
     qas: Iterable of :class:`QA`
         The list of generated question answer pairs
+
+    Instances store their attributes in slots (their ``__dict__`` is only allocated when other attributes are set),
+    :attr:`fpath` and :attr:`doc_title` strings are interned so that the contexts of a file or an article share them.
     """
 
+    __slots__ = (
+        "fpath",
+        "doc_id",
+        "doc_title",
+        "context_id",
+        "text",
+        "_ner",
+        "_constituents",
+        "_qas",
+        "_ner_spans",
+        "__dict__",
+    )
+
+    ner = _LazyList()
+    constituents = _LazyList()
+    qas = _LazyList()
+
     def __init__(
         self,
         fpath: str,
@@ -401,34 +762,85 @@ class Context(_SimpleRepr):
         constituents: Iterable[LabelNode] = (),
         qas: Iterable[QA] = (),
     ):
-        self.fpath: str = fpath
+        self.fpath: str = _intern(fpath)
         self.doc_id: int = doc_id
-        self.doc_title: str = doc_title
+        self.doc_title: str = _intern(doc_title)
         self.context_id: int = context_id
         self.text: str = text
-        self.ner: List[Label] = list(ner)
-        self.constituents: List[LabelNode] = list(constituents)
-        self.qas: List[QA] = list(qas)
+        self.ner: List[Label] = ner
+        self.constituents: List[LabelNode] = constituents
+        self.qas: List[QA] = qas
+        self._ner_spans: Optional[SpanIndex] = None
+
+    @property
+    def ner_index(self) -> SpanIndex:
+        """:class:`SpanIndex`: Index of :attr:`ner` spans, built on first access and rebuilt if :attr:`ner`
+        is replaced or resized."""
+        ner = self.ner
+        index = self._ner_spans
+        if index is None or index.labels is not ner or len(index) != len(ner):
+            index = self._ner_spans = SpanIndex(ner)
+        return index
 
     @classmethod
-    def from_json(cls, data: Dict) -> "Context":
+    def from_json(cls, data: Dict, lazy: bool = False) -> "Context":
         """Instanciate a context from json-like data structure with keys matching this class attributes names.
 
         The classmethod cast sub-dictionnaries of `data` into the appropriate types :class:`Label`, :class:`LabelNode`
         and :class:`QA`.
+
+        Parameters
+        ----------
+        data: dict
+            The json-like context
+        lazy: bool, default=False
+            If ``True``, :attr:`ner`, :attr:`constituents` and :attr:`qas` are decoded on first access
+            and constituents are :class:`LazyLabelNode` trees, expanded level by level when traversed.
+            `data` values are referenced and must not be modified until decoded.
         """
         inst: Context = cls(data["fpath"], data["doc_id"], data["doc_title"], data["context_id"], data["text"])
+        if lazy:
+            inst.ner = _JsonLoader(Label.from_json, data.get("ner", ()))
+            inst.constituents = _JsonLoader(LazyLabelNode.from_json, data.get("constituents", ()))
+            inst.qas = _JsonLoader(QA.from_json, data.get("qas", ()))
+            return inst
         if "ner" in data:
-            for ent in data["ner"]:
-                inst.ner.append(Label(**ent))
+            inst.ner = [Label.from_json(ent) for ent in data["ner"]]
         if "constituents" in data:
-            for sent_consts in data["constituents"]:
-                inst.constituents.append(LabelNode.from_json(sent_consts))
+            inst.constituents = [LabelNode.from_json(sent_consts) for sent_consts in data["constituents"]]
         if "qas" in data:
-            for qa in data["qas"]:
-                inst.qas.append(QA(question=qa["question"], answer=Label(**qa["answer"])))
+            inst.qas = [QA.from_json(qa) for qa in data["qas"]]
         return inst
 
+    @classmethod
+    def from_columnar(cls, fpath: str, corpus: columnar.ColumnarCorpus, article_idx: int, idx: int) -> "Context":
+        """Instanciate a lazy view over the context at index `idx` of `corpus`.
+
+        Only the context text is decoded, :attr:`ner`, :attr:`constituents` and :attr:`qas` are decoded
+        from the memory-mapped columns on first access. Constituents are :class:`LazyLabelNode` trees,
+        expanded level by level when traversed.
+        """
+
+        def load_ner():
+            return [Label(start, end, label) for start, end, label in corpus.entities(idx)]
+
+        def load_constituents():
+            return [LazyLabelNode.from_columnar(corpus, root) for root in corpus.sentence_roots(idx)]
+
+        def load_qas():
+            return [QA(question, Label(start, end, label)) for question, start, end, label in corpus.qas(idx)]
+
+        return cls(
+            fpath,
+            corpus.article_id(article_idx),
+            corpus.article_title(article_idx),
+            corpus.context_id(idx),
+            corpus.context_text(idx),
+            load_ner,
+            load_constituents,
+            load_qas,
+        )
+
     def set_color_all(self, attr_name: str, color: str) -> None:
         """Calls :func:`set_color_all` on the attribute named `attr_name` with `color`."""
         set_color_all(getattr(self, attr_name), color)
@@ -480,8 +892,8 @@ def decorate_span(text_span: str, label: Label, template: str = "[{label} {txt}]
     str:
         `text_span` decorated with `label` according to the template
     """
-    if "color" in label.extras:
-        color: str = label.extras["color"]
+    color: Optional[str] = label.get("color")
+    if color is not None:
         text_span = Fore.RESET + text_span + getattr(Fore, color.upper())
         template = colorize(template, color)
     return template.format(label=label.label, txt=text_span)
@@ -584,21 +996,39 @@ def decorate(
     return _rec(0, len(labels), 0, len(text))
 
 
-def contextify(data_it: dataset.DataIterable) -> Iterable[Context]:
-    """Extract and yield :class:`Context` instances from `default` structre iterable `data_it`."""
-    jcontext = dict()
+def contextify(data_it: dataset.DataIterable, lazy: bool = False) -> Iterable[Context]:
+    """Extract and yield :class:`Context` instances from `default` structre iterable `data_it`.
+
+    Contexts of `columnar` file contents are lazy views (see :meth:`Context.from_columnar`),
+    see :func:`contextify_articles` for `lazy` argument.
+    """
     for fpath, fcontent in data_it:
+        if isinstance(fcontent, columnar.ColumnarCorpus):
+            for article_idx in range(len(fcontent)):
+                for idx in fcontent.article_contexts(article_idx):
+                    yield Context.from_columnar(fpath, fcontent, article_idx, idx)
+        else:
+            yield from contextify_articles(((fpath, article) for article in fcontent), lazy)
+
+
+def contextify_articles(article_it: dataset.ArticleIterable, lazy: bool = False) -> Iterable[Context]:
+    """Extract and yield :class:`Context` instances from `default` structre article iterable `article_it`.
+
+    If `lazy` is ``True``, contexts entities, constituents and question / answer pairs are decoded on first
+    access and constituents trees are expanded level by level (see :meth:`Context.from_json`).
+    """
+    jcontext = dict()
+    for fpath, article in article_it:
         jcontext["fpath"] = fpath
-        for article in fcontent:
-            jcontext["doc_id"] = article["id_article"]
-            jcontext["doc_title"] = article["title"]
-            for para in article["contexts"]:
-                jcontext["context_id"] = para["id_context"]
-                jcontext["text"] = para["text"]
-                jcontext["ner"] = para.get("entities", ())
-                jcontext["constituents"] = para.get("constituency", ())
-                jcontext["qas"] = para.get("qas", ())
-                yield Context.from_json(jcontext)
+        jcontext["doc_id"] = article["id_article"]
+        jcontext["doc_title"] = article["title"]
+        for para in article["contexts"]:
+            jcontext["context_id"] = para["id_context"]
+            jcontext["text"] = para["text"]
+            jcontext["ner"] = para.get("entities", ())
+            jcontext["constituents"] = para.get("constituency", ())
+            jcontext["qas"] = para.get("qas", ())
+            yield Context.from_json(jcontext, lazy)
 
 
 def contextify_rd(data_it) -> Iterable[Context]:
@@ -626,29 +1056,41 @@ def jsonify(context_it: Iterable[Context], include_qas: bool = True) -> dataset.
     include_qas: bool, default=True
         If ``False`` discard :attr:`Context.qas` values.
     """
-    articles_dict = dict()
-    cur_fpath = None
+    yield from dataset.from_articles(jsonify_articles(context_it, include_qas))
+
+
+def jsonify_articles(context_it: Iterable[Context], include_qas: bool = True) -> dataset.ArticleIterable:
+    """Reverse operation of :func:`conetxtify_articles`,
+    recrate an article iterable from an ordered `context_it`.
+
+    `context_it` must yield context in the order it was created by :func:`contextify_articles`,
+    each article is yielded as soon as a context from another article (or file) is encountered.
+
+    Parameters
+    ----------
+    context_it: Iterable of :class:`Context`
+        Context iterable
+    include_qas: bool, default=True
+        If ``False`` discard :attr:`Context.qas` values.
+    """
+    cur_key = None
+    article = None
     for context in context_it:
-        if cur_fpath is None:
-            cur_fpath = context.fpath
-        if context.fpath != cur_fpath:
-            json_content = [article for _, article in sorted(articles_dict.items())]
-            yield cur_fpath, json_content
-            articles_dict.clear()
-            cur_fpath = context.fpath
-        else:
-            if context.doc_id not in articles_dict:
-                articles_dict[context.doc_id] = dict(id_doc=context.doc_id, title=context.doc_title, contexts=list())
-            dct = dict(
-                id_context=context.context_id,
-                text=context.text,
-                entities=[el.to_json() for el in context.ner],
-                constituency=[el.to_json() for el in context.constituents],
-            )
-            if include_qas:
-                dct["qas"] = [qa.to_json() for qa in context.qas]
-            articles_dict[context.doc_id]["contexts"].append(dct)
-
-    # yield last json file content
-    json_content = [article for _, article in sorted(articles_dict.items())]
-    yield cur_fpath, json_content
+        if (context.fpath, context.doc_id) != cur_key:
+            if article is not None:
+                yield cur_key[0], article
+            cur_key = (context.fpath, context.doc_id)
+            article = dict(id_doc=context.doc_id, title=context.doc_title, contexts=list())
+        dct = dict(
+            id_context=context.context_id,
+            text=context.text,
+            entities=[el.to_json() for el in context.ner],
+            constituency=[el.to_json() for el in context.constituents],
+        )
+        if include_qas:
+            dct["qas"] = [qa.to_json() for qa in context.qas]
+        article["contexts"].append(dct)
+
+    # yield last article
+    if article is not None:
+        yield cur_key[0], article
@@ -4,6 +4,9 @@ Classes to load and save data.
 :class:`DataLoader` and :class:`DataDumper` are designed to work with/as :obj:`DataIterable` types,
 while encapsulating the different dataset structure and format specificities.
 
+Processing steps can also work at article granularity with :obj:`ArticleIterable` types,
+see :func:`to_articles`, :func:`from_articles` and :meth:`DataDumper.save_articles`.
+
 Examples
 --------
 Read a single file pickle dataset, process it and save a single json file::
@@ -53,23 +56,51 @@ Read a directory json dataset, process it and write result in a new directory.::
     ... ).save(data_it)                     # Save the processed data
     >>> # For each file with path "bar/{subpath}" a file "foo/baz/{subpath}" is created.
     >>> # All non-exsting directories and sub-directories are also created
+
+Stream articles from a JSON-lines file, process them one at a time and append them to a new file::
+
+    >>> dataloader = FileDataLoader("data.jsonl", fileformat="jsonl")
+    >>> # Processing returns an `ArticleIterable` yielding each article as soon as it is processed
+    >>> article_it = some_article_processing_step(to_articles(dataloader))
+    >>> path_modifier = DataDumper.path_replacer("foo/data.jsonl")
+    >>> DataDumper(fileformat="jsonl", path_modifier=path_modifier).save_articles(article_it)
 """
 
 import abc
+import bz2
+import collections
+import contextlib
 import copy
 import errno
+import functools
+import gzip
+import itertools
 import logging
+import lzma
+import operator
 import os
 import pickle
+import queue
 import random as rd
+import threading
+import uuid
+from concurrent import futures
+from json import JSONDecodeError, JSONDecoder
 from os import path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 
 try:
     import ujson as json
 except ModuleNotFoundError:
     import json
 
+try:
+    import zstandard
+except ModuleNotFoundError:
+    zstandard = None
+
+from uqa import columnar, metrics
+
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 #: | Json-like container, representing data usually in `default` format.
@@ -79,9 +110,74 @@ TJson = Union[Dict, List]
 #: Dataset Iterable, each element is a pair ``(path, fcontent)``
 #:
 #: * **path** (`str`) -- File's path
-#: * **fcontent** (:obj:`TJson`) -- File's content
+#: * **fcontent** (:obj:`TJson`) -- File's content, a lazy iterable of articles for `jsonl` files
 DataIterable = Iterable[Tuple[str, TJson]]
 
+#: Article Iterable, each element is a pair ``(path, article)``
+#:
+#: * **path** (`str`) -- Path of the file the article belongs to
+#: * **article** (:obj:`TJson`) -- A single article in `default` data format
+#:
+#: Consecutive elements with the same path belong to the same file,
+#: see :func:`to_articles` and :func:`from_articles` to convert from / to :obj:`DataIterable`.
+ArticleIterable = Iterable[Tuple[str, TJson]]
+
+#: Incremental FQuAD parsing event, a triplet ``(kind, position, value)``, see :func:`read_json_incremental`
+FQuADEvent = Tuple[str, Any, Any]
+
+#: Supported file formats
+FILEFORMATS = ["json", "jsonl", "pickle", "columnar"]
+
+#: Supported compressions, identified by the compressed files extension (``zst`` requires `zstandard` package)
+COMPRESSIONS = ["gz", "bz2", "xz", "zst"]
+
+
+def get_compression(fpath: str) -> Optional[str]:
+    """Return the compression of file `fpath` from its extension (one of :obj:`COMPRESSIONS`) or ``None``."""
+    extension = path.splitext(fpath)[1].strip(".").lower()
+    return extension if extension in COMPRESSIONS else None
+
+
+def open_file(fpath: str, mode: str = "r", compresslevel: Optional[int] = None):
+    """Open file `fpath`, transparently (de)compressing it if its extension is one of :obj:`COMPRESSIONS`.
+
+    Parameters
+    ----------
+    fpath: str
+        Relative or absolute path of the file to open
+    mode: str, default="r"
+        Opening mode, text modes use utf8 encoding
+    compresslevel: int, default=None
+        Compression level when writing a compressed file, ``None`` for the compression library default.
+        Ignored for uncompressed files.
+
+    Returns
+    -------
+    file object
+        A file object streaming the (de)compressed content
+    """
+    binary = "b" in mode
+    if not binary and "t" not in mode:
+        mode += "t"
+    encoding = None if binary else "utf8"
+    compression = get_compression(fpath)
+    writing = "r" not in mode
+    if compression is None:
+        return open(fpath, mode, encoding=encoding)
+    if compression == "gz":
+        level = 9 if compresslevel is None else compresslevel
+        return gzip.open(fpath, mode, compresslevel=level, encoding=encoding)
+    if compression == "bz2":
+        level = 9 if compresslevel is None else compresslevel
+        return bz2.open(fpath, mode, compresslevel=level, encoding=encoding)
+    if compression == "xz":
+        return lzma.open(fpath, mode, preset=compresslevel if writing else None, encoding=encoding)
+    if zstandard is None:
+        raise ModuleNotFoundError(f"'zstandard' package is required to open zstd compressed file {fpath}")
+    if writing and compresslevel is not None:
+        return zstandard.open(fpath, mode, cctx=zstandard.ZstdCompressor(level=compresslevel), encoding=encoding)
+    return zstandard.open(fpath, mode, encoding=encoding)
+
 
 def read_json(fpath: str) -> TJson:
     """Read a json file and return its content.
@@ -97,7 +193,7 @@ def read_json(fpath: str) -> TJson:
         The JSON file's content
     """
     logger.debug(f"Reading: json file: {fpath}")
-    with open(fpath, "r", encoding="utf8") as file:
+    with open_file(fpath, "r") as file:
         fcontent = json.load(file)
     logging.debug(f"Loaded: {fpath}")
     return fcontent
@@ -117,13 +213,234 @@ def read_pickle(fpath: str) -> Any:
         The unpickled object
     """
     logger.debug(f"Reading: pickle file: {fpath}")
-    with open(fpath, "rb",) as file:
+    with open_file(fpath, "rb") as file:
         fcontent = pickle.load(file)
     logging.debug(f"Loaded: {fpath}")
     return fcontent
 
 
-def write_json(fpath: str, fcontent: TJson, override: bool = False, indent: int = 0, **kwargs) -> None:
+def read_jsonl(fpath: str) -> Iterator[TJson]:
+    """Lazily read a JSON-lines file, one article per line.
+
+    The file is only opened when the returned iterator is consumed and a single line
+    is held in memory at a time.
+
+    Parameters
+    ----------
+    fpath: str
+        Relative or absolute path of the JSON-lines file to read
+
+    Yields
+    ------
+    :obj:`TJson`
+        The decoded articles, in file order
+    """
+    logger.debug(f"Reading: jsonl file: {fpath}")
+    with open_file(fpath, "r") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+    logging.debug(f"Loaded: {fpath}")
+
+
+class _JsonStream:
+    """Minimal incremental JSON reader.
+
+    Containers can be walked one element at a time with :meth:`iter_array` and :meth:`iter_object`,
+    while any other value is decoded at once with :meth:`value`. Only the not yet consumed part of
+    the file is kept in memory.
+    """
+
+    def __init__(self, file, chunk_size: int = 1 << 16):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = JSONDecoder()
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """Read at least one more chunk, returns ``False`` at the end of the file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(max(self._chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespaces and return the next character without consuming it, ``""`` at the end of the file."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\n\r":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume the next non-whitespace character which must be `char`."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"invalid JSON: expected '{char}', found '{found}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode and return the next JSON value."""
+        self.peek()
+        read_size = self._chunk_size
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except JSONDecodeError:
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            # A number ending with the buffer could be truncated
+            if isinstance(obj, (int, float)) and not isinstance(obj, bool):
+                num_end = end
+                while num_end < len(self._buf) and self._buf[num_end] in "0123456789.eE+-":
+                    num_end += 1
+                if num_end == len(self._buf) and self._fill(read_size):
+                    continue
+            self._pos = end
+            return obj
+
+    def iter_array(self) -> Iterator[int]:
+        """Walk an array, yielding each element index; the caller must consume the element before resuming."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        idx = 0
+        while True:
+            yield idx
+            idx += 1
+            if self.peek() == ",":
+                self._pos += 1
+            else:
+                self.expect("]")
+                return
+
+    def iter_object(self) -> Iterator[str]:
+        """Walk an object, yielding each key; the caller must consume the value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+            else:
+                self.expect("}")
+                return
+
+
+def read_json_incremental(fpath: str, dataformat: str = "default") -> Iterator[Any]:
+    """Lazily parse a JSON file, holding at most one article (or paragraph) in memory.
+
+    | With the `default` data format, yield the articles, as :func:`read_jsonl` does.
+    | With the `fquad` data format, walk ``data[*].paragraphs[*]`` and yield :obj:`FQuADEvent` triplets
+      ``(kind, position, value)``:
+
+    * ``("paragraph", (idx_article, idx_paragraph), paragraph)`` for each paragraph
+    * ``("article", idx_article, article)`` after the article paragraphs, where `article` contains
+      the article fields but ``paragraphs`` which is replaced with the number of paragraphs (if present)
+    * ``("root", key, value)`` for each root level field, ``data`` value is replaced with the number of articles
+
+    Parameters
+    ----------
+    fpath: str
+        Relative or absolute path of the JSON file to read
+    dataformat: str, ["default", "fquad"], default="default"
+        The data format of the file
+
+    Yields
+    ------
+    :obj:`TJson` or :obj:`FQuADEvent`
+        The articles or the parsing events, in file order
+    """
+    logger.debug(f"Reading: json file incrementally: {fpath}")
+    with open_file(fpath, "r") as file:
+        stream = _JsonStream(file)
+        if dataformat == "fquad":
+            yield from _walk_fquad(stream)
+        else:
+            for _ in stream.iter_array():
+                yield stream.value()
+    logging.debug(f"Loaded: {fpath}")
+
+
+def _walk_fquad(stream: _JsonStream) -> Iterator[FQuADEvent]:
+    """Yield :obj:`FQuADEvent` from a FQuAD format json stream, see :func:`read_json_incremental`."""
+    for key in stream.iter_object():
+        if key != "data":
+            yield "root", key, stream.value()
+            continue
+        num_articles = 0
+        for idx_article in stream.iter_array():
+            num_articles += 1
+            article = dict()
+            for article_key in stream.iter_object():
+                if article_key != "paragraphs":
+                    article[article_key] = stream.value()
+                    continue
+                article["paragraphs"] = 0
+                for idx_paragraph in stream.iter_array():
+                    yield "paragraph", (idx_article, idx_paragraph), stream.value()
+                    article["paragraphs"] += 1
+            yield "article", idx_article, article
+        yield "root", "data", num_articles
+
+
+def _check_write_path(fpath: str, override: bool) -> None:
+    """Raise :exc:`FileExistsError` if `fpath` exists and `override` is ``False``, create parent directories."""
+    if path.exists(fpath):
+        if not override:
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), fpath)
+        else:
+            logger.debug(f"Overriding: {fpath}")
+    path_dir = path.split(fpath)[0]
+    if path_dir:
+        os.makedirs(path_dir, exist_ok=True)
+
+
+@contextlib.contextmanager
+def _atomic_write_path(fpath: str) -> Iterator[str]:
+    """Context manager yielding a temporary path next to `fpath`, moved to `fpath` on success and removed on error.
+
+    A failing (or interrupted) writer never leaves a partial file at `fpath`, which would be taken
+    as complete by the skip callbacks (see :meth:`DataDumper.make_skip_cb`). The temporary path only keeps
+    `fpath` compression extension, so that it is compressed alike but never discovered as a data file.
+    """
+    dirpath, filename = path.split(fpath)
+    compression = get_compression(fpath)
+    suffix = f".{compression}" if compression else ""
+    tmp_path = path.join(dirpath, f".{filename}.{uuid.uuid4().hex[:8]}.tmp{suffix}")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, fpath)
+    except BaseException:
+        if path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json(
+    fpath: str,
+    fcontent: TJson,
+    override: bool = False,
+    indent: int = 0,
+    compresslevel: Optional[int] = None,
+    **kwargs,
+) -> None:
     """Write `fcontent` json-like structure at path `fpath`.
 
     Parameters
@@ -137,6 +454,8 @@ def write_json(fpath: str, fcontent: TJson, override: bool = False, indent: int
         else if override is ``False`` a :exc:`FileExistsError` exception is raised.
     indent: int, default=0
         JSON indentation number of whitespace to use, use 0 for compact JSON
+    compresslevel: int, default=None
+        Compression level if `fpath` extension is one of :obj:`COMPRESSIONS`, see :func:`open_file`.
 
     Keyword Args
     ------------
@@ -144,20 +463,15 @@ def write_json(fpath: str, fcontent: TJson, override: bool = False, indent: int
         Ignored.
     """
     logger.debug(f"Writing: json file: {fpath}")
-    if path.exists(fpath):
-        if not override:
-            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), fpath)
-        else:
-            logger.debug(f"Overriding: {fpath}")
-    path_dir = path.split(fpath)[0]
-    if path_dir:
-        os.makedirs(path_dir, exist_ok=True)
-    with open(fpath, "w", encoding="utf8") as file:
-        fcontent = json.dump(fcontent, file, ensure_ascii=False, indent=indent)
+    _check_write_path(fpath, override)
+    with _atomic_write_path(fpath) as tmp_path, open_file(tmp_path, "w", compresslevel) as file:
+        json.dump(fcontent, file, ensure_ascii=False, indent=indent)
     logging.debug(f"Written: {fpath}")
 
 
-def write_pickle(fpath: str, fcontent: Any, override: bool = False, **kwargs) -> None:
+def write_pickle(
+    fpath: str, fcontent: Any, override: bool = False, compresslevel: Optional[int] = None, **kwargs
+) -> None:
     """Picke and write `fcontent` object at path `fpath`.
 
     Parameters
@@ -169,6 +483,8 @@ def write_pickle(fpath: str, fcontent: Any, override: bool = False, **kwargs) ->
     override: bool, default=False
         If a file with path `fpath` already exists and overriden is ``True`` the file is overriden,
         else if override is ``False`` a :exc:`FileExistsError` exception is raised.
+    compresslevel: int, default=None
+        Compression level if `fpath` extension is one of :obj:`COMPRESSIONS`, see :func:`open_file`.
 
     Keyword Args
     ------------
@@ -176,19 +492,185 @@ def write_pickle(fpath: str, fcontent: Any, override: bool = False, **kwargs) ->
         Ignored.
     """
     logger.debug(f"Writing: pickle file: {fpath}")
-    if path.exists(fpath):
-        if not override:
-            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), fpath)
-        else:
-            logger.debug(f"Overriding: {fpath}")
-    path_dir = path.split(fpath)[0]
-    if path_dir:
-        os.makedirs(path_dir, exist_ok=True)
-    with open(fpath, "wb") as file:
-        fcontent = pickle.dump(fcontent, file)
+    _check_write_path(fpath, override)
+    with _atomic_write_path(fpath) as tmp_path, open_file(tmp_path, "wb", compresslevel) as file:
+        pickle.dump(fcontent, file)
+    logging.debug(f"Written: {fpath}")
+
+
+def write_jsonl(
+    fpath: str, fcontent: Iterable[TJson], override: bool = False, compresslevel: Optional[int] = None, **kwargs
+) -> None:
+    """Write `fcontent` articles at path `fpath` in JSON-lines format, one article per line.
+
+    Articles are encoded and written one at a time, so `fcontent` can be a lazy iterable. They are written
+    to a temporary file moved to `fpath` once `fcontent` is exhausted, no file is left at `fpath` on error.
+
+    Parameters
+    ----------
+    fpath: str
+        Relative or absolute path of the file to write.
+    fcontent: Iterable of :obj:`TJson`
+        Articles to write, usually a list in `default` data format or an iterator over its elements.
+    override: bool, default=False
+        If a file with path `fpath` already exists and overriden is ``True`` the file is overriden,
+        else if override is ``False`` a :exc:`FileExistsError` exception is raised.
+    compresslevel: int, default=None
+        Compression level if `fpath` extension is one of :obj:`COMPRESSIONS`, see :func:`open_file`.
+
+    Keyword Args
+    ------------
+    kwargs
+        Ignored.
+    """
+    if isinstance(fcontent, Mapping):
+        raise ValueError(f"cannot write {fpath} in jsonl fileformat: content must be an iterable of articles")
+    logger.debug(f"Writing: jsonl file: {fpath}")
+    _check_write_path(fpath, override)
+    with _atomic_write_path(fpath) as tmp_path, open_file(tmp_path, "w", compresslevel) as file:
+        for article in fcontent:
+            file.write(json.dumps(article, ensure_ascii=False))
+            file.write("\n")
+    logging.debug(f"Written: {fpath}")
+
+
+def read_columnar(fpath: str) -> columnar.ColumnarCorpus:
+    """Memory-map a `columnar` file and return a read-only sequence view over its articles.
+
+    Parameters
+    ----------
+    fpath: str
+        Relative or absolute path of the columnar file to read
+
+    Returns
+    -------
+    :class:`.columnar.ColumnarCorpus`
+        The articles sequence, decoded on access
+    """
+    if get_compression(fpath) is not None:
+        raise ValueError(f"cannot read {fpath}: columnar files are memory-mapped and cannot be compressed")
+    logger.debug(f"Reading: columnar file: {fpath}")
+    fcontent = columnar.ColumnarCorpus(fpath)
+    logging.debug(f"Loaded: {fpath}")
+    return fcontent
+
+
+def write_columnar(fpath: str, fcontent: Iterable[TJson], override: bool = False, **kwargs) -> None:
+    """Write `fcontent` articles at path `fpath` in binary `columnar` format (see :mod:`uqa.columnar`).
+
+    Parameters
+    ----------
+    fpath: str
+        Relative or absolute path of the file to write.
+    fcontent: Iterable of :obj:`TJson`
+        Articles to write in `default` data format.
+    override: bool, default=False
+        If a file with path `fpath` already exists and overriden is ``True`` the file is overriden,
+        else if override is ``False`` a :exc:`FileExistsError` exception is raised.
+
+    Keyword Args
+    ------------
+    kwargs
+        Ignored.
+    """
+    if isinstance(fcontent, Mapping):
+        raise ValueError(f"cannot write {fpath} in columnar fileformat: content must be an iterable of articles")
+    if get_compression(fpath) is not None:
+        raise ValueError(f"cannot write {fpath}: columnar files are memory-mapped and cannot be compressed")
+    logger.debug(f"Writing: columnar file: {fpath}")
+    _check_write_path(fpath, override)
+    with _atomic_write_path(fpath) as tmp_path:
+        columnar.dump(tmp_path, fcontent)
     logging.debug(f"Written: {fpath}")
 
 
+#: Reader function per file format
+READERS: Dict[str, Callable[[str], Any]] = {
+    "json": read_json,
+    "jsonl": read_jsonl,
+    "pickle": read_pickle,
+    "columnar": read_columnar,
+}
+
+#: Writer function per file format
+WRITERS: Dict[str, Callable[..., None]] = {
+    "json": write_json,
+    "jsonl": write_jsonl,
+    "pickle": write_pickle,
+    "columnar": write_columnar,
+}
+
+
+def map_articles(fcontent: Iterable[TJson], func: Callable[[TJson], TJson]) -> Iterable[TJson]:
+    """Apply `func` to each article of `fcontent`.
+
+    Returns a list if `fcontent` is a list, else a lazy iterator so that streamed
+    file contents (see :func:`read_jsonl`) are never materialized.
+
+    Parameters
+    ----------
+    fcontent: Iterable of :obj:`TJson`
+        A file content in `default` data format, either a list or a lazy iterable of articles
+    func: Callable[[TJson], TJson]
+        The function to apply to each article
+
+    Returns
+    -------
+    Iterable of :obj:`TJson`
+        The mapped articles
+    """
+    if isinstance(fcontent, list):
+        return [func(article) for article in fcontent]
+    return (func(article) for article in fcontent)
+
+
+def to_articles(data_it: DataIterable) -> ArticleIterable:
+    """Convert a :obj:`DataIterable` in `default` data format into an :obj:`ArticleIterable`.
+
+    File contents are iterated lazily, so streamed contents (see :func:`read_jsonl`) are never materialized.
+
+    Parameters
+    ----------
+    data_it: :obj:`DataIterable`
+        A dataset iterable in `default` data format
+
+    Yields
+    ------
+    str
+        The article file path
+    :obj:`TJson`
+        The article
+    """
+    for fpath, fcontent in data_it:
+        for article in fcontent:
+            yield fpath, article
+
+
+def from_articles(article_it: ArticleIterable, lazy: bool = False) -> DataIterable:
+    """Regroup consecutive articles of `article_it` with the same path into a :obj:`DataIterable`.
+
+    Files without any article are not part of an :obj:`ArticleIterable` and are thus not yielded.
+
+    Parameters
+    ----------
+    article_it: :obj:`ArticleIterable`
+        An article iterable
+    lazy: bool, default=False
+        If ``True`` yielded file contents are lazy iterators over the articles instead of lists,
+        each one must be consumed before requesting the next element.
+
+    Yields
+    ------
+    str
+        The file path
+    :obj:`TJson`
+        The file content, list of articles (or iterator if `lazy` is ``True``)
+    """
+    for fpath, group in itertools.groupby(article_it, key=operator.itemgetter(0)):
+        articles = (article for _, article in group)
+        yield fpath, articles if lazy else list(articles)
+
+
 class DataLoader(abc.ABC):
     """Data loaders base class.
 
@@ -204,6 +686,10 @@ class DataLoader(abc.ABC):
     skip_file_cb: Callable[[str], bool], default=None
         If provided, each file's path in the dataset is passed to this callback, if the callback returns ``True``
         the file is skipped
+    prefetch: int, default=0
+        Number of files read ahead in a background thread pool, 0 to read files synchronously.
+    prefetch_max_bytes: int, default=None
+        If provided, bound the total on-disk size of the files read ahead.
 
     See Also
     --------
@@ -217,6 +703,9 @@ class DataLoader(abc.ABC):
         dataformat: str = "default",
         sort_filename: bool = True,
         skip_file_cb: Optional[Callable[[str], bool]] = None,
+        incremental: bool = False,
+        prefetch: int = 0,
+        prefetch_max_bytes: Optional[int] = None,
     ) -> None:
         """
         Parameters
@@ -225,10 +714,16 @@ class DataLoader(abc.ABC):
             | Path(s) to a file or directory.
             | A path to a directory will be recursively explored and files with the correct extension
               will be considered part of the dataset.
-        fileformat: str, ["json", "pickle"], default="json"
+        fileformat: str, ["json", "jsonl", "pickle"], default="json"
             | A supported fileformat.
             | With ``"json"`` fileformat only ``*.json`` will be matched when exploring a folder.
+            | With ``"jsonl"`` fileformat only ``*.jsonl`` will be matched when exploring a folder,
+              file contents are lazy iterators over the articles (see :func:`read_jsonl`).
             | With ``"pickle"`` fileformat only ``*.pickle`` will be matched when exploring a folder.
+            | With ``"columnar"`` fileformat only ``*.columnar`` will be matched when exploring a folder,
+              file contents are memory-mapped :class:`.columnar.ColumnarCorpus` instances.
+            | Except for ``"columnar"``, compressed files (i.e. ``*.json.gz``) are also matched and transparently
+              decompressed while read, see :obj:`COMPRESSIONS`.
         dataformat: str, ["default", "fquad"], default="default"
             | One of the supported data format.
             | The given value is only stored and does not affect the instance behaviour.
@@ -238,27 +733,49 @@ class DataLoader(abc.ABC):
         skip_file_cb: Callable[[str], bool], default=None
             If provided, each file's path in the dataset is passed to this callback, if the callback returns ``True``
             the file is skipped
+        incremental: bool, default=False
+            | If ``True``, JSON files are parsed incrementally (see :func:`read_json_incremental`):
+            | with `default` data format file contents are lazy iterators over the articles,
+            | with `fquad` data format file contents are iterators over :obj:`FQuADEvent` triplets.
+        prefetch: int, default=0
+            | Number of files to read and decode ahead in a background thread pool while the current file
+              is being processed, 0 to read files synchronously.
+            | Files order and :attr:`skip_file_cb` behaviour are unchanged.
+            | Ignored for lazily read files (`jsonl` and `columnar` fileformats or `incremental` parsing).
+        prefetch_max_bytes: int, default=None
+            If provided, bound the total on-disk size of the files read ahead,
+            a single file is always read ahead regardless of its size.
         """
         datapath = [datapath] if isinstance(datapath, str) else list(datapath)
         self._datapath = datapath
 
-        valid_fileformat = ["json", "pickle"]
         fileformat = fileformat.lower()
-        if fileformat not in valid_fileformat:
-            raise ValueError(f"invalid `fileformat`: '{fileformat}'; must be one of {valid_fileformat}")
+        if fileformat not in FILEFORMATS:
+            raise ValueError(f"invalid `fileformat`: '{fileformat}'; must be one of {FILEFORMATS}")
         self._fileformat = fileformat
 
         self._dataformat = dataformat
         self.sort_filename: bool = sort_filename
         self.skip_file_cb: Callable = skip_file_cb
+        self.incremental: bool = incremental
+        self.prefetch: int = prefetch
+        self.prefetch_max_bytes: Optional[int] = prefetch_max_bytes
+        self._lazy_reader = fileformat in ("jsonl", "columnar") or (incremental and fileformat == "json")
+        self._pool: Optional[futures.ThreadPoolExecutor] = None
+        self._pending = collections.deque()
+        self._lookahead: Optional[str] = None
+        self._inflight = 0
+        self._inflight_bytes = 0
 
         self._num_files = len(self.filepaths())
         self._paths_it = iter(self.filepaths())
         self._i = 0
-        if fileformat == "json":
-            self._reader = read_json
-        elif fileformat == "pickle":
-            self._reader = read_pickle
+        self._reader = READERS[fileformat]
+        if incremental:
+            if fileformat in ("pickle", "columnar"):
+                raise ValueError(f"incremental parsing is not supported with `{fileformat}` fileformat")
+            if fileformat == "json":
+                self._reader = functools.partial(read_json_incremental, dataformat=dataformat)
 
     @property
     def datapath(self) -> List[str]:
@@ -267,7 +784,7 @@ class DataLoader(abc.ABC):
 
     @property
     def fileformat(self) -> str:
-        """str: File format, one of (`json`, `pickle`)."""
+        """str: File format, one of (`json`, `jsonl`, `pickle`, `columnar`)."""
         return self._fileformat
 
     @property
@@ -280,6 +797,14 @@ class DataLoader(abc.ABC):
         """int: Number of files in the dataset."""
         return self._num_files
 
+    def subset(self, fpaths: Iterable[str]) -> "FileDataLoader":
+        """Return a :class:`FileDataLoader` over `fpaths` with the same format and parsing settings.
+
+        | Files are not prefetched and not skipped, the returned loader is picklable.
+        | Used to dispatch the files of a dataset to worker processes (see :mod:`uqa.parallel`).
+        """
+        return FileDataLoader(fpaths, self.fileformat, self.dataformat, incremental=self.incremental)
+
     @abc.abstractmethod
     def filepaths(self) -> List[str]:
         """Return the list of file paths in the dataset, order depends on :attr:`sort_filename` value."""
@@ -295,16 +820,79 @@ class DataLoader(abc.ABC):
         """
         self._paths_it = iter(self.filepaths())
         self._i = 0
+        self._close_pool()
+        if self.prefetch > 0 and not self._lazy_reader:
+            self._pool = futures.ThreadPoolExecutor(self.prefetch, thread_name_prefix="uqa-prefetch")
         return self
 
     def __next__(self) -> Any:
-        fpath = next(self._paths_it)
-        self._i += 1
-        logger.info(f"[{self._i} / {self.num_files}] {fpath}")
-        if self.skip_file_cb is not None and self.skip_file_cb(fpath):
-            logger.info(f"Skipped!")
-            return next(self)
-        return fpath, self._reader(fpath)
+        while True:
+            if self._pool is None:
+                fpath, future = next(self._paths_it), None
+            else:
+                fpath, future = self._next_prefetched()
+            self._i += 1
+            logger.info(f"[{self._i} / {self.num_files}] {fpath}")
+            if self.skip_file_cb is not None and self.skip_file_cb(fpath):
+                logger.info(f"Skipped!")
+                if future is not None:
+                    future.cancel()
+                continue
+            with metrics.timer("read", "io"):
+                return fpath, self._reader(fpath) if future is None else future.result()
+
+    def _next_prefetched(self) -> Tuple[str, Optional[futures.Future]]:
+        """Pop the next path and its reading future (``None`` if skipped) and schedule the next reads."""
+        self._schedule_reads()
+        if not self._pending:
+            self._close_pool()
+            raise StopIteration
+        fpath, future, size = self._pending.popleft()
+        if future is not None:
+            self._inflight -= 1
+            self._inflight_bytes -= size
+        self._schedule_reads()
+        return fpath, future
+
+    def _schedule_reads(self) -> None:
+        """Submit reads for the next files until :attr:`prefetch` files or :attr:`prefetch_max_bytes` are reached.
+
+        Skipped files are queued without being read.
+        """
+        while self._inflight < self.prefetch:
+            if self._lookahead is None:
+                self._lookahead = next(self._paths_it, None)
+                if self._lookahead is None:
+                    return
+            fpath = self._lookahead
+            if self.skip_file_cb is not None and self.skip_file_cb(fpath):
+                self._pending.append((fpath, None, 0))
+                self._lookahead = None
+                continue
+            size = path.getsize(fpath)
+            if (
+                self.prefetch_max_bytes is not None
+                and self._inflight > 0
+                and self._inflight_bytes + size > self.prefetch_max_bytes
+            ):
+                return
+            self._pending.append((fpath, self._pool.submit(self._reader, fpath), size))
+            self._inflight += 1
+            self._inflight_bytes += size
+            self._lookahead = None
+
+    def _close_pool(self) -> None:
+        """Cancel pending reads and shutdown the prefetching thread pool if any."""
+        for _, future, _ in self._pending:
+            if future is not None:
+                future.cancel()
+        self._pending.clear()
+        self._lookahead = None
+        self._inflight = 0
+        self._inflight_bytes = 0
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
 
 
 class FileDataLoader(DataLoader):
@@ -328,9 +916,10 @@ class DirDataLoader(DataLoader):
         fileformat: str,
         dataformat: str = "default",
         sort_filename: bool = True,
+        **kwargs,
     ):
         self._paths = None
-        super().__init__(datapath, fileformat, dataformat, sort_filename)
+        super().__init__(datapath, fileformat, dataformat, sort_filename, **kwargs)
 
     def filepaths(self) -> List[str]:
         if self._paths is None:
@@ -348,6 +937,9 @@ class DirDataLoader(DataLoader):
     def discover_files(dirpath: str, extension: str) -> List[str]:
         """Recursively find the files with `extension` in the directory `dir_path` and its subdirectories.
 
+        Compressed files with `extension` followed by one of the :obj:`COMPRESSIONS` extension are also matched
+        (i.e. ``*.json.gz`` for ``"json"`` extension).
+
         Parameters
         ----------
         dirpath: str
@@ -364,16 +956,66 @@ class DirDataLoader(DataLoader):
         extension = extension.strip(".").lower()
         for subdirpath, _, files in os.walk(dirpath):
             for filename in files:
-                if path.splitext(filename)[1].strip(".").lower() == extension:
+                if get_compression(filename) is not None:
+                    filename_root = path.splitext(filename)[0]
+                else:
+                    filename_root = filename
+                if path.splitext(filename_root)[1].strip(".").lower() == extension:
                     paths.append(path.join(subdirpath, filename))
         return paths
 
 
+class _BackgroundWriter:
+    """Run write calls in a background thread fed through a bounded queue.
+
+    The first write error is re-raised by the following :meth:`submit` call or by :meth:`close`,
+    subsequent writes are discarded.
+    """
+
+    def __init__(self, write: Callable[[str, Any], None], max_pending: int):
+        self._write = write
+        self._queue = queue.Queue(max(max_pending, 1))
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="uqa-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is None:
+                try:
+                    self._write(*item)
+                except BaseException as err:  # pylint: disable=broad-except
+                    self._error = err
+
+    def raise_error(self) -> None:
+        """Re-raise the first write error if any."""
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, fpath: str, fcontent: Any) -> None:
+        """Queue a write, block while :attr:`max_pending` writes are already queued."""
+        self.raise_error()
+        self._queue.put((fpath, fcontent))
+
+    def close(self, raise_error: bool = True) -> None:
+        """Wait for the queued writes to complete."""
+        self._queue.put(None)
+        self._thread.join()
+        if raise_error:
+            self.raise_error()
+
+
 class DataDumper:
     """Data dumping class.
 
-    | Implement fetures for saving a :obj:`DataIterable` in JSON or Pickle format as well
+    | Implement fetures for saving a :obj:`DataIterable` or an :obj:`ArticleIterable`
+      in JSON, JSON-lines, Pickle or binary columnar format as well
       as path modifier factories.
+    | JSON, JSON-lines and Pickle files are compressed according to their extension (see :func:`open_file`).
+    | With the JSON-lines format articles are written one at a time, so lazy file contents are never materialized.
 
     Attributes
     ----------
@@ -382,50 +1024,131 @@ class DataDumper:
     override: bool, default=False
         Flag setting existing file overriding behaviour
     json_indent: int, default=0
-        JSON indentation number of whitespace, ignored if using Pickle fileformat
+        JSON indentation number of whitespace, ignored if not using JSON fileformat
+    background: bool, default=False
+        If ``True``, :meth:`save` encodes and writes files in a background thread so that the data iterable
+        can produce the next file meanwhile. Lazy file contents are still written in the calling thread.
+    max_pending: int, default=2
+        Maximum number of files waiting to be written in background, further saves block until one is written.
+    compression: str, default=None
+        If provided, one of :obj:`COMPRESSIONS`, the compression extension is appended to the modified paths
+        (replacing any other compression extension). Files are otherwise compressed according to their extension.
+    compresslevel: int, default=None
+        Compression level of compressed files, ``None`` for the compression library default.
+    replace_extension: bool, default=False
+        If ``True``, the file format extension of the modified paths (one of :obj:`FILEFORMATS`, before any
+        compression extension) is replaced with :attr:`fileformat`, i.e. ``a.json`` is saved to ``a.jsonl``.
     """
 
     def __init__(
-        self, fileformat: str, path_modifier: Callable[[str], str] = None, override: bool = False, json_indent: int = 0,
+        self,
+        fileformat: str,
+        path_modifier: Callable[[str], str] = None,
+        override: bool = False,
+        json_indent: int = 0,
+        background: bool = False,
+        max_pending: int = 2,
+        compression: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+        replace_extension: bool = False,
     ):
-        valid_fileformat = ["json", "pickle"]
         fileformat = fileformat.lower()
-        if fileformat not in valid_fileformat:
-            raise ValueError(f"invalid `fileformat`: '{fileformat}'; must be one of {valid_fileformat}")
+        if fileformat not in FILEFORMATS:
+            raise ValueError(f"invalid `fileformat`: '{fileformat}'; must be one of {FILEFORMATS}")
         self._fileformat = fileformat
+        if compression is not None:
+            compression = compression.lower()
+            if compression not in COMPRESSIONS:
+                raise ValueError(f"invalid `compression`: '{compression}'; must be one of {COMPRESSIONS}")
+            if fileformat == "columnar":
+                raise ValueError("compression is not supported with `columnar` fileformat")
+        self.compression: Optional[str] = compression
+        self.compresslevel: Optional[int] = compresslevel
+        self.replace_extension = replace_extension
 
         self.path_modifier = path_modifier or self.noop_path_mod
         self.override = override
         self.json_indent = json_indent
-        if self.fileformat == "json":
-            self._writer = write_json
-        elif self.fileformat == "pickle":
-            self._writer = write_pickle
+        self.background = background
+        self.max_pending = max_pending
+        self._writer = WRITERS[self.fileformat]
 
     @property
     def fileformat(self) -> str:
-        """str: File format, one of (`json`, `pickle`)."""
+        """str: File format, one of (`json`, `jsonl`, `pickle`, `columnar`)."""
         return self._fileformat
 
     def save(self, data_it: DataIterable) -> None:
-        """Apply :attr:`path_modifier` and dump the elements in `data_it`.
+        """Apply :meth:`output_path` and dump the elements in `data_it`.
+
+        With :attr:`background` set, a write error is raised once detected, at the latest when
+        all the elements have been produced.
 
         Parameters
         ----------
         data_it: DataIterable
             An iterator of the data to save.
         """
-        for fpath, fcontent in data_it:
-            self._writer(self.path_modifier(fpath), fcontent, self.override, indent=self.json_indent)
+        if not self.background:
+            for fpath, fcontent in data_it:
+                self._write(self.output_path(fpath), fcontent)
+            return
+
+        writer = _BackgroundWriter(self._write, self.max_pending)
+        try:
+            for fpath, fcontent in data_it:
+                if isinstance(fcontent, (list, dict)):
+                    writer.submit(self.output_path(fpath), fcontent)
+                else:
+                    # Lazy contents are produced while written, they must stay in the producer thread
+                    writer.raise_error()
+                    self._write(self.output_path(fpath), fcontent)
+        except BaseException:
+            writer.close(raise_error=False)
+            raise
+        writer.close()
+
+    def output_path(self, fpath: str) -> str:
+        """Return the path `fpath` is saved to: :attr:`path_modifier` result with :attr:`compression` extension
+        (and :attr:`fileformat` extension if :attr:`replace_extension` is set)."""
+        fpath = self.path_modifier(fpath)
+        compression = get_compression(fpath)
+        if compression is not None:
+            fpath = path.splitext(fpath)[0]
+        if self.replace_extension:
+            root, extension = path.splitext(fpath)
+            if extension.strip(".").lower() in FILEFORMATS:
+                fpath = f"{root}.{self.fileformat}"
+        compression = self.compression or compression
+        if compression is None:
+            return fpath
+        return f"{fpath}.{compression}"
+
+    def _write(self, fpath: str, fcontent: Any) -> None:
+        with metrics.timer("dump", "io"):
+            self._writer(fpath, fcontent, self.override, indent=self.json_indent, compresslevel=self.compresslevel)
+
+    def save_articles(self, article_it: ArticleIterable) -> None:
+        """Regroup articles per file, apply :attr:`path_modifier` and dump them.
+
+        With the `jsonl` fileformat each article is written as soon as it is yielded by `article_it`,
+        else the articles of a file are buffered until the file is complete.
+
+        Parameters
+        ----------
+        article_it: :obj:`ArticleIterable`
+            An iterator of the articles to save.
+        """
+        self.save(from_articles(article_it, lazy=self.fileformat == "jsonl"))
 
     def make_skip_cb(self):
         """Return a function taking an input path as argument and check if the modified path exists.
 
-        The modified path of a given path ``fpath`` is the result of applying :attr:`path_modifier` to ``fpath``
+        The modified path of a given path ``fpath`` is the result of :meth:`output_path` applied to ``fpath``
         """
         if self.override:
             return lambda _: False
-        return lambda fpath: path.exists(self.path_modifier(fpath))
+        return lambda fpath: path.exists(self.output_path(fpath))
 
     @staticmethod
     def noop_path_mod(fpath):
@@ -450,25 +1173,13 @@ class DataDumper:
             A function taking a '/'-path string as an argument and replacing the last occurence
             of `from_dir` with `to_dir`.
         """
-
-        def path_modifier(fpath: str) -> str:
-            dirs, filename = path.split(fpath)
-            sdirs = dirs.split("/")
-            try:
-                i = len(sdirs) - 1 - sdirs[::-1].index(from_dir)
-            except ValueError:
-                raise ValueError(f"Replacing {from_dir} to {to_dir}: {from_dir} not part of the path {fpath}")
-            else:
-                new_spath = sdirs[:i] + [to_dir] + sdirs[i + 1 :] + [filename]
-                return path.join(*new_spath)
-
-        return path_modifier
+        return functools.partial(_replace_dir, from_dir, to_dir)
 
     @staticmethod
     def path_replacer(new_path: str) -> Callable[[str], str]:
         """Function factory returning a path modifier function replacing the whole path with `new_path`.
 
-        | Returns ``lambda _: new_path``
+        | Returns a picklable equivalent of ``lambda _: new_path``
         | Used for single file dataset.
 
         Parameters
@@ -481,13 +1192,13 @@ class DataDumper:
         Callable[[str], str]
             A function taking a single argument and returning `new_path`.
         """
-        return lambda _: new_path
+        return functools.partial(_constant_path, new_path)
 
     @staticmethod
     def path_in_dir(new_dir: str) -> Callable[[str], str]:
         """Function factory returning a path modifier function joining `new_dir` and its path argument.
 
-        | Returns ``lamda fpath: os.path.join(new_dir, fpath)``
+        | Returns a picklable equivalent of ``lamda fpath: os.path.join(new_dir, fpath)``
 
         Parameters
         ----------
@@ -500,7 +1211,7 @@ class DataDumper:
             A function taking a '/'-path string argument `fpath` and returning the joined path of
             `fpath` in directory `new_dir`.
         """
-        return lambda fpath: path.join(new_dir, fpath)
+        return functools.partial(path.join, new_dir)
 
     @staticmethod
     def file_in_dir(new_dir: str) -> Callable[[str], str]:
@@ -517,4 +1228,24 @@ class DataDumper:
             A function taking a '/'-path string argument `fpath` and returning the joined path of
             `fpath` **filename** in directory `new_dir`.
         """
-        return lambda fpath: path.join(new_dir, path.split(fpath)[1])
+        return functools.partial(_join_filename, new_dir)
+
+
+def _replace_dir(from_dir: str, to_dir: str, fpath: str) -> str:
+    dirs, filename = path.split(fpath)
+    sdirs = dirs.split("/")
+    try:
+        i = len(sdirs) - 1 - sdirs[::-1].index(from_dir)
+    except ValueError:
+        raise ValueError(f"Replacing {from_dir} to {to_dir}: {from_dir} not part of the path {fpath}")
+    else:
+        new_spath = sdirs[:i] + [to_dir] + sdirs[i + 1 :] + [filename]
+        return path.join(*new_spath)
+
+
+def _constant_path(new_path: str, _fpath: str) -> str:
+    return new_path
+
+
+def _join_filename(new_dir: str, fpath: str) -> str:
+    return path.join(new_dir, path.split(fpath)[1])
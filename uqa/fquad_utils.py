@@ -9,6 +9,7 @@ See Also
 """
 
 import logging
+from typing import Iterable, Mapping
 
 from uqa import dataset
 
@@ -36,28 +37,64 @@ def fquad_to_default(fcontent: dataset.TJson, base_article_id: int = 0, include_
     for num_article, article in enumerate(fcontent["data"]):
         default_article = dict(title=article["title"], id_article=base_article_id + num_article, contexts=list())
         for num_context, para in enumerate(article["paragraphs"]):
-            cont = dict(id_context=num_context, text=para["context"])
-            if include_qas:
-                default_qas = list()
-                for qa_dct in para["qas"]:
-                    ans_start = qa_dct["answers"][0]["answer_start"]
-                    ans_end = ans_start + len(qa_dct["answers"][0]["text"])
-                    default_ans = dict(start=ans_start, end=ans_end, label="Ans")
-                    default_qa = dict(question=qa_dct["question"], answer=default_ans)
-                    default_qas.append(default_qa)
-                cont["qas"] = default_qas
-            default_article["contexts"].append(cont)
+            default_article["contexts"].append(_paragraph_to_context(para, num_context, include_qas))
         default_fcontent.append(default_article)
     return default_fcontent
 
 
+def fquad_events_to_default(
+    events: Iterable[dataset.FQuADEvent], base_article_id: int = 0, include_qas: bool = False
+) -> Iterable[dataset.TJson]:
+    """Lazily convert `FQuAD` incremental parsing events into `default` format articles.
+
+    Only the paragraphs of the article being converted are held in memory.
+
+    Parameters
+    ----------
+    events: Iterable of :obj:`.FQuADEvent`
+        Events as returned by :func:`.dataset.read_json_incremental` with `fquad` data format
+    base_article_id: int, default=0
+        ID to use for the first article, ID are generated increadingly.
+    include_qas: bool, default=False
+        If ``True`` convert ``qas`` fields, else discard it.
+
+    Yields
+    ------
+    :obj:`.TJson`
+        Articles in `default` format
+    """
+    contexts = list()
+    for kind, position, value in events:
+        if kind == "paragraph":
+            contexts.append(_paragraph_to_context(value, position[1], include_qas))
+        elif kind == "article":
+            yield dict(title=value["title"], id_article=base_article_id + position, contexts=contexts)
+            contexts = list()
+
+
+def _paragraph_to_context(para: dataset.TJson, num_context: int, include_qas: bool) -> dataset.TJson:
+    """Convert a `FQuAD` paragraph into a `default` format context."""
+    cont = dict(id_context=num_context, text=para["context"])
+    if include_qas:
+        default_qas = list()
+        for qa_dct in para["qas"]:
+            ans_start = qa_dct["answers"][0]["answer_start"]
+            ans_end = ans_start + len(qa_dct["answers"][0]["text"])
+            default_ans = dict(start=ans_start, end=ans_end, label="Ans")
+            default_qa = dict(question=qa_dct["question"], answer=default_ans)
+            default_qas.append(default_qa)
+        cont["qas"] = default_qas
+    return cont
+
+
 def fquad_to_default_dl(data_it: dataset.DataIterable, include_qas=False) -> dataset.DataIterable:
     """Convert a dataset from `FQuAD` format to `default` format.
 
     Parameters
     ----------
     data_it: :obj:`.DataIterable`
-        Dataset iterable (`FQuAD` format)
+        Dataset iterable (`FQuAD` format), file contents can be incremental parsing events
+        (see :func:`.dataset.read_json_incremental`) in which case converted contents are lazy.
     include_qas: bool, default=False
         If ``True`` convert ``qas`` field, else discard it.
 
@@ -67,10 +104,21 @@ def fquad_to_default_dl(data_it: dataset.DataIterable, include_qas=False) -> dat
         Dataset iterable (`default` format)
     """
     num_article = 0
+
+    def _count(articles: Iterable[dataset.TJson]) -> Iterable[dataset.TJson]:
+        nonlocal num_article
+        for article in articles:
+            num_article += 1
+            yield article
+
     for fpath, fcontent in data_it:
-        default_fcontent = fquad_to_default(fcontent, num_article, include_qas=include_qas)
-        yield fpath, default_fcontent
-        num_article += len(default_fcontent)
+        if isinstance(fcontent, Mapping):
+            default_fcontent = fquad_to_default(fcontent, num_article, include_qas=include_qas)
+            yield fpath, default_fcontent
+            num_article += len(default_fcontent)
+        else:
+            # Incremental parsing events, articles IDs are updated as the content is consumed
+            yield fpath, _count(fquad_events_to_default(fcontent, num_article, include_qas=include_qas))
 
 
 def default_to_fquad(fcontent: dataset.TJson, version: str = "0.1") -> dataset.TJson:
@@ -60,7 +60,7 @@ def find_subseq_spaced(seq: Sequence[T], sub_seq: Sequence[T]) -> List[int]:
     sub_seq_it = iter(sub_seq)
     cur_sub_seq = next(sub_seq_it)
     try:
-        for i, seq_el in seq:
+        for i, seq_el in enumerate(seq):
             if seq_el == cur_sub_seq:
                 ret.append(i)
                 cur_sub_seq = next(sub_seq_it)
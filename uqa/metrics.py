@@ -0,0 +1,368 @@
+"""Throughput and latency metrics of the processing stages.
+
+Metrics are recorded per stage (i.e. `clean`, `filter`, `ner`, `constituency`, `annotate`, `qas`, `read`, `dump`)
+in the process-wide :obj:`REGISTRY`:
+
+- number of articles, contexts and characters processed, counted on the stage output,
+- processing time, from which contexts/s and characters/s throughputs are derived,
+- per-context latency histogram,
+- model loading time and I/O time.
+
+Stages are lazy iterators chained with each other, :func:`measure` records the time spent producing each element
+of a stage iterator *excluding* the time spent in nested measured iterators and :func:`timer` blocks,
+so that each stage is only accounted for its own work. For batched stages the latency of the contexts of a batch
+is attributed to the elements which completion required the batch to be processed.
+
+Examples
+--------
+::
+
+    >>> article_it = measure("clean", (clean_article(article) for article in article_it), article_size)
+    >>> with timer("ner", "model_load"):
+    ...     model = spacy.load("fr_core_news_md")
+    >>> REGISTRY.write_report("metrics.prom")
+"""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+T = TypeVar("T")
+
+#: Upper bounds, in seconds, of the per-context latency histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+#: Kinds of time recorded by :func:`timer`
+TIMER_KINDS = ("model_load", "io")
+
+_local = threading.local()
+
+
+class StageMetrics:
+    """Metrics of a single stage.
+
+    Attributes
+    ----------
+    name: str
+        The stage name
+    articles, contexts, chars: int
+        Number of articles, contexts and characters processed
+    processing_time: float
+        Time spent processing, in seconds, excluding nested stages, model loading and I/O
+    model_load_time, io_time: float
+        Time spent loading models and reading / writing files, in seconds
+    latency_counts: list of int
+        Number of contexts per :obj:`LATENCY_BUCKETS` bucket (not cumulative)
+    latency_sum: float
+        Sum of the contexts latencies, in seconds
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.articles = 0
+        self.contexts = 0
+        self.chars = 0
+        self.processing_time = 0.0
+        self.model_load_time = 0.0
+        self.io_time = 0.0
+        self.latency_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+
+    def observe(self, num_contexts: int, num_chars: int, seconds: float, num_articles: int = 0) -> None:
+        """Record the processing of `num_contexts` contexts of `num_chars` characters in `seconds`."""
+        self.articles += num_articles
+        self.contexts += num_contexts
+        self.chars += num_chars
+        self.processing_time += seconds
+        if num_contexts:
+            latency = seconds / num_contexts
+            self.latency_counts[_bucket(latency)] += num_contexts
+            self.latency_sum += seconds
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        """Return the upper bound of the histogram bucket containing the latency `quantile`, ``None`` if empty."""
+        rank = quantile * self.contexts
+        cumulated = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_counts):
+            cumulated += count
+            if count and cumulated >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a JSON serializable dictionary, with derived throughputs."""
+        return dict(
+            articles=self.articles,
+            contexts=self.contexts,
+            chars=self.chars,
+            processing_time=self.processing_time,
+            model_load_time=self.model_load_time,
+            io_time=self.io_time,
+            contexts_per_sec=_rate(self.contexts, self.processing_time),
+            chars_per_sec=_rate(self.chars, self.processing_time),
+            latency_buckets=[[_bound_str(bound), count] for bound, count in zip(LATENCY_BUCKETS, self.latency_counts)],
+            latency_sum=self.latency_sum,
+        )
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Add the metrics `other`, as returned by :meth:`to_dict`."""
+        for attr in ("articles", "contexts", "chars", "processing_time", "model_load_time", "io_time", "latency_sum"):
+            setattr(self, attr, getattr(self, attr) + other[attr])
+        for i, (_, count) in enumerate(other["latency_buckets"]):
+            self.latency_counts[i] += count
+
+    def progress_line(self, elapsed: float) -> str:
+        """Return a one-line summary of the metrics, `elapsed` being the wall-clock time since the start."""
+        parts = []
+        if self.contexts:
+            parts.append(f"{self.contexts} contexts ({_rate(self.contexts, self.processing_time):.1f}/s)")
+            parts.append(f"{self.chars} chars ({_rate(self.chars, self.processing_time):.0f}/s)")
+            p50, p95 = self.latency_quantile(0.5), self.latency_quantile(0.95)
+            parts.append(f"latency p50 <= {_bound_str(p50)}s p95 <= {_bound_str(p95)}s")
+            parts.append(f"busy {self.processing_time:.1f}s / {elapsed:.1f}s")
+        if self.model_load_time:
+            parts.append(f"model load {self.model_load_time:.1f}s")
+        if self.io_time:
+            parts.append(f"I/O {self.io_time:.1f}s")
+        return f"{self.name}: {', '.join(parts) or 'no activity'}"
+
+
+class Registry:
+    """Collection of :class:`StageMetrics`, by stage name."""
+
+    def __init__(self):
+        self._stages: Dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+        self.start_time = time.time()
+
+    def stage(self, name: str) -> StageMetrics:
+        """Return the metrics of stage `name`, created if needed."""
+        with self._lock:
+            if name not in self._stages:
+                self._stages[name] = StageMetrics(name)
+            return self._stages[name]
+
+    def stages(self) -> List[StageMetrics]:
+        """Return the metrics of all the stages, in creation order."""
+        with self._lock:
+            return list(self._stages.values())
+
+    def add_time(self, name: str, kind: str, seconds: float) -> None:
+        """Add `seconds` to stage `name` `kind` time, one of :obj:`TIMER_KINDS`.
+
+        Timers also run in writer threads (see :class:`.dataset.DataDumper`), the update is made under the lock.
+        """
+        if kind not in TIMER_KINDS:
+            raise ValueError(f"invalid `kind`: '{kind}'; must be one of {TIMER_KINDS}")
+        stage = self.stage(name)
+        with self._lock:
+            if kind == "model_load":
+                stage.model_load_time += seconds
+            else:
+                stage.io_time += seconds
+
+    def reset(self) -> None:
+        """Remove all the recorded metrics."""
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the metrics of all stages as :meth:`StageMetrics.to_dict` dictionaries, picklable."""
+        return {stage.name: stage.to_dict() for stage in self.stages()}
+
+    def merge(self, snapshot: Dict[str, Dict[str, Any]]) -> None:
+        """Add the metrics of a :meth:`snapshot`, i.e. taken in another process."""
+        for name, stage_dict in snapshot.items():
+            stage = self.stage(name)
+            with self._lock:
+                stage.merge(stage_dict)
+
+    def report(self) -> Dict[str, Any]:
+        """Return the report of all the stages metrics as a JSON serializable dictionary."""
+        return dict(elapsed=time.time() - self.start_time, stages=self.snapshot())
+
+    def progress_lines(self) -> List[str]:
+        """Return a :meth:`StageMetrics.progress_line` per stage."""
+        elapsed = time.time() - self.start_time
+        return [stage.progress_line(elapsed) for stage in self.stages()]
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in Prometheus text exposition format."""
+        lines = []
+
+        def _metric(name: str, kind: str, help_text: str, values: Iterable[Tuple[str, Any]]):
+            lines.append(f"# HELP uqa_{name} {help_text}")
+            lines.append(f"# TYPE uqa_{name} {kind}")
+            lines.extend(f"uqa_{name}{{{labels}}} {value}" for labels, value in values)
+
+        stages = self.stages()
+        for attr, help_text in (
+            ("articles", "Articles processed"),
+            ("contexts", "Contexts processed"),
+            ("chars", "Characters processed"),
+        ):
+            _metric(f"{attr}_total", "counter", help_text, ((_labels(s), getattr(s, attr)) for s in stages))
+        for attr, help_text in (
+            ("processing_time", "Processing time"),
+            ("model_load_time", "Model loading time"),
+            ("io_time", "File reading / writing time"),
+        ):
+            name = f"{attr.replace('_time', '')}_seconds_total"
+            _metric(name, "counter", help_text, ((_labels(s), getattr(s, attr)) for s in stages))
+
+        lines.append("# HELP uqa_context_latency_seconds Per-context latency")
+        lines.append("# TYPE uqa_context_latency_seconds histogram")
+        for stage in stages:
+            cumulated = 0
+            for bound, count in zip(LATENCY_BUCKETS, stage.latency_counts):
+                cumulated += count
+                labels = f'{_labels(stage)},le="{_bound_str(bound)}"'
+                lines.append(f"uqa_context_latency_seconds_bucket{{{labels}}} {cumulated}")
+            lines.append(f"uqa_context_latency_seconds_sum{{{_labels(stage)}}} {stage.latency_sum}")
+            lines.append(f"uqa_context_latency_seconds_count{{{_labels(stage)}}} {stage.contexts}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, fpath: str) -> None:
+        """Write the metrics report to `fpath`.
+
+        Prometheus textfile format (see :meth:`to_prometheus`) is used if `fpath` extension is ``.prom``,
+        JSON format (see :meth:`report`) otherwise. The file is written atomically.
+        """
+        if fpath.endswith(".prom"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.report(), indent=2)
+        tmp_path = f"{fpath}.tmp"
+        with open(tmp_path, "w", encoding="utf8") as file:
+            file.write(content)
+        os.replace(tmp_path, fpath)
+        logger.info(f"Metrics report written to {fpath}")
+
+
+#: Process-wide metrics registry
+REGISTRY = Registry()
+
+
+class ProgressReporter(threading.Thread):
+    """Daemon thread logging :meth:`Registry.progress_lines` every `interval` seconds."""
+
+    def __init__(self, interval: float, registry: Registry = REGISTRY):
+        super().__init__(name="uqa-progress", daemon=True)
+        self.interval = interval
+        self.registry = registry
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            for line in self.registry.progress_lines():
+                logger.info(f"[metrics] {line}")
+
+    def stop(self) -> None:
+        """Stop the reporting thread."""
+        self._stop_event.set()
+
+
+def _bucket(latency: float) -> int:
+    for i, bound in enumerate(LATENCY_BUCKETS):
+        if latency <= bound:
+            return i
+    return len(LATENCY_BUCKETS) - 1
+
+
+def _bound_str(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+
+def _rate(count: float, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.0
+
+
+def _labels(stage: StageMetrics) -> str:
+    return f'stage="{stage.name}"'
+
+
+def _frames() -> List[List[float]]:
+    """Return the stack of the current thread's measurements, each frame holds the time spent in nested ones."""
+    if not hasattr(_local, "frames"):
+        _local.frames = []
+    return _local.frames
+
+
+def _timed(func: Callable[[], T]) -> Tuple[T, float]:
+    """Call `func` and return its result and the time it took, excluding nested measurements."""
+    frames = _frames()
+    frame = [0.0]
+    frames.append(frame)
+    start = time.perf_counter()
+    try:
+        return func(), time.perf_counter() - start - frame[0]
+    finally:
+        frames.pop()
+        if frames:
+            frames[-1][0] += time.perf_counter() - start
+
+
+def article_size(item: Tuple[str, Dict]) -> Tuple[int, int]:
+    """Return the number of contexts and characters of an :obj:`.ArticleIterable` element."""
+    contexts = item[1]["contexts"]
+    return len(contexts), sum(len(context["text"]) for context in contexts)
+
+
+def context_size(context: Any) -> Tuple[int, int]:
+    """Return the number of contexts and characters of a :class:`.Context`, i.e. 1 and its text length."""
+    return 1, len(context.text)
+
+
+def measure(stage: str, iterable: Iterable[T], size: Callable[[T], Tuple[int, int]] = article_size) -> Iterator[T]:
+    """Yield the elements of `iterable`, recording the time spent producing each one in `stage` metrics.
+
+    Parameters
+    ----------
+    stage: str
+        The stage name
+    iterable: Iterable
+        The stage output
+    size: Callable, default=:func:`article_size`
+        Return the number of contexts and characters of an element, elements are counted as articles
+        if `size` is :func:`article_size`.
+    """
+    metrics = REGISTRY.stage(stage)
+    iterator = iter(iterable)
+    num_articles = 1 if size is article_size else 0
+    sentinel = object()
+    while True:
+        item, seconds = _timed(lambda: next(iterator, sentinel))
+        if item is sentinel:
+            metrics.observe(0, 0, seconds)
+            return
+        num_contexts, num_chars = size(item)
+        metrics.observe(num_contexts, num_chars, seconds, num_articles)
+        yield item
+
+
+@contextlib.contextmanager
+def timer(stage: str, kind: str) -> Iterator[None]:
+    """Context manager recording the time spent in its block as `stage` `kind` time, one of :obj:`TIMER_KINDS`.
+
+    The time is excluded from the enclosing :func:`measure` iterators processing time.
+    """
+    if kind not in TIMER_KINDS:
+        raise ValueError(f"invalid `kind`: '{kind}'; must be one of {TIMER_KINDS}")
+    frames = _frames()
+    frame = [0.0]
+    frames.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        frames.pop()
+        if frames:
+            frames[-1][0] += elapsed
+        REGISTRY.add_time(stage, kind, elapsed - frame[0])
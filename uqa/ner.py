@@ -1,59 +1,146 @@
 """Named entity recognition with SpaCy french model."""
 
+import functools
 import logging
+from typing import Optional
 
 import spacy
 
-from uqa import dataset
+from uqa import cache as cache_, dataset, metrics, spacy_utils
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
 
-def ner(fcontent: dataset.TJson, model: spacy.language.Language) -> dataset.TJson:
+def ner(
+    fcontent: dataset.TJson,
+    model: spacy.language.Language,
+    batch_size: int = 64,
+    n_process: int = 1,
+    cache: Optional[cache_.StageCache] = None,
+) -> dataset.TJson:
     """Use `model` to perform NER on the 'default' structure data container `fcontent`.
 
+    Contexts texts are processed in batches with ``model.pipe``.
+
     Parameters
     ----------
     fcontent: :obj:`.TJson`
         A json-like data object with `default` structure.
     model: spacy.language.Language
         A loaded SpaCy model with 'ner' pipe in the pipeline
+    batch_size: int, default=64
+        Number of contexts per batch
+    n_process: int, default=1
+        Number of processes used by ``model.pipe``
+    cache: :class:`.cache.StageCache`, default=None
+        If provided, annotations are looked up in and added to the cache (see :func:`stage_cache`)
 
     Returns
     -------
     :obj:`.TJson`
-        The processed data
+        The processed data, lazy if `fcontent` is not a list
+    """
+    return spacy_utils.pipe_fcontent(fcontent, model, set_entities, batch_size, n_process, cache=cache)
+
+
+def set_entities(doc: spacy.tokens.Doc, context: dataset.TJson) -> None:
+    """Set `context` 'entities' from `doc` named entities, same as ``doc.to_json()["ents"]``."""
+    context["entities"] = [{"start": ent.start_char, "end": ent.end_char, "label": ent.label_} for ent in doc.ents]
+
+
+def stage_cache(
+    cache: Optional[cache_.AnnotationCache], model: spacy.language.Language
+) -> Optional[cache_.StageCache]:
+    """Return the :class:`.cache.StageCache` view of `cache` for NER performed with `model`."""
+    return spacy_utils.stage_cache(cache, "ner", ("entities",), model)
+
+
+@functools.lru_cache(maxsize=None)
+def load_model(model_name: str = "fr_core_news_md") -> spacy.language.Language:
+    """Load and return spacy `model_name` with the pipes not required for NER disabled.
+
+    The model is cached: it is loaded once per process and shared by subsequent calls.
     """
-    article = None
-    context = None
-    for article in fcontent:
-        for context in article["contexts"]:
-            doc = model(context["text"])
-            context["entities"] = doc.to_json()["ents"]
-    return fcontent
+    logger.info("Loading spacy model for NER")
+    model = spacy.load(model_name, disable=["tagger", "parser"])
+    logger.info("Spacy model for NER loaded")
+    return model
 
 
-def ner_dl(data_it: dataset.DataIterable, model_name="fr_core_news_md") -> dataset.DataIterable:
+def ner_dl(
+    data_it: dataset.DataIterable,
+    model_name="fr_core_news_md",
+    batch_size: int = 64,
+    n_process: int = 1,
+    cache: Optional[cache_.AnnotationCache] = None,
+) -> dataset.DataIterable:
     """Load spacy `model_name` perform NER on the 'default' structure dataset iterable `data_it`.
 
+    Each file is completely processed before being yielded (as a list of articles),
+    a file which processing fails is logged and skipped.
+
     Parameters
     ----------
     data_it: :obj:`.DataIterble`
         A dateset iterable in `default` format.
     model_name: str, default="fr_core_news_md"
         The name of the spacy model to load, the model has to be locally installed prior to be used.
+    batch_size: int, default=64
+        Number of contexts per batch
+    n_process: int, default=1
+        Number of processes used by ``model.pipe``
+    cache: :class:`.cache.AnnotationCache`, default=None
+        If provided, annotations are looked up in and added to the cache
 
     Returns
     -------
     :obj:`.DataIterble`
         The processed dateset iterable.
     """
-    logger.info("Loading spacy model for NER")
-    model = spacy.load(model_name, disable=["tagger", "parser"])
-    logger.info("Spacy model for NER loaded")
+    model = load_model(model_name)
+    ner_cache = stage_cache(cache, model)
     for fpath, fcontent in data_it:
         logger.debug(f"Performing NER on {fpath}")
         try:
-            yield fpath, ner(fcontent, model)
-        except:
+            fcontent = list(ner(fcontent, model, batch_size, n_process, ner_cache))
+        except Exception:  # pylint: disable=broad-except
             logger.exception(f"while performing NER on {fpath}:")
+        else:
+            yield fpath, fcontent
+
+
+def ner_articles(
+    article_it: dataset.ArticleIterable,
+    model_name="fr_core_news_md",
+    batch_size: int = 64,
+    n_process: int = 1,
+    cache: Optional[cache_.AnnotationCache] = None,
+) -> dataset.ArticleIterable:
+    """Load spacy `model_name` perform NER on the 'default' structure article iterable `article_it`.
+
+    Contexts of consecutive articles are processed in batches with ``model.pipe``,
+    each article is yielded as soon as all its contexts are processed.
+
+    Parameters
+    ----------
+    article_it: :obj:`.ArticleIterable`
+        An article iterable in `default` format.
+    model_name: str, default="fr_core_news_md"
+        The name of the spacy model to load, the model has to be locally installed prior to be used.
+    batch_size: int, default=64
+        Number of contexts per batch
+    n_process: int, default=1
+        Number of processes used by ``model.pipe``
+    cache: :class:`.cache.AnnotationCache`, default=None
+        If provided, annotations are looked up in and added to the cache
+
+    Returns
+    -------
+    :obj:`.ArticleIterable`
+        The processed article iterable.
+    """
+    with metrics.timer("ner", "model_load"):
+        model = load_model(model_name)
+    ner_cache = stage_cache(cache, model)
+    article_it = spacy_utils.pipe_articles(article_it, model, set_entities, batch_size, n_process, cache=ner_cache)
+    yield from metrics.measure("ner", article_it)
@@ -0,0 +1,109 @@
+"""Multi-process execution of file by file processing steps.
+
+A processing step is a picklable callable taking a :class:`.dataset.DataLoader` and a :class:`.dataset.DataDumper`
+as arguments, reading, processing and saving all the files of the data loader,
+typically a module-level function or a :func:`functools.partial` of a module-level function.
+A step either raises on the first failure or logs its failures and returns their number.
+
+:func:`run` dispatches the dataset files to a pool of worker processes, each worker runs the step
+on a single file data loader (see :meth:`.dataset.DataLoader.subset`) and writes its output itself.
+Models loaded through a cached loader (i.e. :func:`.ner.load_model`) are loaded once per worker process.
+Metrics recorded by the workers (see :mod:`uqa.metrics`) are merged in the calling process registry.
+
+Examples
+--------
+::
+
+    >>> step = functools.partial(some_step, some_option=True)
+    >>> run(step, DirDataLoader("foo"), DataDumper("json", DataDumper.dir_replacer("foo", "bar")), workers=4)
+"""
+
+import logging
+from concurrent import futures
+from typing import Callable, Optional, Tuple
+
+from uqa import dataset, metrics
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+#: A processing step, reads, processes and saves all the files of a data loader,
+#: returns the number of files which processing failed (``None`` for 0)
+Step = Callable[[dataset.DataLoader, dataset.DataDumper], Optional[int]]
+
+
+def run(
+    step: Step, dataloader: dataset.DataLoader, datadumper: dataset.DataDumper, workers: int = 0, ordered: bool = True,
+) -> int:
+    """Run `step` over the files of `dataloader`, in `workers` processes.
+
+    Parameters
+    ----------
+    step: :obj:`Step`
+        The processing step, must be picklable if `workers` is greater than 0
+    dataloader: :class:`.dataset.DataLoader`
+        The data loader, its :attr:`skip_file_cb` is applied in the calling process before dispatching the files
+    datadumper: :class:`.dataset.DataDumper`
+        The data dumper used by the workers to save their output, must be picklable if `workers` is greater than 0
+    workers: int, default=0
+        Number of worker processes, 0 to run `step` in the calling process.
+    ordered: bool, default=True
+        If ``True`` files completion is reported in dataset order,
+        else in completion order so that a slow file does not delay the report of the following ones.
+
+    Returns
+    -------
+    int
+        The number of files which processing failed, failures are logged
+    """
+    if workers < 1:
+        return step(dataloader, datadumper) or 0
+
+    fpaths = dataloader.filepaths()
+    if dataloader.skip_file_cb is not None:
+        kept = [fpath for fpath in fpaths if not dataloader.skip_file_cb(fpath)]
+        if len(kept) < len(fpaths):
+            logger.info(f"Skipped {len(fpaths) - len(kept)} / {len(fpaths)} files")
+        fpaths = kept
+
+    num_failed = 0
+    logger.info(f"Processing {len(fpaths)} files with {workers} workers")
+    with futures.ProcessPoolExecutor(workers) as executor:
+        future_paths = {
+            executor.submit(_run_step, step, dataloader.subset([fpath]), datadumper): fpath for fpath in fpaths
+        }
+        try:
+            done_it = future_paths if ordered else futures.as_completed(future_paths)
+            for i, future in enumerate(done_it, 1):
+                fpath = future_paths[future]
+                try:
+                    step_failed, snapshot = future.result()
+                except futures.process.BrokenProcessPool:
+                    raise
+                except Exception:  # pylint: disable=broad-except
+                    num_failed += 1
+                    logger.exception(f"[{i} / {len(fpaths)}] while processing {fpath}:")
+                    continue
+                metrics.REGISTRY.merge(snapshot)
+                if step_failed:
+                    num_failed += 1
+                    logger.error(f"[{i} / {len(fpaths)}] Failed: {fpath}")
+                else:
+                    logger.info(f"[{i} / {len(fpaths)}] Done: {fpath}")
+        except BaseException:
+            for future in future_paths:
+                future.cancel()
+            raise
+    if num_failed:
+        logger.error(f"Processing failed for {num_failed} / {len(fpaths)} files")
+    return num_failed
+
+
+def _run_step(step: Step, dataloader: dataset.DataLoader, datadumper: dataset.DataDumper) -> Tuple[int, dict]:
+    """Run `step` in a worker process.
+
+    Return the number of failed files reported by `step` and the metrics it recorded,
+    see :meth:`.metrics.Registry.snapshot`.
+    """
+    metrics.REGISTRY.reset()
+    num_failed = step(dataloader, datadumper) or 0
+    return num_failed, metrics.REGISTRY.snapshot()
@@ -0,0 +1,173 @@
+"""End-to-end processing pipeline, from a raw corpus to question / answer pairs in a single pass.
+
+The cleaning, filtering, annotation (NER and constituency parsing, see :mod:`uqa.annotate`) and question / answer
+generation stages are chained as article iterables, so that no intermediate dataset is written nor held in memory.
+
+Examples
+--------
+Process a single json file ``"data.json"`` in `default` format::
+
+    >>> dataloader = dataset.FileDataLoader("data.json", "json")
+    >>> datadumper = dataset.DataDumper("json", dataset.DataDumper.path_replacer("fquad.json"))
+    >>> datadumper.save(run_dl(dataloader))
+"""
+
+import functools
+import logging
+import queue
+import threading
+from os import path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from uqa import annotate, cache as cache_, clean, dataset, fquad_utils, qa_gen
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+#: Pipeline stages, in order, whose output can be kept as intermediate files
+STAGES = ["clean", "annotate", "qas"]
+
+#: Maximum number of articles waiting to be saved per intermediate stage, see :func:`intermediate_dumper`
+KEEP_MAX_PENDING = 64
+
+#: Put in the queue of the articles to save by :func:`_keep` when the production of the articles failed
+_ABORT = object()
+
+
+def run_articles(
+    article_it: dataset.ArticleIterable,
+    min_num_alpha: int = 10,
+    batch_size: int = 64,
+    intermediates: Optional[Dict[str, dataset.DataDumper]] = None,
+    cache: Optional[cache_.AnnotationCache] = None,
+    filters: Sequence[clean.ContextFilter] = (),
+) -> dataset.ArticleIterable:
+    """Clean, filter, annotate and generate question / answer pairs on an article iterable.
+
+    Parameters
+    ----------
+    article_it: :obj:`.ArticleIterable`
+        An article iterable in `default` format.
+    min_num_alpha: int, default=10
+        Minimum number of letters for a context to be kept
+    batch_size: int, default=64
+        Number of contexts per annotation batch
+    intermediates: dict of str: :class:`.dataset.DataDumper`, default=None
+        If provided, the output of the stages in the keys (see :obj:`STAGES`) are saved with the associated dumper.
+    cache: :class:`.cache.AnnotationCache`, default=None
+        If provided, annotations are looked up in and added to the cache
+    filters: sequence of :obj:`.clean.ContextFilter`, default=()
+        Further filters a context must pass to be kept, see :func:`.clean.make_filters`
+
+    Returns
+    -------
+    :obj:`.ArticleIterable`
+        The articles with generated question / answers pairs, in `default` format.
+    """
+    intermediates = intermediates or {}
+    article_it = clean.clean_articles(article_it)
+    article_it = clean.filter_contexts_articles(article_it, min_num_alpha, filters=filters)
+    article_it = _keep(article_it, intermediates.get("clean"))
+    article_it = annotate.annotate_articles(article_it, batch_size=batch_size, cache=cache)
+    article_it = _keep(article_it, intermediates.get("annotate"))
+    article_it = qa_gen.generate_qas_articles(article_it)
+    return _keep(article_it, intermediates.get("qas"))
+
+
+def run_dl(
+    data_it: dataset.DataIterable,
+    min_num_alpha: int = 10,
+    batch_size: int = 64,
+    intermediates: Optional[Dict[str, dataset.DataDumper]] = None,
+    cache: Optional[cache_.AnnotationCache] = None,
+    filters: Sequence[clean.ContextFilter] = (),
+) -> dataset.DataIterable:
+    """Apply :func:`run_articles` to a dataset iterable in `default` format and convert the results to `FQuAD` format.
+
+    Returns
+    -------
+    :obj:`.DataIterable`
+        The processed dataset iterable, in `FQuAD` format.
+    """
+    article_it = run_articles(dataset.to_articles(data_it), min_num_alpha, batch_size, intermediates, cache, filters)
+    return fquad_utils.default_to_fquad_dl(dataset.from_articles(article_it))
+
+
+def intermediate_dumper(datadumper: dataset.DataDumper, stage: str) -> dataset.DataDumper:
+    """Return a `jsonl` data dumper saving files next to `datadumper` ones, with `stage` inserted in the filenames.
+
+    i.e. ``foo/bar.json`` output path becomes ``foo/bar.clean.jsonl`` for the `clean` stage.
+    Intermediate files are written in JSON-lines format so that articles are written as they are processed.
+    """
+    return dataset.DataDumper(
+        "jsonl",
+        functools.partial(_stage_path, datadumper.path_modifier, stage),
+        override=datadumper.override,
+        compression=datadumper.compression,
+        compresslevel=datadumper.compresslevel,
+        replace_extension=True,
+    )
+
+
+def _stage_path(path_modifier: Callable[[str], str], stage: str, fpath: str) -> str:
+    root, compression = path_modifier(fpath), ""
+    if dataset.get_compression(root) is not None:
+        root, compression = path.splitext(root)
+    root, extension = path.splitext(root)
+    return f"{root}.{stage}{extension}{compression}"
+
+
+def _keep(article_it: dataset.ArticleIterable, datadumper: Optional[dataset.DataDumper]) -> dataset.ArticleIterable:
+    """Yield the articles of `article_it` and, if `datadumper` is provided, save them with
+    :meth:`.dataset.DataDumper.save_articles` in a background thread.
+
+    The saving thread is handed a copy of each article down to its contexts, as the following stages add their
+    annotations to the contexts in place. At most :obj:`KEEP_MAX_PENDING` articles wait to be saved.
+    """
+    if datadumper is None:
+        yield from article_it
+        return
+    pending: queue.Queue = queue.Queue(KEEP_MAX_PENDING)
+    errors: List[BaseException] = []
+
+    def _save():
+        try:
+            datadumper.save_articles(_dequeue(pending))
+        except _Aborted:
+            pass
+        except BaseException as err:  # pylint: disable=broad-except
+            errors.append(err)
+            # Unblock the producer until it notices the error
+            item = pending.get()
+            while item is not None and item is not _ABORT:
+                item = pending.get()
+
+    thread = threading.Thread(target=_save, name="uqa-keep", daemon=True)
+    thread.start()
+    try:
+        for fpath, article in article_it:
+            if errors:
+                raise errors[0]
+            contexts = [dict(context) for context in article["contexts"]]
+            pending.put((fpath, dict(article, contexts=contexts)))
+            yield fpath, article
+    except BaseException:
+        # Abort the file being saved, it is not moved to its output path (see `dataset.write_jsonl`)
+        pending.put(_ABORT)
+        thread.join()
+        raise
+    pending.put(None)
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+class _Aborted(Exception):
+    """Raised by :func:`_dequeue` when the production of the articles to save failed."""
+
+
+def _dequeue(pending: queue.Queue) -> dataset.ArticleIterable:
+    """Yield the articles put in `pending` until ``None``, raise :exc:`_Aborted` on :obj:`_ABORT`."""
+    for item in iter(pending.get, None):
+        if item is _ABORT:
+            raise _Aborted()
+        yield item
@@ -15,7 +15,7 @@ For visualization purposes question / anwser pairs generation process is split i
 from typing import List, Iterable, Tuple
 import itertools
 
-from uqa import context_utils, list_utils, dataset
+from uqa import context_utils, list_utils, dataset, metrics
 
 
 # ---- Question making helpers ----
@@ -95,7 +95,7 @@ def rule1(context: context_utils.Context) -> Rule1_RT:
         idx = list_utils.find_subseq([c.label for c in sent_const.children], ["NP-SUJ", "VN", "NP-ATS"])
         if idx > -1:
             np_subj = sent_const.children[idx]
-            ners = list_utils.find_all(context.ner, lambda entity, label=np_subj: entity in label)
+            ners = context.ner_index.contained(np_subj.start, np_subj.end)
             if len(ners) == 1:
                 ner_label = context.ner[ners[0]].copy(color="green")
                 children = [node.copy_no_child(color="magenta") for node in sent_const.children[idx : idx + 3]]
@@ -124,7 +124,7 @@ def rule1_ext(context: context_utils.Context) -> Rule1_RT:
         indices = list_utils.find_subseq_spaced([c.label for c in sent_const.children], ["NP-SUJ", "VN", "NP-ATS"])
         if indices:
             np_subj = sent_const.children[indices[0]]
-            ners = list_utils.find_all(context.ner, lambda entity, label=np_subj: entity in label)
+            ners = context.ner_index.contained(np_subj.start, np_subj.end)
             if len(ners) == 1:
                 ner_label = context.ner[ners[0]].copy(color="green")
                 children = [sent_const.children[i].copy_no_child(color="magenta") for i in indices]
@@ -211,13 +211,17 @@ def generate_qas_context_it(
     :obj:`.DataIterble`
         The processed dateset iterable.
     """
+    context_it = metrics.measure("qas", (_generate_qas(context) for context in context_it), metrics.context_size)
     for context in context_it:
-        ret = rule1_ext(context)
-        rule1_to_qa(context, ret)
         if context.qas or not filter_no_qa:
             yield context
 
 
+def _generate_qas(context: context_utils.Context) -> context_utils.Context:
+    rule1_to_qa(context, rule1_ext(context))
+    return context
+
+
 def generate_qas_dl(data_it: dataset.DataIterable) -> dataset.DataIterable:
     """Generate question / answers pairs on a dataset.
 
@@ -233,4 +237,24 @@ def generate_qas_dl(data_it: dataset.DataIterable) -> dataset.DataIterable:
     :obj:`.DataIterble`
         The processed dateset iterable.
     """
-    yield from context_utils.jsonify(generate_qas_context_it(context_utils.contextify(data_it)))
+    yield from context_utils.jsonify(generate_qas_context_it(context_utils.contextify(data_it, lazy=True)))
+
+
+def generate_qas_articles(article_it: dataset.ArticleIterable) -> dataset.ArticleIterable:
+    """Generate question / answers pairs on an article iterable.
+
+    NER and constituency parsing steps must have been realized prior to q/a generation.
+    Articles without any generated question / answer pair are discarded.
+
+    Parameters
+    ----------
+    article_it: :obj:`.ArticleIterable`
+        An article iterable in `default` format.
+
+    Returns
+    -------
+    :obj:`.ArticleIterable`
+        The processed article iterable.
+    """
+    context_it = context_utils.contextify_articles(article_it, lazy=True)
+    yield from context_utils.jsonify_articles(generate_qas_context_it(context_it))
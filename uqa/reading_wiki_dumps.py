@@ -1,24 +1,196 @@
-"""Read and parse wiki tar.bz2 dumps archives.
+"""Read and parse wiki bz2 dumps archives.
 
-Notes
------
-This module is not properly integrated with the CLi and the package in general.
+Archives are the bz2 compressed JSON-lines files produced by
+`WikiExtractor <https://github.com/attardi/wikiextractor>`_ with the ``--json`` and ``--compress`` options,
+each line is a wiki article with ``"id"``, ``"title"`` and ``"text"`` fields.
+
+Examples
+--------
+Ingest the archives of ``frwiki/`` in shards of 1000 articles, decompressing 4 archives in parallel::
+
+    >>> dataloader = WikiDumpDataLoader("frwiki", shard_size=1000, workers=4)
+    >>> datadumper = dataset.DataDumper("jsonl", dataset.DataDumper.path_in_dir("data/wiki"))
+    >>> datadumper.save(dataloader)
 """
 
 import bz2
+import collections
 import os
 import re
 import logging
+from concurrent import futures
+from os import path
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar, Union
 
 try:
     import ujson as json
 except ModuleNotFoundError:
     import json
 
-from uqa import dataset
+from uqa import dataset, metrics
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+#: Paragraphs separator of the articles text
+PARAGRAPH_SPLIT = re.compile(r"\n+")
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+R = TypeVar("R")  # pylint: disable=invalid-name
+
+
+def parse_article(line: Union[str, bytes]) -> dataset.TJson:
+    """Parse a dump line into an article in `default` data format, each paragraph being a context.
+
+    The first paragraph (the article title) and the last one are dropped.
+    """
+    wiki_article = json.loads(line)
+    paragraphs = PARAGRAPH_SPLIT.split(wiki_article["text"])[1:-1]
+    return {
+        "id_article": int(wiki_article["id"]),
+        "title": wiki_article["title"],
+        "contexts": [{"id_context": id_context, "text": text} for id_context, text in enumerate(paragraphs)],
+    }
+
+
+def iter_archive(fpath: str) -> Iterator[dataset.TJson]:
+    """Stream the articles of the bz2 archive `fpath` in `default` data format, one line at a time."""
+    with bz2.open(fpath, "rb") as file:
+        for line in file:
+            if line.strip():
+                yield parse_article(line)
+
+
+def read_archive(fpath: str) -> List[dataset.TJson]:
+    """Return the list of the articles of the bz2 archive `fpath` in `default` data format."""
+    return list(iter_archive(fpath))
+
+
+def _read_archive_item(fpath: str) -> Tuple[str, List[dataset.TJson]]:
+    return fpath, read_archive(fpath)
+
+
+def discover_archives(datapath: Iterable[str]) -> List[str]:
+    """Return the sorted paths of the ``*.bz2`` archives in the directories of `datapath` and the other paths."""
+    fpaths = []
+    for dpath in datapath:
+        if not path.isdir(dpath):
+            fpaths.append(dpath)
+            continue
+        for subdirpath, _, files in os.walk(dpath):
+            fpaths.extend(path.join(subdirpath, filename) for filename in files if filename.endswith(".bz2"))
+    return sorted(fpaths)
+
+
+def _parallel_map(func: Callable[[T], R], items: Iterable[T], workers: int, ordered: bool = True) -> Iterator[R]:
+    """Yield ``func(item)`` for the `items`, computed in `workers` processes with at most ``2 * workers``
+    pending results, in `items` order if `ordered` else in completion order."""
+    with futures.ProcessPoolExecutor(workers) as executor:
+        pending = collections.deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= 2 * workers:
+                yield _pop_result(pending, ordered)
+        while pending:
+            yield _pop_result(pending, ordered)
+
+
+def _pop_result(pending: collections.deque, ordered: bool):
+    if ordered:
+        return pending.popleft().result()
+    done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+    future = next(iter(done))
+    pending.remove(future)
+    return future.result()
+
+
+class WikiDumpDataLoader:
+    """Data loader over wiki bz2 dumps archives, yielding `default` data format shards.
+
+    | Iterating over a `WikiDumpDataLoader` instance yields shard names and contents (see :obj:`.DataIterable`),
+      each shard content is a list of `shard_size` articles (except the last one).
+    | Shards are named ``{prefix}_{num:05d}.{extension}``, to be saved with a
+      :meth:`.dataset.DataDumper.path_in_dir` path modifier.
+
+    Attributes
+    ----------
+    shard_size: int, default=1000
+        Number of articles per shard
+    workers: int, default=0
+        Number of processes decompressing and parsing archives in parallel, 0 to stream the archives
+        in the calling process
+    ordered: bool, default=True
+        If ``False``, with `workers`, the articles of the archives are sharded in completion order
+        instead of archives order
+    prefix: str, default="wiki"
+        Shards names prefix
+    extension: str, default="json"
+        Shards names extension, i.e. the output file format
+    """
+
+    def __init__(
+        self,
+        datapath: Union[str, Iterable[str]],
+        shard_size: int = 1000,
+        workers: int = 0,
+        ordered: bool = True,
+        prefix: str = "wiki",
+        extension: str = "json",
+    ):
+        """
+        Parameters
+        ----------
+        datapath: str or iterable of str
+            Path(s) to archives or to directories, recursively explored for ``*.bz2`` archives.
+        """
+        self._datapath = [datapath] if isinstance(datapath, str) else list(datapath)
+        self.shard_size = shard_size
+        self.workers = workers
+        self.ordered = ordered
+        self.prefix = prefix
+        self.extension = extension
+
+    @property
+    def datapath(self) -> List[str]:
+        """list of str: List of path passed at initialization."""
+        return self._datapath
+
+    @property
+    def dataformat(self) -> str:
+        """str: Data format, always `default`."""
+        return "default"
+
+    def filepaths(self) -> List[str]:
+        """Return the sorted list of archives paths."""
+        return discover_archives(self._datapath)
+
+    def iter_articles(self) -> dataset.ArticleIterable:
+        """Yield the articles of all the archives along their archive path, see :obj:`.ArticleIterable`."""
+        fpaths = self.filepaths()
+        logger.info(f"Ingesting {len(fpaths)} archives")
+        if self.workers > 0:
+            archives = _parallel_map(_read_archive_item, fpaths, self.workers, self.ordered)
+        else:
+            archives = ((fpath, iter_archive(fpath)) for fpath in fpaths)
+        for i, (fpath, articles) in enumerate(archives):
+            logger.info(f"[{i + 1} / {len(fpaths)}] {fpath}")
+            for article in articles:
+                yield fpath, article
+
+    def __iter__(self) -> dataset.DataIterable:
+        shard = []
+        num = 0
+        for _, article in metrics.measure("ingest", self.iter_articles()):
+            shard.append(article)
+            if len(shard) == self.shard_size:
+                yield self._shard_name(num), shard
+                shard = []
+                num += 1
+        if shard:
+            yield self._shard_name(num), shard
+
+    def _shard_name(self, num: int) -> str:
+        return f"{self.prefix}_{num:05d}.{self.extension}"
+
 
 def wiki_extractor_parser(dir_path: str) -> dataset.DataIterable:
     """Explore directory `dir_path` open archives and yield `default` formated data.
@@ -35,30 +207,7 @@ def wiki_extractor_parser(dir_path: str) -> dataset.DataIterable:
     :obj:`.dataset.TJson`
         The formated data in `default` data format.
     """
-    for subdir, dirs, files in os.walk(dir_path):
+    for subdir, _, files in os.walk(dir_path):
         for file in files:
             path_file = os.path.join(subdir, file)
-            with bz2.open(path_file, "rb") as file:
-                list_json_documents = file.readlines()
-                file_json = list()
-                for string_json in list_json_documents:
-                    # Getting the Parsed Json
-                    string_json_decoded = string_json.decode(encoding="utf-8")
-                    wiki_article_json = json.loads(string_json_decoded)
-                    # Parsing the Text into Paragraph
-                    article_text = wiki_article_json["text"]
-                    article_text = re.sub(r"\n+", "\n", article_text)
-                    contexts = article_text.split("\n")
-                    # Remove last and first element
-                    contexts.pop(0)
-                    contexts.pop(-1)
-                    final_contexts = []
-                    for id_context, context in enumerate(contexts):
-                        final_contexts.append({"id_context": id_context, "text": context})
-                    final_json_list = {
-                        "id_article": int(wiki_article_json["id"]),
-                        "title": wiki_article_json["title"],
-                        "contexts": final_contexts,
-                    }
-                    file_json.append(final_json_list)
-                yield path_file, file_json
+            yield path_file, read_archive(path_file)
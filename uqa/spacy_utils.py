@@ -0,0 +1,155 @@
+"""Batched spacy inference over article streams."""
+
+import collections
+import itertools
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import spacy
+
+from uqa import cache as cache_, dataset
+
+logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
+
+#: With a cache, number of batches of cache misses processed per ``model.pipe`` call
+CACHE_WINDOW_BATCHES = 16
+
+#: Callback annotating in place a context (`default` data format) with the spacy Doc of its text
+ContextAnnotator = Callable[[spacy.tokens.Doc, Dict], None]
+
+#: Function with the signature of ``model.pipe`` called with ``as_tuples=True``, `batch_size` and `n_process`
+#: keyword arguments, yielding ``(doc, context)`` pairs in input order
+DocsPipe = Callable[..., Iterator[Tuple[spacy.tokens.Doc, int]]]
+
+
+def pipe_articles(
+    article_it: dataset.ArticleIterable,
+    model: spacy.language.Language,
+    annotate: ContextAnnotator,
+    batch_size: int = 64,
+    n_process: int = 1,
+    docs_pipe: Optional[DocsPipe] = None,
+    cache: Optional[cache_.StageCache] = None,
+) -> dataset.ArticleIterable:
+    """Stream the contexts texts of `article_it` through ``model.pipe`` and annotate the contexts with `annotate`.
+
+    Each article is yielded, in input order, as soon as all its contexts are annotated,
+    so only the articles of the batches being processed are held in memory.
+
+    Parameters
+    ----------
+    article_it: :obj:`.ArticleIterable`
+        An article iterable in `default` format.
+    model: spacy.language.Language
+        A loaded SpaCy model
+    annotate: :obj:`ContextAnnotator`
+        Called with each context Doc and the context to annotate
+    batch_size: int, default=64
+        Number of texts per ``model.pipe`` batch
+    n_process: int, default=1
+        Number of processes used by ``model.pipe``
+    docs_pipe: :obj:`DocsPipe`, default=None
+        If provided, used instead of ``model.pipe``
+    cache: :class:`.cache.StageCache`, default=None
+        If provided, cached contexts are not processed and the annotations of the processed contexts are cached.
+        Articles are then processed by windows of :obj:`CACHE_WINDOW_BATCHES` batches of cache misses.
+
+    Returns
+    -------
+    :obj:`.ArticleIterable`
+        The annotated article iterable.
+    """
+    docs_pipe = docs_pipe or model.pipe
+    if cache is not None:
+        yield from _pipe_cached_articles(article_it, annotate, batch_size, n_process, docs_pipe, cache)
+        return
+
+    # Pending articles as [fpath, article, number of contexts not yet annotated], in input order
+    pending = collections.deque()
+    contexts: Dict[int, List] = {}
+    keys = itertools.count()
+
+    def _texts():
+        for fpath, article in article_it:
+            entry = [fpath, article, len(article["contexts"])]
+            pending.append(entry)
+            for context in article["contexts"]:
+                # Only the integer key is passed along the text, as it may be sent to other processes
+                key = next(keys)
+                contexts[key] = [entry, context]
+                yield context["text"], key
+
+    for doc, key in docs_pipe(_texts(), as_tuples=True, batch_size=batch_size, n_process=n_process):
+        entry, context = contexts.pop(key)
+        annotate(doc, context)
+        entry[2] -= 1
+        while pending and pending[0][2] == 0:
+            fpath, article, _ = pending.popleft()
+            yield fpath, article
+    for fpath, article, _ in pending:
+        yield fpath, article
+
+
+def _pipe_cached_articles(
+    article_it: dataset.ArticleIterable,
+    annotate: ContextAnnotator,
+    batch_size: int,
+    n_process: int,
+    docs_pipe: DocsPipe,
+    cache: cache_.StageCache,
+) -> dataset.ArticleIterable:
+    article_it = iter(article_it)
+    window_size = batch_size * CACHE_WINDOW_BATCHES
+    while True:
+        window, misses = [], []
+        for fpath, article in article_it:
+            window.append((fpath, article))
+            misses.extend(context for context in article["contexts"] if not cache.load(context))
+            if len(misses) >= window_size:
+                break
+        if not window:
+            return
+        if misses:
+            texts = ((context["text"], idx) for idx, context in enumerate(misses))
+            for doc, idx in docs_pipe(texts, as_tuples=True, batch_size=batch_size, n_process=n_process):
+                annotate(doc, misses[idx])
+                cache.store(misses[idx])
+        yield from window
+
+
+def model_id(model: spacy.language.Language) -> str:
+    """Return a string identifying `model` name, version and pipeline, used as cache key component."""
+    meta = model.meta
+    return f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}:{'+'.join(model.pipe_names)}"
+
+
+def stage_cache(
+    cache: Optional[cache_.AnnotationCache], stage: str, fields: Tuple[str, ...], model: spacy.language.Language
+) -> Optional[cache_.StageCache]:
+    """Return a :class:`.cache.StageCache` view of `cache` for `stage` run with `model`, ``None`` if `cache` is."""
+    if cache is None:
+        return None
+    return cache_.StageCache(cache, stage, fields, model_id(model))
+
+
+def pipe_fcontent(
+    fcontent: dataset.TJson,
+    model: spacy.language.Language,
+    annotate: ContextAnnotator,
+    batch_size: int = 64,
+    n_process: int = 1,
+    docs_pipe: Optional[DocsPipe] = None,
+    cache: Optional[cache_.StageCache] = None,
+) -> dataset.TJson:
+    """Apply :func:`pipe_articles` to the articles of a file content.
+
+    Returns
+    -------
+    :obj:`.TJson`
+        The annotated articles, a list if `fcontent` is a list else an iterator
+    """
+    article_it = pipe_articles(
+        ((None, article) for article in fcontent), model, annotate, batch_size, n_process, docs_pipe, cache
+    )
+    articles = (article for _, article in article_it)
+    return list(articles) if isinstance(fcontent, list) else articles
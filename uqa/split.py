@@ -1,8 +1,15 @@
 """Split or unite a dataset."""
 
-import itertools
+import errno
+import glob
 import logging
 import math
+import os
+import re
+import shutil
+import tempfile
+from os import path
+from typing import List, Optional
 
 from uqa import dataset
 
@@ -32,19 +39,61 @@ def unite_dl(data_it: dataset.DataIterable, output_fpath: str) -> dataset.DataIt
     yield output_fpath, new_fcontent
 
 
-def split_dl(data_it: dataset.DataIterable, fpath_template: str, num_artcles_per_file: int) -> dataset.DataIterable:
+def count_articles(dataloader: dataset.DataLoader) -> Optional[int]:
+    """Return the number of articles of `dataloader` files in `default` data format without decoding them.
+
+    With `jsonl` fileformat lines are counted without being parsed, with `columnar` fileformat
+    the count is read from the header of the memory-mapped corpus.
+
+    Returns
+    -------
+    int or None
+        The number of articles, ``None`` if the file format requires the files to be decoded to count their articles
+        (`json` and `pickle` fileformats).
+    """
+    if dataloader.fileformat == "jsonl":
+        num_articles = 0
+        for fpath in dataloader.filepaths():
+            with dataset.open_file(fpath, "rb") as file:
+                num_articles += sum(1 for line in file if line.strip())
+        return num_articles
+    if dataloader.fileformat == "columnar":
+        return sum(len(dataset.read_columnar(fpath)) for fpath in dataloader.filepaths())
+    return None
+
+
+def num_width(num_files: int) -> int:
+    """Return the number of digits of the largest split number of `num_files` splits, numbered from 0."""
+    return len(str(max(num_files - 1, 0)))
+
+
+def split_dl(
+    data_it: dataset.DataIterable,
+    fpath_template: str,
+    num_artcles_per_file: int,
+    num_articles: Optional[int] = None,
+    width: Optional[int] = None,
+) -> dataset.DataIterable:
     """Split the dataloader data into `num_articles_per_file` articles splits
     and generate new paths with the template `fpath_template` for each split.
 
+    Articles are streamed to the splits in a single pass, only the current split is held in memory.
+
     Parameters
     ----------
-    dataloader: :obj:`.dataset.Dataloader`
-        A dataset iterable
+    data_it: :obj:`.dataset.DataIterable`
+        A dataset iterable, must be a :class:`.dataset.DataLoader` if neither `num_articles` nor `width` is provided
     fpath_template: str
         A bracket style path template string with a '{num}' placeholder.
         '{num}' is formated with the split number automaticlly padded with zeros.
     num_artcles_per_file: int
         The new number of article per file
+    num_articles: int, default=None
+        Total (or estimated) number of articles, used to compute the split numbers padding width.
+        If neither `num_articles` nor `width` is provided, the articles are counted beforehand, which is only
+        supported for the file formats :func:`count_articles` can count without decoding the files.
+    width: int, default=None
+        Split numbers padding width, overrides `num_articles`, 0 for no padding (see :func:`save_renamed_splits`)
 
     Yield
     -----
@@ -53,25 +102,98 @@ def split_dl(data_it: dataset.DataIterable, fpath_template: str, num_artcles_per
     :obj:`dataset.TJson`
         A data split
     """
-    data_it, data_it_tee = itertools.tee(data_it)
-    total_num_articles = sum(len(fcontent) for _, fcontent in data_it_tee)
-    num_new_files = math.ceil(total_num_articles / num_artcles_per_file)
-    num_str_len = math.ceil(math.log10(num_new_files))
-    num_str_template = "{{num:0{}d}}".format(num_str_len)
-    print(num_str_template)
-
-    def num_str(num: int) -> str:
-        return num_str_template.format(num=num)
+    if width is None:
+        if num_articles is None:
+            if isinstance(data_it, dataset.DataLoader):
+                num_articles = count_articles(data_it)
+            if num_articles is None:
+                raise ValueError(
+                    "`num_articles` or `width` must be provided to split a data iterable which articles "
+                    "cannot be counted beforehand, see `save_renamed_splits` to split it in a single pass"
+                )
+        width = num_width(math.ceil(num_articles / num_artcles_per_file))
 
     num = 0
     new_fcontent = []
     for _, fcontent in data_it:
         for article in fcontent:
             if len(new_fcontent) == num_artcles_per_file:
-                yield fpath_template.format(num=num_str(num)), new_fcontent
+                yield split_path(fpath_template, num, width), new_fcontent
                 num += 1
                 new_fcontent = list()
             new_fcontent.append(article)
     # Yield last if not empty
     if new_fcontent:
-        yield fpath_template.format(num=num_str(num)), new_fcontent
+        yield split_path(fpath_template, num, width), new_fcontent
+    if width > 0 and num_width(num + 1) > width:
+        logger.warning(f"{num + 1} splits written, split numbers exceed the padding width {width}")
+
+
+def split_path(fpath_template: str, num: int, width: int = 0) -> str:
+    """Return `fpath_template` with '{num}' placeholder replaced by `num` padded with zeros to `width` digits."""
+    return fpath_template.format(num=f"{num:0{width}d}")
+
+
+def save_renamed_splits(
+    data_it: dataset.DataIterable, datadumper: dataset.DataDumper, fpath_template: str, num_artcles_per_file: int
+) -> int:
+    """Split `data_it` without counting the articles first and save the splits with split numbers padded to
+    the width required by the number of splits.
+
+    As the number of splits is only known at the end, any existing file which path matches `fpath_template` with
+    some split number is taken as a collision and raises :exc:`FileExistsError` before anything is written, unless
+    :attr:`.dataset.DataDumper.override` is set (see :func:`existing_splits`).
+    The splits are then written with unpadded split numbers (``width=0``, see :func:`split_dl`) in a temporary
+    directory next to the first split output path, and moved to their padded output paths once all of them are
+    written. The temporary directory is removed in any case.
+
+    Parameters
+    ----------
+    data_it: :obj:`.dataset.DataIterable`
+        A dataset iterable
+    datadumper: :class:`.dataset.DataDumper`
+        The data dumper used to save the splits
+    fpath_template: str
+        A bracket style path template string with a '{num}' placeholder, see :func:`split_dl`
+    num_artcles_per_file: int
+        The new number of article per file
+
+    Returns
+    -------
+    int
+        The number of splits
+    """
+    if not datadumper.override:
+        existing = existing_splits(datadumper, fpath_template)
+        if existing:
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), existing[0])
+    out_dir = path.dirname(datadumper.output_path(split_path(fpath_template, 0))) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".split-", dir=out_dir)
+    try:
+        # Temporary names only differ by their split number, `fpath_template` extensions are kept
+        tmp_template = path.join(tmp_dir, "{num}." + path.basename(fpath_template))
+        num_files = 0
+        for fpath, fcontent in split_dl(data_it, tmp_template, num_artcles_per_file, width=0):
+            datadumper.save([(fpath, fcontent)])
+            num_files += 1
+        width = num_width(num_files)
+        for num in range(num_files):
+            src = datadumper.output_path(split_path(tmp_template, num))
+            dst = datadumper.output_path(split_path(fpath_template, num, width))
+            os.makedirs(path.dirname(dst) or ".", exist_ok=True)
+            os.replace(src, dst)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return num_files
+
+
+def existing_splits(datadumper: dataset.DataDumper, fpath_template: str) -> List[str]:
+    """Return the existing output paths of the splits of `fpath_template` saved with `datadumper`,
+    for any split number and padding width, in lexicographic order."""
+    # The placeholder is replaced with a marker which goes through the path modifier untouched
+    marker = "\0"
+    parts = datadumper.output_path(fpath_template.format(num=marker)).split(marker)
+    pattern = re.compile("([0-9]+)".join(map(re.escape, parts)))
+    candidates = glob.glob("[0-9]*".join(map(glob.escape, parts)))
+    return sorted(fpath for fpath in candidates if pattern.fullmatch(fpath))
@@ -39,7 +39,7 @@ def stats(fcontent: dataset.TJson, dataformat: str = "default") -> TCounter[str]
     Parameters
     ----------
     fcontent: :obj:`dataset.TJson`
-        The data container
+        The data container, or an iterable of :obj:`dataset.FQuADEvent` for incrementally parsed `fquad` data
     dataformat: str, default="default"
         The data format
 
@@ -50,8 +50,19 @@ def stats(fcontent: dataset.TJson, dataformat: str = "default") -> TCounter[str]
     """
     counts = collections.Counter()
     if dataformat == "default":
-        counts["articles"] = len(fcontent)
-        counts["contexts"] = sum((len(art["contexts"]) for art in fcontent))
+        counts["articles"] = counts["contexts"] = 0
+        for art in fcontent:
+            counts["articles"] += 1
+            counts["contexts"] += len(art["contexts"])
+    elif dataformat == "fquad" and not isinstance(fcontent, Mapping):
+        # Incremental parsing events, see `dataset.read_json_incremental`
+        counts["articles"] = counts["contexts"] = counts["questions"] = 0
+        for kind, _, value in fcontent:
+            if kind == "article":
+                counts["articles"] += 1
+            elif kind == "paragraph":
+                counts["contexts"] += 1
+                counts["questions"] += len(value["qas"])
     elif dataformat == "fquad":
         data = fcontent["data"]
         counts["articles"] = len(data)
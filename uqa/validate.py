@@ -3,6 +3,7 @@
 Check for required fields existence, `answers` / `context` field accordance and `id` unicity accross a file.
 """
 import logging
+from typing import Iterable, Mapping, Set
 
 from uqa import dataset
 
@@ -13,80 +14,112 @@ def validate(fcontent: dataset.TJson) -> None:
     """Validate `fcontent` json-like data in `FQuAD` format.
 
     Check for required fields existence, `answers` / `context` field accordance and `id` unicity accross a file.
+
+    `fcontent` can also be an iterable of :obj:`.dataset.FQuADEvent` as returned by
+    :func:`.dataset.read_json_incremental` (see :func:`validate_events`).
     """
+    if not isinstance(fcontent, Mapping):
+        validate_events(fcontent)
+        return
     qa_ids = set()
     if "version" not in fcontent:
         raise ValueError("invalid FQuAD: missing `version` field at root level")
     if "data" not in fcontent:
         raise ValueError("invalid FQuAD: missing `data` field at root level")
     for idx_article, article in enumerate(fcontent["data"]):
-        if "title" not in article:
-            raise ValueError(f"invalid FQuAD: in `data[{idx_article}]`: missing `title` field")
-        elif "paragraphs" not in article:
-            raise ValueError(f"invalid FQuAD: in `data[{idx_article}]`: missing `paragraphs` field")
+        _validate_article(article, idx_article)
         for idx_paragraph, paragraph in enumerate(article["paragraphs"]):
-            if "context" not in paragraph:
+            _validate_paragraph(paragraph, idx_article, idx_paragraph, qa_ids)
+
+
+def validate_events(events: Iterable[dataset.FQuADEvent]) -> None:
+    """Validate a `FQuAD` format file from its incremental parsing events.
+
+    Perform the same checks as :func:`validate` holding a single paragraph in memory at a time.
+    """
+    qa_ids = set()
+    root_keys = set()
+    for kind, position, value in events:
+        if kind == "paragraph":
+            _validate_paragraph(value, position[0], position[1], qa_ids)
+        elif kind == "article":
+            _validate_article(value, position)
+        else:
+            root_keys.add(position)
+    if "version" not in root_keys:
+        raise ValueError("invalid FQuAD: missing `version` field at root level")
+    if "data" not in root_keys:
+        raise ValueError("invalid FQuAD: missing `data` field at root level")
+
+
+def _validate_article(article: dataset.TJson, idx_article: int) -> None:
+    """Check `article` required fields."""
+    if "title" not in article:
+        raise ValueError(f"invalid FQuAD: in `data[{idx_article}]`: missing `title` field")
+    elif "paragraphs" not in article:
+        raise ValueError(f"invalid FQuAD: in `data[{idx_article}]`: missing `paragraphs` field")
+
+
+def _validate_paragraph(paragraph: dataset.TJson, idx_article: int, idx_paragraph: int, qa_ids: Set) -> None:
+    """Check `paragraph` required fields, `answers` / `context` accordance and register its qas ids in `qa_ids`."""
+    if "context" not in paragraph:
+        raise ValueError(f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}]`:" f"missing `context` field")
+    elif "qas" not in paragraph:
+        raise ValueError(f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}]`: missing `qas` field")
+    for idx_qa, qa in enumerate(paragraph["qas"]):  # pylint: disable=invalid-name
+        if "id" not in qa:
+            raise ValueError(
+                f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
+                f"missing `id` field"
+            )
+        if qa["id"] in qa_ids:
+            raise ValueError(
+                f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
+                f"`id` field value: {qa['id']} already in use"
+            )
+        else:
+            qa_ids.add(qa["id"])
+        if "question" not in qa:
+            raise ValueError(
+                f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
+                f"missing `question` field"
+            )
+        if "answers" not in qa:
+            raise ValueError(
+                f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
+                f"missing `answers` field"
+            )
+        if len(qa["answers"]) == 0:
+            raise ValueError(
+                f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
+                f"`answers` field must contain at least 1 answer"
+            )
+        for idx_answer, answer in enumerate(qa["answers"]):
+            if "answer_start" not in answer:
+                raise ValueError(
+                    f"invalid FQuAD:"
+                    f"in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}].answers[{idx_answer}]`:"
+                    f"missing `answer_start` field"
+                )
+            if "text" not in answer:
                 raise ValueError(
-                    f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}]`:" f"missing `context` field"
+                    f"invalid FQuAD:"
+                    f"in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}].answers[{idx_answer}]`:"
+                    f"missing `text` field"
                 )
-            elif "qas" not in paragraph:
+            ans_start = answer["answer_start"]
+            ans_text = answer["text"]
+            context = paragraph["context"]
+            if (
+                ans_start < 0
+                or ans_start >= len(context) - len(ans_text)
+                or context[ans_start : ans_start + len(ans_text)] != ans_text
+            ):
                 raise ValueError(
-                    f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}]`: missing `qas` field"
+                    f"invalid FQuAD:"
+                    f"in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}].answers[{idx_answer}]`:"
+                    f"values for `answer_start` and `text` conflict with `context` field value."
                 )
-            for idx_qa, qa in enumerate(paragraph["qas"]):  # pylint: disable=invalid-name
-                if "id" not in qa:
-                    raise ValueError(
-                        f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
-                        f"missing `id` field"
-                    )
-                if qa["id"] in qa_ids:
-                    raise ValueError(
-                        f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
-                        f"`id` field value: {qa['id']} already in use"
-                    )
-                else:
-                    qa_ids.add(qa["id"])
-                if "question" not in qa:
-                    raise ValueError(
-                        f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
-                        f"missing `question` field"
-                    )
-                if "answers" not in qa:
-                    raise ValueError(
-                        f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
-                        f"missing `answers` field"
-                    )
-                if len(qa["answers"]) == 0:
-                    raise ValueError(
-                        f"invalid FQuAD: in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}]`:"
-                        f"`answers` field must contain at least 1 answer"
-                    )
-                for idx_answer, answer in enumerate(qa["answers"]):
-                    if "answer_start" not in answer:
-                        raise ValueError(
-                            f"invalid FQuAD:"
-                            f"in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}].answers[{idx_answer}]`:"
-                            f"missing `answer_start` field"
-                        )
-                    if "text" not in answer:
-                        raise ValueError(
-                            f"invalid FQuAD:"
-                            f"in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}].answers[{idx_answer}]`:"
-                            f"missing `text` field"
-                        )
-                    ans_start = answer["answer_start"]
-                    ans_text = answer["text"]
-                    context = paragraph["context"]
-                    if (
-                        ans_start < 0
-                        or ans_start >= len(context) - len(ans_text)
-                        or context[ans_start : ans_start + len(ans_text)] != ans_text
-                    ):
-                        raise ValueError(
-                            f"invalid FQuAD:"
-                            f"in`data[{idx_article}].paragraphs[{idx_paragraph}].qas[{idx_qa}].answers[{idx_answer}]`:"
-                            f"values for `answer_start` and `text` conflict with `context` field value."
-                        )
 
 
 def validate_dl(data_it: dataset.DataIterable) -> None: